@@ -0,0 +1,88 @@
+"""Добавление номера попытки прохождения викторины.
+
+Revision ID: 0d1e2f3a4b5c
+Revises: 9c0d1e2f3a4b
+Create Date: 2026-10-19 18:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '0d1e2f3a4b5c'
+down_revision = '9c0d1e2f3a4b'
+branch_labels = None
+depends_on = None
+
+# Таблица, старое и новое ограничение уникальности, колонки нового
+CONSTRAINTS = (
+    (
+        'quiz_results',
+        '_person_quiz_uc',
+        '_person_quiz_attempt_uc',
+        ('user_id', 'quiz_id'),
+        ('user_id', 'quiz_id', 'attempt'),
+    ),
+    (
+        'user_answers',
+        '_person_question_uc',
+        '_person_question_attempt_uc',
+        ('user_id', 'quiz_id', 'question_id'),
+        ('user_id', 'quiz_id', 'attempt', 'question_id'),
+    ),
+)
+
+
+def upgrade() -> None:
+    """Добавление колонок attempt и ограничений уникальности с попыткой.
+
+    Колонка с постоянным значением по умолчанию добавляется без
+    перезаписи таблицы. Уникальные индексы строятся CONCURRENTLY
+    и затем становятся ограничениями, поэтому запись в таблицы
+    блокируется только на время переключения ограничений.
+    """
+    for table, *_ in CONSTRAINTS:
+        op.add_column(
+            table,
+            sa.Column(
+                'attempt',
+                sa.Integer(),
+                nullable=False,
+                server_default='1',
+                comment='Номер попытки прохождения викторины.',
+            ),
+        )
+
+    with op.get_context().autocommit_block():
+        for table, _, new_name, _, new_columns in CONSTRAINTS:
+            op.execute(
+                f'CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {new_name} '
+                f'ON {table} ({", ".join(new_columns)})'
+            )
+
+    for table, old_name, new_name, _, _ in CONSTRAINTS:
+        op.execute(
+            f'ALTER TABLE {table} ADD CONSTRAINT {new_name} '
+            f'UNIQUE USING INDEX {new_name}'
+        )
+        op.drop_constraint(old_name, table, type_='unique')
+
+
+def downgrade() -> None:
+    """Удаление попыток.
+
+    Прошлые попытки отвязываются от пользователя, как это делал
+    перезапуск викторины до появления попыток.
+    """
+    for table, *_ in CONSTRAINTS:
+        op.execute(
+            f'UPDATE {table} AS t SET user_id = NULL '
+            f'FROM (SELECT user_id, quiz_id, max(attempt) AS attempt '
+            f'FROM {table} WHERE user_id IS NOT NULL '
+            f'GROUP BY user_id, quiz_id) AS last '
+            f'WHERE t.user_id = last.user_id AND t.quiz_id = last.quiz_id '
+            f'AND t.attempt < last.attempt'
+        )
+    for table, old_name, new_name, old_columns, _ in CONSTRAINTS:
+        op.create_unique_constraint(old_name, table, list(old_columns))
+        op.drop_constraint(new_name, table, type_='unique')
+        op.drop_column(table, 'attempt')
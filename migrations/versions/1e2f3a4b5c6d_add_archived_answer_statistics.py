@@ -0,0 +1,63 @@
+"""Добавление счетчиков архивированных ответов.
+
+Revision ID: 1e2f3a4b5c6d
+Revises: 0d1e2f3a4b5c
+Create Date: 2026-10-20 10:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '1e2f3a4b5c6d'
+down_revision = '0d1e2f3a4b5c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создание таблицы archived_answer_statistics.
+
+    Ответы, архивированные до появления таблицы, в ней не учтены:
+    пересборка статистики после такой архивации их не увидит.
+    """
+    op.create_table(
+        'archived_answer_statistics',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column(
+            'quiz_id',
+            sa.Integer(),
+            sa.ForeignKey('quizzes.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'question_id',
+            sa.Integer(),
+            sa.ForeignKey('questions.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'variant_id',
+            sa.Integer(),
+            sa.ForeignKey('variants.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'answers_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column(
+            'correct_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.UniqueConstraint(
+            'day',
+            'quiz_id',
+            'question_id',
+            'variant_id',
+            name='_archived_answer_statistic_uc',
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Удаление таблицы archived_answer_statistics."""
+    op.drop_table('archived_answer_statistics')
@@ -0,0 +1,51 @@
+"""Добавление отметок инкрементального экспорта.
+
+Revision ID: 2b3c4d5e6f7a
+Revises: 1a2b3c4d5e6f
+Create Date: 2026-10-19 10:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '2b3c4d5e6f7a'
+down_revision = '1a2b3c4d5e6f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создание таблицы export_watermarks и колонки updated_on."""
+    op.create_table(
+        'export_watermarks',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column(
+            'user_id',
+            sa.Integer(),
+            sa.ForeignKey('users.id', ondelete='CASCADE'),
+            nullable=False,
+            unique=True,
+        ),
+        sa.Column(
+            'last_answer_id', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column(
+            'last_result_id', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column('exported_on', sa.DateTime(), nullable=True),
+    )
+    op.add_column(
+        'quiz_results',
+        sa.Column(
+            'updated_on',
+            sa.DateTime(),
+            nullable=True,
+            server_default=sa.func.now(),
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Удаление таблицы export_watermarks и колонки updated_on."""
+    op.drop_column('quiz_results', 'updated_on')
+    op.drop_table('export_watermarks')
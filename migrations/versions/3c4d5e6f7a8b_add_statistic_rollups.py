@@ -0,0 +1,116 @@
+"""Добавление накопительных таблиц статистики.
+
+Revision ID: 3c4d5e6f7a8b
+Revises: 2b3c4d5e6f7a
+Create Date: 2026-10-19 11:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '3c4d5e6f7a8b'
+down_revision = '2b3c4d5e6f7a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создание таблиц daily_answer_statistics и daily_user_activity.
+
+    Таблицы заполняются из user_answers и quiz_results. Время ответа
+    еще не хранится, поэтому все старые ответы относятся к дню миграции.
+    """
+    op.create_table(
+        'daily_answer_statistics',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column(
+            'quiz_id',
+            sa.Integer(),
+            sa.ForeignKey('quizzes.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'question_id',
+            sa.Integer(),
+            sa.ForeignKey('questions.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'answers_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column(
+            'correct_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.UniqueConstraint(
+            'day',
+            'quiz_id',
+            'question_id',
+            name='_daily_answer_statistic_uc',
+        ),
+    )
+    op.create_index(
+        'ix_daily_answer_statistics_quiz_id',
+        'daily_answer_statistics',
+        ['quiz_id'],
+    )
+    op.create_index(
+        'ix_daily_answer_statistics_question_id',
+        'daily_answer_statistics',
+        ['question_id'],
+    )
+    op.create_table(
+        'daily_user_activity',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column(
+            'tg_user_id',
+            sa.Integer(),
+            sa.ForeignKey('telegram_users.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'answers_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column(
+            'correct_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.Column(
+            'completed_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.UniqueConstraint(
+            'day',
+            'tg_user_id',
+            name='_daily_user_activity_uc',
+        ),
+    )
+    op.create_index(
+        'ix_daily_user_activity_day', 'daily_user_activity', ['day']
+    )
+    op.create_index(
+        'ix_daily_user_activity_tg_user_id',
+        'daily_user_activity',
+        ['tg_user_id'],
+    )
+    op.execute(
+        'INSERT INTO daily_answer_statistics '
+        '(day, quiz_id, question_id, answers_count, correct_count) '
+        'SELECT current_date, quiz_id, question_id, count(id), '
+        'count(id) FILTER (WHERE is_right) FROM user_answers '
+        'GROUP BY quiz_id, question_id'
+    )
+    op.execute(
+        'INSERT INTO daily_user_activity '
+        '(day, tg_user_id, answers_count, correct_count, completed_count) '
+        'SELECT coalesce(ended_on, created_on, now())::date, tg_user_id, '
+        'sum(total_questions), sum(correct_answers_count), '
+        'count(id) FILTER (WHERE is_complete) '
+        'FROM quiz_results WHERE tg_user_id IS NOT NULL '
+        'GROUP BY 1, tg_user_id'
+    )
+
+
+def downgrade() -> None:
+    """Удаление накопительных таблиц статистики."""
+    op.drop_table('daily_user_activity')
+    op.drop_table('daily_answer_statistics')
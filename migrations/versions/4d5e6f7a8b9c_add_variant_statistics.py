@@ -0,0 +1,58 @@
+"""Добавление счетчиков выбора вариантов ответа.
+
+Revision ID: 4d5e6f7a8b9c
+Revises: 3c4d5e6f7a8b
+Create Date: 2026-10-19 12:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '4d5e6f7a8b9c'
+down_revision = '3c4d5e6f7a8b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создание таблицы variant_statistics и заполнение из user_answers."""
+    op.create_table(
+        'variant_statistics',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column(
+            'question_id',
+            sa.Integer(),
+            sa.ForeignKey('questions.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'variant_id',
+            sa.Integer(),
+            sa.ForeignKey('variants.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column(
+            'answers_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.UniqueConstraint(
+            'question_id',
+            'variant_id',
+            name='_variant_statistic_uc',
+        ),
+    )
+    op.create_index(
+        'ix_variant_statistics_question_id',
+        'variant_statistics',
+        ['question_id'],
+    )
+    op.execute(
+        'INSERT INTO variant_statistics '
+        '(question_id, variant_id, answers_count) '
+        'SELECT question_id, answer_id, count(id) FROM user_answers '
+        'GROUP BY question_id, answer_id'
+    )
+
+
+def downgrade() -> None:
+    """Удаление таблицы variant_statistics."""
+    op.drop_table('variant_statistics')
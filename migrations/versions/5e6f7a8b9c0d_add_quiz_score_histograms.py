@@ -0,0 +1,51 @@
+"""Добавление гистограмм результатов викторин.
+
+Revision ID: 5e6f7a8b9c0d
+Revises: 4d5e6f7a8b9c
+Create Date: 2026-10-19 13:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '5e6f7a8b9c0d'
+down_revision = '4d5e6f7a8b9c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создание таблицы quiz_score_histograms.
+
+    Таблица заполняется командой flask statistics rebuild,
+    так как корзины считаются тем же кодом, что и страница результата.
+    """
+    op.create_table(
+        'quiz_score_histograms',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column(
+            'quiz_id',
+            sa.Integer(),
+            sa.ForeignKey('quizzes.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('bucket', sa.Integer(), nullable=False),
+        sa.Column(
+            'results_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.UniqueConstraint(
+            'quiz_id',
+            'bucket',
+            name='_quiz_score_histogram_uc',
+        ),
+    )
+    op.create_index(
+        'ix_quiz_score_histograms_quiz_id',
+        'quiz_score_histograms',
+        ['quiz_id'],
+    )
+
+
+def downgrade() -> None:
+    """Удаление таблицы quiz_score_histograms."""
+    op.drop_table('quiz_score_histograms')
@@ -0,0 +1,54 @@
+"""Добавление воронки прохождения викторин.
+
+Revision ID: 6f7a8b9c0d1e
+Revises: 5e6f7a8b9c0d
+Create Date: 2026-10-19 14:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '6f7a8b9c0d1e'
+down_revision = '5e6f7a8b9c0d'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    """Создание таблицы quiz_funnel_steps и заполнение из quiz_results."""
+    op.create_table(
+        'quiz_funnel_steps',
+        sa.Column('id', sa.Integer(), nullable=False, primary_key=True),
+        sa.Column(
+            'quiz_id',
+            sa.Integer(),
+            sa.ForeignKey('quizzes.id', ondelete='CASCADE'),
+            nullable=False,
+        ),
+        sa.Column('position', sa.Integer(), nullable=False),
+        sa.Column(
+            'users_count', sa.Integer(), nullable=False, server_default='0'
+        ),
+        sa.UniqueConstraint(
+            'quiz_id',
+            'position',
+            name='_quiz_funnel_step_uc',
+        ),
+    )
+    op.create_index(
+        'ix_quiz_funnel_steps_quiz_id',
+        'quiz_funnel_steps',
+        ['quiz_id'],
+    )
+    op.execute(
+        'INSERT INTO quiz_funnel_steps (quiz_id, position, users_count) '
+        'SELECT quiz_id, position, count(*) FROM ('
+        'SELECT quiz_id, generate_series(1, total_questions) AS position '
+        'FROM quiz_results) AS positions '
+        'GROUP BY quiz_id, position'
+    )
+
+
+def downgrade() -> None:
+    """Удаление таблицы quiz_funnel_steps."""
+    op.drop_table('quiz_funnel_steps')
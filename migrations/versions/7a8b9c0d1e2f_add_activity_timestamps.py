@@ -0,0 +1,119 @@
+"""Добавление времени ответа и последней активности.
+
+Revision ID: 7a8b9c0d1e2f
+Revises: 6f7a8b9c0d1e
+Create Date: 2026-10-19 15:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '7a8b9c0d1e2f'
+down_revision = '6f7a8b9c0d1e'
+branch_labels = None
+depends_on = None
+
+# Размер пачки при заполнении времени ответа. Каждая пачка
+# фиксируется отдельно, поэтому блокировки строк не копятся
+# до конца миграции.
+BATCH_SIZE = 50000
+
+
+def upgrade() -> None:
+    """Добавление колонок answered_at и last_active_at с индексами.
+
+    Колонки добавляются без значения по умолчанию, поэтому ALTER TABLE
+    не переписывает таблицы. Время старых ответов восстанавливается
+    по времени начала соответствующего прохождения викторины (для
+    ответов без пользователя таких может быть несколько, берется
+    последнее). Последние прохождения выбираются один раз во временную
+    таблицу: индексов quiz_results по викторине и пользователю на этой
+    ревизии еще нет, и подзапрос на каждый ответ читал бы quiz_results
+    целиком. Заполнение идет пачками по диапазонам id, каждая
+    в своей транзакции; уже заполненные ответы пропускаются, поэтому
+    прерванную миграцию можно запустить снова. Ответы, для которых
+    прохождение не найдено, остаются без времени.
+    """
+    op.add_column(
+        'user_answers',
+        sa.Column('answered_at', sa.DateTime(), nullable=True),
+    )
+    op.add_column(
+        'telegram_users',
+        sa.Column('last_active_at', sa.DateTime(), nullable=True),
+    )
+
+    connection = op.get_bind()
+    with op.get_context().autocommit_block():
+        connection.execute(
+            sa.text(
+                'CREATE TEMPORARY TABLE latest_quiz_results AS '
+                'SELECT DISTINCT ON (quiz_id, tg_user_id, user_id) '
+                'quiz_id, tg_user_id, user_id, created_on '
+                'FROM quiz_results '
+                'ORDER BY quiz_id, tg_user_id, user_id, '
+                'created_on DESC, id DESC',
+            ),
+        )
+        connection.execute(
+            sa.text(
+                'CREATE INDEX ON latest_quiz_results (quiz_id, tg_user_id)',
+            ),
+        )
+        connection.execute(sa.text('ANALYZE latest_quiz_results'))
+        max_id = connection.execute(
+            sa.text('SELECT coalesce(max(id), 0) FROM user_answers'),
+        ).scalar()
+        for start in range(0, max_id, BATCH_SIZE):
+            connection.execute(
+                sa.text(
+                    'UPDATE user_answers AS ua '
+                    'SET answered_at = qr.created_on '
+                    'FROM latest_quiz_results AS qr '
+                    'WHERE qr.quiz_id = ua.quiz_id '
+                    'AND qr.tg_user_id = ua.tg_user_id '
+                    'AND qr.user_id IS NOT DISTINCT FROM ua.user_id '
+                    'AND ua.id > :start AND ua.id <= :end '
+                    'AND ua.answered_at IS NULL',
+                ),
+                {'start': start, 'end': start + BATCH_SIZE},
+            )
+        connection.execute(sa.text('DROP TABLE latest_quiz_results'))
+    op.execute(
+        'UPDATE telegram_users AS tu '
+        'SET last_active_at = activity.last_active_at '
+        'FROM (SELECT tg_user_id, '
+        'max(coalesce(ended_on, created_on)) AS last_active_at '
+        'FROM quiz_results GROUP BY tg_user_id) AS activity '
+        'WHERE activity.tg_user_id = tu.id'
+    )
+
+    op.create_index(
+        'ix_user_answers_answered_at',
+        'user_answers',
+        ['answered_at'],
+        postgresql_using='brin',
+    )
+    op.create_index(
+        'ix_quiz_results_created_on',
+        'quiz_results',
+        ['created_on'],
+        postgresql_using='brin',
+    )
+    op.create_index(
+        'ix_telegram_users_last_active_at',
+        'telegram_users',
+        ['last_active_at'],
+    )
+
+
+def downgrade() -> None:
+    """Удаление колонок answered_at и last_active_at."""
+    op.drop_index(
+        'ix_telegram_users_last_active_at',
+        table_name='telegram_users',
+    )
+    op.drop_index('ix_quiz_results_created_on', table_name='quiz_results')
+    op.drop_index('ix_user_answers_answered_at', table_name='user_answers')
+    op.drop_column('telegram_users', 'last_active_at')
+    op.drop_column('user_answers', 'answered_at')
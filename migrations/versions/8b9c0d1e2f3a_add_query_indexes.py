@@ -0,0 +1,64 @@
+"""Добавление индексов под запросы круд классов.
+
+Revision ID: 8b9c0d1e2f3a
+Revises: 7a8b9c0d1e2f
+Create Date: 2026-10-19 16:00:00.000000
+"""
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '8b9c0d1e2f3a'
+down_revision = '7a8b9c0d1e2f'
+branch_labels = None
+depends_on = None
+
+# Имя индекса, таблица, колонки и условие частичного индекса
+INDEXES = (
+    ('ix_quiz_results_tg_user_id', 'quiz_results', ['tg_user_id'], None),
+    (
+        'ix_quiz_results_tg_user_id_complete',
+        'quiz_results',
+        ['tg_user_id'],
+        'is_complete',
+    ),
+    (
+        'ix_quiz_questions_question_id',
+        'quiz_questions',
+        ['question_id'],
+        None,
+    ),
+    ('ix_users_telegram_id', 'users', ['telegram_id'], None),
+)
+
+
+def upgrade() -> None:
+    """Создание индексов без блокировки записи (CONCURRENTLY).
+
+    CREATE INDEX CONCURRENTLY нельзя выполнять в транзакции, поэтому
+    индексы создаются в autocommit блоке. Прерванное создание
+    оставляет невалидный индекс: его нужно удалить вручную
+    перед повторным запуском миграции.
+    """
+    with op.get_context().autocommit_block():
+        for name, table, columns, where in INDEXES:
+            op.create_index(
+                name,
+                table,
+                columns,
+                postgresql_concurrently=True,
+                postgresql_where=sa.text(where) if where else None,
+                if_not_exists=True,
+            )
+
+
+def downgrade() -> None:
+    """Удаление индексов без блокировки записи (CONCURRENTLY)."""
+    with op.get_context().autocommit_block():
+        for name, table, _, _ in reversed(INDEXES):
+            op.drop_index(
+                name,
+                table_name=table,
+                postgresql_concurrently=True,
+                if_exists=True,
+            )
@@ -0,0 +1,58 @@
+"""Добавление индексов поиска по триграммам и полнотекстового поиска.
+
+Revision ID: 9c0d1e2f3a4b
+Revises: 8b9c0d1e2f3a
+Create Date: 2026-10-19 17:00:00.000000
+"""
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = '9c0d1e2f3a4b'
+down_revision = '8b9c0d1e2f3a'
+branch_labels = None
+depends_on = None
+
+# Имя индекса и его определение. Выражения должны совпадать
+# с выражениями поиска в src/crud/search.py, иначе индекс
+# не будет использоваться.
+INDEXES = (
+    (
+        'ix_categories_name_trgm',
+        'categories USING gin (name gin_trgm_ops)',
+    ),
+    (
+        'ix_quizzes_title_trgm',
+        'quizzes USING gin (title gin_trgm_ops)',
+    ),
+    (
+        'ix_questions_title_trgm',
+        'questions USING gin (title gin_trgm_ops)',
+    ),
+    (
+        'ix_questions_title_tsv',
+        "questions USING gin (to_tsvector('russian'::regconfig, title))",
+    ),
+    (
+        'ix_telegram_users_full_name_trgm',
+        "telegram_users USING gin "
+        "((coalesce(last_name, '') || ' ' || first_name) gin_trgm_ops)",
+    ),
+)
+
+
+def upgrade() -> None:
+    """Подключение pg_trgm и создание GIN индексов (CONCURRENTLY)."""
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    with op.get_context().autocommit_block():
+        for name, definition in INDEXES:
+            op.execute(
+                f'CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} '
+                f'ON {definition}'
+            )
+
+
+def downgrade() -> None:
+    """Удаление индексов поиска."""
+    with op.get_context().autocommit_block():
+        for name, _ in reversed(INDEXES):
+            op.execute(f'DROP INDEX CONCURRENTLY IF EXISTS {name}')
@@ -32,10 +32,12 @@ from .views import (  # noqa
 from .models import (  # noqa
     base,
     category,
+    export_watermark,
     question,
     quiz_result,
     quiz,
     quiz_question,
+    statistic_rollup,
     telegram_user,
     user_answer,
     user,
@@ -54,6 +56,7 @@ from .admin import (  # noqa
 
 from . import (  # noqa
     bot,
+    commands,
     constants,
     api_views,
     error_handlers,
@@ -0,0 +1,88 @@
+import logging
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional
+
+from redis import Redis, RedisError
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+PLAYED = 'played'
+COMPLETED = 'completed'
+
+
+class ActiveUserCounter:
+
+    """Приблизительный подсчет активных пользователей в Redis.
+
+    Для каждого дня и события (ответ на вопрос, завершение викторины)
+    хранится ключ HyperLogLog с идентификаторами телеграм пользователей.
+    Количество уникальных пользователей за период считается одним
+    PFCOUNT по ключам дней периода с погрешностью около 0.81%,
+    независимо от числа пользователей.
+
+    """
+
+    key_prefix = 'active_users'
+
+    def __init__(self, redis: Redis, retention_days: int) -> None:
+        """Клиент Redis и срок хранения дневных ключей в днях."""
+        self.redis = redis
+        self.retention_days = retention_days
+
+    def _key(self, event: str, day: date) -> str:
+        return f'{self.key_prefix}:{event}:{day.isoformat()}'
+
+    def _keys(self, event: str, since: date, until: date) -> List[str]:
+        """Ключи всех дней периода включительно."""
+        days = (until - since).days + 1
+        return [
+            self._key(event, since + timedelta(days=offset))
+            for offset in range(max(days, 0))
+        ]
+
+    def track(
+        self,
+        event: str,
+        tg_user_ids: Iterable[int],
+        day: Optional[date] = None,
+    ) -> None:
+        """Отметить пользователей активными в указанный день.
+
+        Ошибка Redis не должна мешать пользователю проходить викторину,
+        поэтому она только логируется.
+        """
+        tg_user_ids = [tg_user_id for tg_user_id in tg_user_ids if tg_user_id]
+        if not tg_user_ids:
+            return
+        key = self._key(event, day or datetime.utcnow().date())
+        try:
+            pipeline = self.redis.pipeline()
+            pipeline.pfadd(key, *tg_user_ids)
+            pipeline.expire(key, timedelta(days=self.retention_days))
+            pipeline.execute()
+        except RedisError as e:
+            logger.warning(f'Не удалось обновить {key}: {e}')
+
+    def count(
+        self,
+        event: str,
+        since: date,
+        until: Optional[date] = None,
+    ) -> int:
+        """Количество уникальных пользователей за период включительно."""
+        keys = self._keys(event, since, until or datetime.utcnow().date())
+        if not keys:
+            return 0
+        try:
+            return self.redis.pfcount(*keys)
+        except RedisError as e:
+            logger.warning(f'Не удалось посчитать {event}: {e}')
+            return 0
+
+
+active_user_counter = ActiveUserCounter(
+    settings.ACTIVE_USERS_REDIS,
+    retention_days=settings.ACTIVE_USERS_RETENTION_DAYS,
+)
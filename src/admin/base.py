@@ -1,3 +1,5 @@
+from typing import Any
+
 from flask import flash
 from flask_admin import BaseView
 from flask_admin.contrib.sqla import ModelView
@@ -11,6 +13,7 @@ from sqlalchemy.exc import IntegrityError
 from src.constants import (
     DELETE_ERROR_MESSAGE,
 )
+from src.crud.quiz import quiz_crud
 
 
 class BaseView(BaseView):
@@ -49,13 +52,33 @@ class IntegrityErrorMixin:
             # Пытаемся удалить модель
             self.session.delete(model)
             self.session.commit()
-            return True
         except IntegrityError:
             # Откатываем транзакцию
             self.session.rollback()
             # Отображаем пользовательское сообщение
             flash(DELETE_ERROR_MESSAGE + self.delete_error_message, 'error')
             return False
+        # Как в ModelView.delete_model: хуки после успешного удаления
+        self.after_model_delete(model)
+        return True
+
+
+class CatalogueCacheMixin:
+
+    """Миксин сброса кэша каталога викторин после изменений в админке."""
+
+    def after_model_change(
+        self,
+        form: Any,
+        model: Any,
+        is_created: bool,
+    ) -> None:
+        """Сбрасываем кэш каталога после создания или изменения."""
+        quiz_crud.bump_catalogue_version()
+
+    def after_model_delete(self, model: Any) -> None:
+        """Сбрасываем кэш каталога после удаления."""
+        quiz_crud.bump_catalogue_version()
 
 
 class NotVisibleMixin(BaseView):
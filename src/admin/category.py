@@ -1,22 +1,29 @@
-from flask import Response, request
+from flask import Response, abort, request
 from flask_admin import BaseView, expose
 from flask_jwt_extended import jwt_required
 
 from src.admin.base import (
+    CatalogueCacheMixin,
     CustomAdminView,
     IntegrityErrorMixin,
     NotVisibleMixin,
 )
 from src.constants import (
-    DEFAULT_PAGE_NUMBER,
     ERROR_FOR_CATEGORY,
+    HTTP_NOT_FOUND,
     ITEMS_PER_PAGE,
 )
+from src.crud.answer_statistic import NO_DATA, answer_statistic_crud
 from src.crud.category import category_crud
-from src.models.category import Category
+from src.crud.search import search_crud
+from src.statistic_cache import statistic_cache
 
 
-class CategoryAdmin(IntegrityErrorMixin, CustomAdminView):
+class CategoryAdmin(
+    CatalogueCacheMixin,
+    IntegrityErrorMixin,
+    CustomAdminView,
+):
 
     """Добавление и перевод модели рубрик в админ зону."""
 
@@ -40,27 +47,36 @@ class CategoryListView(BaseView):
 
     @expose('/')
     @jwt_required()
-    def index(self) -> Response:
+    async def index(self) -> Response:
         """Создание списка для статистики рубрик."""
-        page = request.args.get('page', DEFAULT_PAGE_NUMBER, type=int)
+        cursor = request.args.get('cursor', type=str)
         per_page = ITEMS_PER_PAGE
 
         search_query = request.args.get('search', '', type=str)
-        query = category_crud.get_query()
-        if search_query:
-            query = query.filter(Category.name.ilike(f'%{search_query}%'))
+        query, order = search_crud.apply(
+            category_crud.get_query(),
+            'category',
+            search_query,
+        )
 
         # Пагинация
-        categories = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False,
+        categories = await category_crud.get_page(
+            query,
+            cursor,
+            per_page,
+            order,
         )
 
+        statistic = await answer_statistic_crud.get_many(
+            'category',
+            [category.id for category in categories.items],
+        )
         category_data = [
             {
                 'id': category.id,
                 'name': category.name,
+                'total_answers': statistic.get(category.id, NO_DATA)[1],
+                'correct_percentage': statistic.get(category.id, NO_DATA)[3],
             }
             for category in categories.items
         ]
@@ -82,9 +98,14 @@ class CategoryStatisticsView(NotVisibleMixin):
     @jwt_required()
     async def index(self) -> Response:
         """Статистика по конкретной рубрике."""
-        category_id = request.args.get('category_id')
+        category_id = request.args.get('category_id', type=int)
+        if category_id is None:
+            abort(HTTP_NOT_FOUND)
 
-        statictic = await category_crud.get_statistic(category_id)
+        statictic = await statistic_cache.get_or_compute(
+            f'category:{category_id}',
+            lambda: category_crud.get_statistic(category_id),
+        )
 
         (
             category_name,
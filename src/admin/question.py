@@ -1,32 +1,40 @@
 import base64
 from typing import Any
 
-from flask import Response, request
+from flask import Response, abort, request
 from flask_admin import BaseView, expose
 from flask_jwt_extended import jwt_required
 from flask_wtf.file import FileAllowed, FileField, FileStorage, ValidationError
 from sqlalchemy.exc import IntegrityError
 
 from src.admin.base import (
+    CatalogueCacheMixin,
     CustomAdminView,
     IntegrityErrorMixin,
     NotVisibleMixin,
 )
 from src.constants import (
     CAN_ONLY_BE_ONE_CORRECT_ANSWER,
-    DEFAULT_PAGE_NUMBER,
     ERROR_FOR_QUESTION,
+    HTTP_NOT_FOUND,
     ITEMS_PER_PAGE,
     ONE_ANSWER_VARIANT,
     ONE_CORRECT_ANSWER,
     UNIQUE_VARIANT,
 )
+from src.crud.answer_statistic import NO_DATA, answer_statistic_crud
 from src.crud.question import question_crud
+from src.crud.search import search_crud
 from src.models.question import Question
 from src.models.variant import Variant
+from src.statistic_cache import statistic_cache
 
 
-class QuestionAdmin(IntegrityErrorMixin, CustomAdminView):
+class QuestionAdmin(
+    CatalogueCacheMixin,
+    IntegrityErrorMixin,
+    CustomAdminView,
+):
 
     """Добавление и перевод модели вопросов в админ зону."""
 
@@ -164,27 +172,36 @@ class QuestionListView(BaseView):
 
     @expose('/')
     @jwt_required()
-    def index(self) -> Response:
+    async def index(self) -> Response:
         """Создание списка для статистики."""
-        page = request.args.get('page', DEFAULT_PAGE_NUMBER, type=int)
+        cursor = request.args.get('cursor', type=str)
         per_page = ITEMS_PER_PAGE
 
         search_query = request.args.get('search', '', type=str)
-        query = Question.query
-        if search_query:
-            query = query.filter(Question.title.ilike(f'%{search_query}%'))
+        query, order = search_crud.apply(
+            Question.query,
+            'question',
+            search_query,
+        )
 
         # Пагинация
-        questions = query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False,
+        questions = await question_crud.get_page(
+            query,
+            cursor,
+            per_page,
+            order,
         )
 
+        statistic = await answer_statistic_crud.get_many(
+            'question',
+            [question.id for question in questions.items],
+        )
         question_data = [
             {
                 'id': question.id,
                 'title': question.title,
+                'total_answers': statistic.get(question.id, NO_DATA)[1],
+                'correct_percentage': statistic.get(question.id, NO_DATA)[3],
             }
             for question in questions.items
         ]
@@ -207,9 +224,21 @@ class QuestionStatisticsView(NotVisibleMixin):
     @jwt_required()
     async def index(self) -> Response:
         """Выполняем запрос статистики для конкретного вопроса."""
-        question_id = request.args.get('question_id')
+        question_id = request.args.get('question_id', type=int)
+        if question_id is None:
+            abort(HTTP_NOT_FOUND)
+
+        statictic = await statistic_cache.get_or_compute(
+            f'question:{question_id}',
+            lambda: question_crud.get_statistic(question_id),
+        )
 
-        statictic = await question_crud.get_statistic(question_id)
+        variants = await statistic_cache.get_or_compute(
+            f'question_variants:{question_id}',
+            lambda: answer_statistic_crud.get_variant_distribution(
+                question_id,
+            ),
+        )
 
         (
             question_text,
@@ -224,4 +253,5 @@ class QuestionStatisticsView(NotVisibleMixin):
             total_answers=total_answers,
             correct_answers=correct_answers,
             correct_percentage=correct_percentage,
+            variants=variants,
         )
@@ -1,4 +1,4 @@
-from typing import Any
+from typing import Any, Optional
 
 from flask import (
     Response,
@@ -13,26 +13,31 @@ from flask_admin import BaseView, expose
 from flask_admin.model.template import LinkRowAction
 from flask_jwt_extended import jwt_required
 from markupsafe import Markup
+from sqlalchemy.orm import selectinload
 from wtforms import ValidationError
 from wtforms.ext.sqlalchemy.fields import QuerySelectMultipleField
 
 from src import app
 from src.admin.base import (
+    CatalogueCacheMixin,
     CustomAdminView,
     IntegrityErrorMixin,
     NotVisibleMixin,
 )
 from src.constants import (
     AT_LEAST_ONE_QUESTION,
-    DEFAULT_PAGE_NUMBER,
     ERROR_FOR_QUIZ,
+    HTTP_NOT_FOUND,
     ITEMS_PER_PAGE,
 )
+from src.crud.answer_statistic import NO_DATA, answer_statistic_crud
 from src.crud.question import question_crud
 from src.crud.quiz import quiz_crud
+from src.crud.search import search_crud
 from src.models.category import Category
 from src.models.question import Question
 from src.models.quiz import Quiz
+from src.statistic_cache import statistic_cache
 
 
 class GroupedListWidget(object):
@@ -81,7 +86,11 @@ class GroupedQuerySelectMultipleField(QuerySelectMultipleField):
         self.query_factory = lambda: Question.query.all()
 
 
-class QuizAdmin(IntegrityErrorMixin, CustomAdminView):
+class QuizAdmin(
+    CatalogueCacheMixin,
+    IntegrityErrorMixin,
+    CustomAdminView,
+):
 
     """Добавление и перевод модели викторин в админ зону."""
 
@@ -132,6 +141,14 @@ class QuizAdmin(IntegrityErrorMixin, CustomAdminView):
             ),
         )
 
+    def get_one(self, obj_id: Any) -> Optional[Quiz]:
+        """Форма редактирования загружает вопросы одним запросом."""
+        return self.session.get(
+            self.model,
+            int(obj_id),
+            options=[selectinload(Quiz.questions)],
+        )
+
     def on_model_change(self, form: Any, model: Any, is_created: bool) -> None:
         """Проверка на выбор хотя бы одного вопроса для викторины."""
         if not model.questions:
@@ -144,23 +161,27 @@ class QuizListView(BaseView):
 
     @expose('/')
     @jwt_required()
-    def index(self) -> Response:
+    async def index(self) -> Response:
         """Создание списка для статистики викторин."""
-        page = request.args.get('page', DEFAULT_PAGE_NUMBER, type=int)
+        cursor = request.args.get('cursor', type=str)
         per_page = ITEMS_PER_PAGE
 
         search_query = request.args.get('search', '', type=str)
-        query = Quiz.query
-        if search_query:
-            query = query.filter(Quiz.title.ilike(f'%{search_query}%'))
+        query, order = search_crud.apply(Quiz.query, 'quiz', search_query)
 
         # Пагинация
-        quizzes = query.paginate(page=page, per_page=per_page, error_out=False)
+        quizzes = await quiz_crud.get_page(query, cursor, per_page, order)
 
+        statistic = await answer_statistic_crud.get_many(
+            'quiz',
+            [quiz.id for quiz in quizzes.items],
+        )
         quiz_data = [
             {
                 'id': quiz.id,
                 'title': quiz.title,
+                'total_answers': statistic.get(quiz.id, NO_DATA)[1],
+                'correct_percentage': statistic.get(quiz.id, NO_DATA)[3],
             }
             for quiz in quizzes.items
         ]
@@ -183,9 +204,24 @@ class QuizStatisticsView(NotVisibleMixin):
     @jwt_required()
     async def index(self) -> Response:
         """Выполняем запрос статистики для конкретной викторины."""
-        quiz_id = request.args.get('quiz_id')
+        quiz_id = request.args.get('quiz_id', type=int)
+        if quiz_id is None:
+            abort(HTTP_NOT_FOUND)
 
-        statictic = await quiz_crud.get_statistic(quiz_id)
+        statictic = await statistic_cache.get_or_compute(
+            f'quiz:{quiz_id}',
+            lambda: quiz_crud.get_statistic(quiz_id),
+        )
+
+        histogram = await statistic_cache.get_or_compute(
+            f'quiz_histogram:{quiz_id}',
+            lambda: answer_statistic_crud.get_score_histogram(quiz_id),
+        )
+
+        funnel = await statistic_cache.get_or_compute(
+            f'quiz_funnel:{quiz_id}',
+            lambda: answer_statistic_crud.get_funnel(quiz_id),
+        )
 
         (
             quiz_title,
@@ -200,4 +236,6 @@ class QuizStatisticsView(NotVisibleMixin):
             total_answers=total_answers,
             correct_answers=correct_answers,
             correct_percentage=correct_percentage,
+            histogram=histogram,
+            funnel=funnel,
         )
@@ -1,8 +1,8 @@
 import asyncio
 import time
-from datetime import datetime, timedelta
+from datetime import datetime
 from io import BytesIO
-from typing import Any, List
+from typing import Any, List, Optional
 
 import pandas as pd
 import requests
@@ -17,15 +17,16 @@ from openpyxl.styles import Alignment, Border, Font, PatternFill, Side
 from openpyxl.worksheet.worksheet import Worksheet
 
 from src.bot import bot
-from src.crud.category import category_crud
+from src.crud.dashboard import dashboard_statistic_crud
 from src.crud.excel_statistic import excel_statistic_crud
-from src.crud.question import question_crud
-from src.crud.quiz import quiz_crud
-from src.crud.quiz_result import quiz_result_crud
+from src.crud.export_watermark import export_watermark_crud
 from src.crud.telegram_user import telegram_user_crud
-from src.crud.user import user_crud
-from src.crud.user_answer import user_answer_crud
+from src.export_cache import export_cache
 from src.models.user import User
+from src.statistic_cache import statistic_cache
+
+DELTA_EXPORT_MESSAGE = 'Экспорт изменений завершен. Вот новые данные.'
+EMPTY_DELTA_MESSAGE = 'С прошлого экспорта новых данных нет.'
 
 
 class OverAllStatisticsView(BaseView):
@@ -40,73 +41,12 @@ class OverAllStatisticsView(BaseView):
         if not current_user.is_admin:
             return redirect(url_for('categories'))
 
-        now = datetime.utcnow()
-        last_day = now - timedelta(days=1)
-        last_week = now - timedelta(weeks=1)
-        last_month = now - timedelta(days=30)
-        today_start = datetime(now.year, now.month, now.day)
-
-        total_users = await user_crud.get_total_users()
-        total_users_played_quiz = (
-            await telegram_user_crud.get_total_users_played_quiz()
-        )
-        total_users_completed_quiz = (
-            await telegram_user_crud.get_total_users_completed_quiz()
-        )
-
-        new_users_last_day = await user_crud.get_new_users_since(last_day)
-        new_users_last_week = await user_crud.get_new_users_since(last_week)
-        new_users_last_month = await user_crud.get_new_users_since(last_month)
-        users_created_today = await user_crud.get_new_users_since(today_start)
-
-        users_played_quiz_last_day = (
-            await telegram_user_crud.get_users_played_quiz_since(last_day)
-        )
-        users_played_quiz_last_week = (
-            await telegram_user_crud.get_users_played_quiz_since(last_week)
-        )
-        users_played_quiz_last_month = (
-            await telegram_user_crud.get_users_played_quiz_since(last_month)
-        )
-
-        users_completed_quiz_last_day = (
-            await telegram_user_crud.get_users_completed_quiz_since(last_day)
-        )
-        users_completed_quiz_last_week = (
-            await telegram_user_crud.get_users_completed_quiz_since(last_week)
-        )
-        users_completed_quiz_last_month = (
-            await telegram_user_crud.get_users_completed_quiz_since(last_month)
-        )
-
-        total_completed_quizzes = (
-            await quiz_result_crud.get_total_completed_quizzes()
+        context = await statistic_cache.get_or_compute(
+            'overall',
+            lambda: dashboard_statistic_crud.get_overall_statistic(
+                datetime.utcnow(),
+            ),
         )
-        total_questions_answered = await user_answer_crud.get_total_answers()
-        total_questions = await question_crud.get_total_questions()
-        total_quizzes = await quiz_crud.get_total_quizzes()
-        total_categories = await category_crud.get_total_categories()
-
-        context = {
-            'total_users': total_users,
-            'total_users_played_quiz': total_users_played_quiz,
-            'total_users_completed_quiz': total_users_completed_quiz,
-            'new_users_last_day': new_users_last_day,
-            'new_users_last_week': new_users_last_week,
-            'new_users_last_month': new_users_last_month,
-            'users_played_quiz_last_day': users_played_quiz_last_day,
-            'users_played_quiz_last_week': users_played_quiz_last_week,
-            'users_played_quiz_last_month': users_played_quiz_last_month,
-            'users_completed_quiz_last_day': users_completed_quiz_last_day,
-            'users_completed_quiz_last_week': users_completed_quiz_last_week,
-            'users_completed_quiz_last_month': users_completed_quiz_last_month,
-            'users_created_today': users_created_today,
-            'total_completed_quizzes': total_completed_quizzes,
-            'total_questions_answered': total_questions_answered,
-            'total_questions': total_questions,
-            'total_quizzes': total_quizzes,
-            'total_categories': total_categories,
-        }
 
         return self.render('admin/statistics.html', **context)
 
@@ -124,37 +64,30 @@ class OverAllStatisticsView(BaseView):
             finally:
                 loop.close()
 
-        # Run async functions synchronously
-        users = run_async(telegram_user_crud.get_multi())
-
-        start_time = time.time()
-        # Сбор данных
-        df_user_statistics = run_async(collect_user_statistics(users))
-        df_answers = run_async(collect_answers_data())
-        df_quiz_results = run_async(collect_quiz_results_data())
-        df_category_statistics = run_async(collect_category_statistics())
-        df_quiz_statistics = run_async(collect_quiz_statistics())
-        df_question_statistics = run_async(collect_question_statistics())
-        print(f'Сбор данных занял: {time.time() - start_time}')
-
-        start_time = time.time()
-        # Создание Excel файла
-        excel_file = run_async(
-            save_to_excel(
-                df_user_statistics,
-                df_answers,
-                df_quiz_results,
-                df_category_statistics,
-                df_quiz_statistics,
-                df_question_statistics,
-            ),
-        )
-        print(f'Создание excel файла заняло: {time.time() - start_time}')
-
         # Получаем chat_id из запроса
         data = request.get_json()
         chat_id = data.get('chat_id')
 
+        if data.get('incremental'):
+            # Экспорт изменений сдвигает отметку администратора, поэтому
+            # администратор определяется по токену, а не по телу запроса
+            verify_jwt_in_request()
+            admin = current_user
+            if not admin.is_admin:
+                return jsonify({'message': 'Экспорт недоступен.'}), 403
+            start_time = time.time()
+            run_async(export_incremental(admin, admin.telegram_id))
+            print(f'Экспорт изменений занял: {time.time() - start_time}')
+            return jsonify({'message': 'Сообщение и файл успешно отправлены.'})
+
+        fingerprint = run_async(excel_statistic_crud.get_data_fingerprint())
+        excel_file = export_cache.get(fingerprint)
+        if excel_file is None:
+            excel_file = run_async(export_full())
+            export_cache.put(fingerprint, excel_file)
+        else:
+            print(f'Экспорт взят из кэша: {fingerprint}')
+
         start_time = time.time()
         # Отправка сообщения и файла в Telegram
         run_async(send_telegram_message_and_file(chat_id, excel_file))
@@ -163,6 +96,76 @@ class OverAllStatisticsView(BaseView):
         return jsonify({'message': 'Сообщение и файл успешно отправлены.'})
 
 
+async def export_full() -> BytesIO:
+    """Собирает полный экспорт статистики в Excel файл."""
+    users = await telegram_user_crud.get_multi()
+
+    start_time = time.time()
+    # Сбор данных
+    df_user_statistics = await collect_user_statistics(users)
+    df_answers = await collect_answers_data()
+    df_quiz_results = await collect_quiz_results_data()
+    df_category_statistics = await collect_category_statistics()
+    df_quiz_statistics = await collect_quiz_statistics()
+    df_question_statistics = await collect_question_statistics()
+    df_variant_statistics = await collect_variant_statistics()
+    df_score_histograms = await collect_score_histograms()
+    print(f'Сбор данных занял: {time.time() - start_time}')
+
+    start_time = time.time()
+    # Создание Excel файла
+    excel_file = await save_to_excel(
+        df_user_statistics,
+        df_answers,
+        df_quiz_results,
+        df_category_statistics,
+        df_quiz_statistics,
+        df_question_statistics,
+        df_variant_statistics,
+        df_score_histograms,
+    )
+    print(f'Создание excel файла заняло: {time.time() - start_time}')
+    return excel_file
+
+
+async def export_incremental(admin: User, chat_id: int) -> None:
+    """Экспорт новых ответов и измененных результатов с прошлого экспорта."""
+    watermark = await export_watermark_crud.get_by_user(admin.id)
+    exported_on = datetime.utcnow()
+    (
+        last_answer_id,
+        last_result_id,
+    ) = await excel_statistic_crud.get_export_watermarks()
+
+    df_answers = await collect_answers_data(
+        after_id=watermark.last_answer_id if watermark else 0,
+        up_to_id=last_answer_id,
+    )
+    df_quiz_results = await collect_quiz_results_data(
+        after_id=watermark.last_result_id if watermark else 0,
+        up_to_id=last_result_id,
+        changed_since=watermark.exported_on if watermark else None,
+    )
+
+    if df_answers.empty and df_quiz_results.empty:
+        await send_telegram_message(chat_id, EMPTY_DELTA_MESSAGE)
+    else:
+        excel_file = await save_delta_to_excel(df_answers, df_quiz_results)
+        await send_telegram_message_and_file(
+            chat_id,
+            excel_file,
+            message=DELTA_EXPORT_MESSAGE,
+            file_name='exported_delta.xlsx',
+        )
+
+    await export_watermark_crud.advance(
+        admin.id,
+        last_answer_id=last_answer_id,
+        last_result_id=last_result_id,
+        exported_on=exported_on,
+    )
+
+
 async def collect_user_statistics(users: List[User]) -> pd.DataFrame:
     """Статистика пользователей."""
     user_data = []
@@ -193,15 +196,29 @@ async def collect_user_statistics(users: List[User]) -> pd.DataFrame:
     return pd.DataFrame(user_data)
 
 
-async def collect_answers_data() -> pd.DataFrame:
+async def collect_answers_data(
+    after_id: int = 0,
+    up_to_id: Optional[int] = None,
+) -> pd.DataFrame:
     """Данные о ответах пользователей."""
-    answers_data = await excel_statistic_crud.get_user_answers_for_excel()
+    answers_data = await excel_statistic_crud.get_user_answers_for_excel(
+        after_id=after_id,
+        up_to_id=up_to_id,
+    )
     return pd.DataFrame(answers_data)
 
 
-async def collect_quiz_results_data() -> pd.DataFrame:
+async def collect_quiz_results_data(
+    after_id: int = 0,
+    up_to_id: Optional[int] = None,
+    changed_since: Optional[datetime] = None,
+) -> pd.DataFrame:
     """Данные о результатах викторин."""
-    quiz_results_data = await excel_statistic_crud.get_quiz_results_for_excel()
+    quiz_results_data = await excel_statistic_crud.get_quiz_results_for_excel(
+        after_id=after_id,
+        up_to_id=up_to_id,
+        changed_since=changed_since,
+    )
     return pd.DataFrame(quiz_results_data)
 
 
@@ -223,6 +240,18 @@ async def collect_question_statistics() -> pd.DataFrame:
     return pd.DataFrame(question_quiz)
 
 
+async def collect_variant_statistics() -> pd.DataFrame:
+    """Собирает распределение выбора вариантов ответа."""
+    variant_statistic = await excel_statistic_crud.get_variants_for_excel()
+    return pd.DataFrame(variant_statistic)
+
+
+async def collect_score_histograms() -> pd.DataFrame:
+    """Собирает гистограммы результатов викторин."""
+    histograms = await excel_statistic_crud.get_score_histograms_for_excel()
+    return pd.DataFrame(histograms)
+
+
 async def save_to_excel(
     df_user_statistics: pd.DataFrame,
     df_answers: pd.DataFrame,
@@ -230,6 +259,8 @@ async def save_to_excel(
     df_category_statistics: pd.DataFrame,
     df_quiz_statistics: pd.DataFrame,
     df_question_statistics: pd.DataFrame,
+    df_variant_statistics: pd.DataFrame,
+    df_score_histograms: pd.DataFrame,
 ) -> BytesIO:
     """Сохраняет данные в Excel файл."""
     excel_file = BytesIO()
@@ -285,14 +316,49 @@ async def save_to_excel(
         worksheet = writer.sheets['Обобщенная статистика']
         await format_excel_columns(worksheet)
 
+        if not df_variant_statistics.empty:
+            df_variant_statistics.to_excel(
+                writer,
+                sheet_name='Выбор вариантов',
+                index=False,
+            )
+            await format_excel_columns(writer.sheets['Выбор вариантов'])
+
+        if not df_score_histograms.empty:
+            df_score_histograms.to_excel(
+                writer,
+                sheet_name='Гистограммы результатов',
+                index=False,
+            )
+            await format_excel_columns(
+                writer.sheets['Гистограммы результатов'],
+            )
+
     excel_file.seek(0)  # Возврат к началу файла для чтения
     return excel_file
 
 
-async def send_telegram_message_and_file(chat_id: int, file: BytesIO) -> None:
-    """Отправляет сообщение и файл пользователю через Telegram API."""
-    message = 'Экспорт завершен. Вот ваши данные.'
+async def save_delta_to_excel(
+    df_answers: pd.DataFrame,
+    df_quiz_results: pd.DataFrame,
+) -> BytesIO:
+    """Сохраняет изменения с прошлого экспорта в Excel файл."""
+    excel_file = BytesIO()
+    with pd.ExcelWriter(excel_file, engine='openpyxl') as writer:
+        for df, sheet_name in (
+            (df_answers, 'Новые ответы'),
+            (df_quiz_results, 'Измененные результаты'),
+        ):
+            if not df.empty:
+                df.to_excel(writer, sheet_name=sheet_name, index=False)
+                await format_excel_columns(writer.sheets[sheet_name])
+
+    excel_file.seek(0)  # Возврат к началу файла для чтения
+    return excel_file
 
+
+async def send_telegram_message(chat_id: int, message: str) -> None:
+    """Отправляет сообщение пользователю через Telegram API."""
     response_message = requests.post(
         f'https://api.telegram.org/bot{bot.token}/sendMessage',
         data={'chat_id': chat_id, 'text': message},
@@ -301,11 +367,21 @@ async def send_telegram_message_and_file(chat_id: int, file: BytesIO) -> None:
     if response_message.status_code != 200:
         raise Exception('Не удалось отправить сообщение в бот')
 
+
+async def send_telegram_message_and_file(
+    chat_id: int,
+    file: BytesIO,
+    message: str = 'Экспорт завершен. Вот ваши данные.',
+    file_name: str = 'exported_data.xlsx',
+) -> None:
+    """Отправляет сообщение и файл пользователю через Telegram API."""
+    await send_telegram_message(chat_id, message)
+
     current_datetime = datetime.now().strftime('%Y-%m-%d_%H-%M')
     response_file = requests.post(
         f'https://api.telegram.org/bot{bot.token}/sendDocument',
         data={'chat_id': chat_id},
-        files={'document': (f'{current_datetime} exported_data.xlsx', file)},
+        files={'document': (f'{current_datetime} {file_name}', file)},
     )
 
     if response_file.status_code != 200:
@@ -1,21 +1,22 @@
-from typing import Any
+from typing import Any, Optional
 
 from flask import Response, request
 from flask_admin import BaseView, expose
 from flask_jwt_extended import jwt_required
-from sqlalchemy import String, cast, func
 
 from src import app, cache
 from src.admin.base import CustomAdminView, NotVisibleMixin
 from src.constants import (
-    DEFAULT_PAGE_NUMBER,
     HTTP_NOT_FOUND,
     ITEMS_PER_PAGE,
     USER_NOT_FOUND_MESSAGE,
 )
+from src.crud.answer_statistic import answer_statistic_crud
 from src.crud.quiz_result import quiz_result_crud
-from src.crud.user_answer import user_answer_crud
+from src.crud.search import search_crud
+from src.crud.telegram_user import telegram_user_crud
 from src.models.telegram_user import TelegramUser
+from src.statistic_cache import statistic_cache
 
 
 class UserAdmin(CustomAdminView):
@@ -71,30 +72,25 @@ class UserListView(BaseView):
 
     @expose('/')
     @jwt_required()
-    def index(self) -> Response:
+    async def index(self) -> Response:
         """Создание списка для статистики пользователей."""
-        page = request.args.get('page', DEFAULT_PAGE_NUMBER, type=int)
+        cursor = request.args.get('cursor', type=str)
         per_page = ITEMS_PER_PAGE
 
         search_query = request.args.get('search', '', type=str)
-        query = TelegramUser.query
-        if search_query:
-            if search_query.isdigit():
-                search_query = int(search_query)
-                query = query.filter(
-                    cast(TelegramUser.telegram_id, String).ilike(
-                        f'%{search_query}%',
-                    ),
-                )
-            else:
-                query = query.filter(
-                    func.concat(
-                        TelegramUser.last_name, ' ', TelegramUser.first_name,
-                    ).ilike(f'%{search_query}%'),
-                )
+        query, order = search_crud.apply(
+            TelegramUser.query,
+            'user',
+            search_query,
+        )
 
         # Пагинация
-        users = query.paginate(page=page, per_page=per_page, error_out=False)
+        users = await telegram_user_crud.get_page(
+            query,
+            cursor,
+            per_page,
+            order,
+        )
 
         user_data = [
             {
@@ -122,35 +118,50 @@ class UserStatisticsView(NotVisibleMixin):
     @jwt_required()
     async def index(self) -> Response:
         """Cтатистика конкретного пользователя."""
-        user_id = request.args.get('user_id')
-        if not user_id:
-            return USER_NOT_FOUND_MESSAGE, HTTP_NOT_FOUND
-        user = TelegramUser.query.get(user_id)
-        if not user:
+        user_id = request.args.get('user_id', type=int)
+        if user_id is None:
             return USER_NOT_FOUND_MESSAGE, HTTP_NOT_FOUND
-        quiz_results = await quiz_result_crud.get_results_by_user(
-            user_id=user.id,
-            tg_user=True,
-        )
-        user_answers = await user_answer_crud.get_results_by_user(
-            user_id=user.id,
-            tg_user=True,
-        )
-        total_questions_answered = len(user_answers)
-        total_correct_answers = sum(
-            1 for answer in user_answers if answer.is_right
-        )
-        correct_percentage = (
-            (total_correct_answers / total_questions_answered * 100)
-            if total_questions_answered > 0
-            else 0
-        )
-
-        return self.render(
-            'admin/user_statistics.html',
-            user=user,
-            total_questions_answered=total_questions_answered,
-            total_correct_answers=total_correct_answers,
-            correct_percentage=round(correct_percentage),
-            quiz_results=quiz_results,
+        context = await statistic_cache.get_or_compute(
+            f'user:{user_id}',
+            lambda: collect_user_statistic(user_id),
         )
+        if context is None:
+            return USER_NOT_FOUND_MESSAGE, HTTP_NOT_FOUND
+        return self.render('admin/user_statistics.html', **context)
+
+
+async def collect_user_statistic(user_id: int) -> Optional[dict]:
+    """Собирает статистику телеграм пользователя для страницы."""
+    user = TelegramUser.query.get(user_id)
+    if not user:
+        return None
+    quiz_results = await quiz_result_crud.get_results_by_user(
+        user_id=user.id,
+        tg_user=True,
+    )
+    (
+        total_questions_answered,
+        total_correct_answers,
+    ) = await answer_statistic_crud.get_user_totals(user.id)
+    correct_percentage = (
+        (total_correct_answers / total_questions_answered * 100)
+        if total_questions_answered > 0
+        else 0
+    )
+
+    # Храним в кэше простые словари, а не объекты сессии
+    return {
+        'user': {'name': user.name},
+        'total_questions_answered': total_questions_answered,
+        'total_correct_answers': total_correct_answers,
+        'correct_percentage': round(correct_percentage),
+        'quiz_results': [
+            {
+                'quiz': {'title': result.quiz.title},
+                'attempt': result.attempt,
+                'total_questions': result.total_questions,
+                'correct_answers_count': result.correct_answers_count,
+            }
+            for result in quiz_results
+        ],
+    }
@@ -0,0 +1,95 @@
+import logging
+import os
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from .crud.user_answer import user_answer_crud
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerArchive:
+
+    """Архив старых ответов без пользователя в файлах Parquet.
+
+    После удаления профиля (и перезапусков викторины до появления
+    попыток) ответы остаются в user_answers с user_id = NULL.
+    Они уже учтены в накопительных
+    таблицах статистики, поэтому старые ответы переносятся на диск
+    по месяцам и удаляются из базы. Их счетчики остаются в таблице
+    archived_answer_statistics для пересборки статистики.
+
+    """
+
+    compression = 'zstd'
+
+    def __init__(self, directory: str, batch_size: int) -> None:
+        """Директория архива и размер пачки ответов в одном файле."""
+        self.directory = directory
+        self.batch_size = batch_size
+
+    def _path(
+        self,
+        month: Optional[datetime],
+        first_id: int,
+        last_id: int,
+    ) -> str:
+        """Путь к файлу пачки ответов за месяц."""
+        month_name = month.strftime('%Y-%m') if month else 'unknown'
+        return os.path.join(
+            self.directory,
+            month_name,
+            f'user_answers_{first_id}_{last_id}.parquet',
+        )
+
+    def _write(self, path: str, rows: list) -> None:
+        """Записать пачку атомарно: сначала во временный файл."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f'{path}.tmp'
+        pd.DataFrame(rows).to_parquet(
+            tmp_path,
+            compression=self.compression,
+            index=False,
+        )
+        os.replace(tmp_path, path)
+
+    async def archive(self, before: datetime) -> int:
+        """Перенести ответы без пользователя старше даты в архив.
+
+        Пачка удаляется из базы только после того, как ее файл записан.
+        Повторный запуск после сбоя перезаписывает тот же файл.
+
+        Keyword Arguments:
+        -----------------
+        before (datetime): архивировать ответы, данные раньше этой даты
+
+        """
+        archived = 0
+        for month in await user_answer_crud.get_orphaned_months(before):
+            after_id = 0
+            while True:
+                rows = await user_answer_crud.get_orphaned_batch(
+                    before,
+                    month,
+                    after_id=after_id,
+                    limit=self.batch_size,
+                )
+                if not rows:
+                    break
+                ids = [row['id'] for row in rows]
+                path = self._path(month, ids[0], ids[-1])
+                self._write(path, rows)
+                await user_answer_crud.delete_archived(ids)
+                archived += len(ids)
+                after_id = ids[-1]
+                logger.info(f'Архивировано ответов: {len(ids)} в {path}')
+        return archived
+
+
+answer_archive = AnswerArchive(
+    settings.ANSWERS_ARCHIVE_DIR,
+    batch_size=settings.ANSWERS_ARCHIVE_BATCH_SIZE,
+)
@@ -1,10 +1,36 @@
+import hashlib
+import json
 from http import HTTPStatus
+from typing import Any, Optional, Tuple
 
 from aiogram.types import Update
-from flask import Response, request
+from flask import Response, jsonify, request, url_for
+from flask_jwt_extended import current_user, jwt_required
 
-from . import app, bot
+from . import app, bot, cache
+from .constants import (
+    HTTP_BAD_REQUEST,
+    HTTP_NOT_FOUND,
+    HTTP_UNPROCESSABLE_ENTITY,
+    IDEMPOTENCY_KEY_REUSED,
+    QUIZ_NOT_FOUND,
+    WRONG_ANSWERS_BATCH,
+)
+from .crud.base import batch
+from .crud.question import question_crud
+from .crud.quiz import AnswerVariant, quiz_crud
+from .crud.quiz_result import quiz_result_crud
+from .crud.telegram_user import telegram_user_crud
+from .crud.user_answer import user_answer_crud
+from .quiz_snapshot import quiz_snapshots
+from .rate_limit import current_telegram_id, rate_limiter
 from .settings import settings
+from .views.question import complete_quiz_result, record_answer
+
+# Статусы ответа в пачке
+SAVED = 'saved'
+DUPLICATE = 'duplicate'
+INVALID = 'invalid'
 
 
 @app.post(settings.WEBHOOK_PATH)
@@ -17,3 +43,223 @@ async def webhook() -> Response:
     )
     await bot.dp.feed_update(bot.bot, update)
     return Response(status=HTTPStatus.OK)
+
+
+def _as_id(value: Any) -> Optional[int]:
+    """Идентификатор из JSON или None, если это не целое число."""
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    return None
+
+
+async def _answered_questions(quiz_id: int, attempt: int) -> set:
+    """Вопросы, на которые пользователь ответил в попытке."""
+    return {
+        answer.question_id
+        for answer in await user_answer_crud.get_results_by_user_and_quiz(
+            current_user.id,
+            quiz_id,
+            attempt=attempt,
+        )
+    }
+
+
+def _answer_result(
+    question_id: Optional[int],
+    answer_id: Optional[int],
+    chosen_answer: Optional[AnswerVariant],
+    status: str,
+) -> dict:
+    """Результат ответа из пачки.
+
+    Правильность и пояснение отдаются только для сохраненного ответа.
+    """
+    result = {
+        'question_id': question_id,
+        'answer_id': answer_id,
+        'status': status,
+    }
+    if status == SAVED:
+        result['is_right'] = chosen_answer.is_right_choice
+        result['description'] = chosen_answer.description
+    return result
+
+
+def _saved_response(
+    cache_key: str,
+    answers_hash: str,
+) -> Optional[Tuple[Response, HTTPStatus]]:
+    """Сохраненный ответ на пачку с тем же Idempotency-Key.
+
+    Если ключ уже использован для другой пачки ответов,
+    возвращается ошибка 422.
+    """
+    saved = cache.get(cache_key)
+    if saved is None:
+        return None
+    if saved['answers_hash'] != answers_hash:
+        return jsonify(error=IDEMPOTENCY_KEY_REUSED), HTTP_UNPROCESSABLE_ENTITY
+    return jsonify(saved['response']), HTTPStatus.OK
+
+
+@app.get('/api/quizzes/<int:quiz_id>')
+@jwt_required()
+async def quiz_snapshot(quiz_id: int) -> Tuple[Response, HTTPStatus]:
+    """Вся викторина одним запросом для прохождения в WebApp.
+
+    Вместе с вопросами и вариантами отдается прогресс текущей
+    попытки, чтобы прохождение можно было продолжить. Правильность
+    и пояснение варианта отдаются только в ответе на его выбор.
+    """
+    quiz = await quiz_crud.get_by_id(quiz_id)
+    if quiz is None:
+        return jsonify(error=QUIZ_NOT_FOUND), HTTP_NOT_FOUND
+
+    snapshot = await quiz_snapshots.get(quiz_id)
+    quiz_result = await quiz_result_crud.get_by_user_and_quiz(
+        current_user.id,
+        quiz_id,
+    )
+    attempt = quiz_result.attempt if quiz_result else 1
+    questions = [
+        {
+            'id': question.id,
+            'title': question.title,
+            'image_url': url_for(
+                'get_question_image',
+                question_id=question.id,
+            ),
+            'variants': [
+                {'id': variant.id, 'title': variant.title}
+                for variant in snapshot.variants.get(question.id, {}).values()
+            ],
+        }
+        for question in await question_crud.get_all_by_quiz_id(quiz_id)
+    ]
+    return jsonify(
+        id=quiz.id,
+        title=quiz.title,
+        attempt=attempt,
+        is_complete=bool(quiz_result and quiz_result.is_complete),
+        answered_question_ids=sorted(
+            await _answered_questions(quiz_id, attempt),
+        ),
+        questions=questions,
+    ), HTTPStatus.OK
+
+
+@app.post('/api/quizzes/<int:quiz_id>/answers')
+@jwt_required()
+@rate_limiter.limit(
+    'answer',
+    settings.RATE_LIMIT_ANSWER,
+    telegram_id=current_telegram_id,
+)
+async def submit_answers(quiz_id: int) -> Tuple[Response, HTTPStatus]:
+    """Принять пачку ответов WebApp.
+
+    Тело запроса: {"answers": [{"question_id": 1, "answer_id": 2}]}.
+    Ответ на уже отвеченный в попытке вопрос не сохраняется повторно,
+    вариант не из снимка викторины отклоняется. Повтор запроса
+    с тем же заголовком Idempotency-Key возвращает сохраненный ответ
+    без записи в базу, тот же ключ с другой пачкой отклоняется.
+    Ответы записываются в порядке question_id, правильность
+    и пояснение возвращаются только для сохраненных ответов.
+    Когда отвечены все вопросы, прохождение
+    завершается.
+    """
+    answers = (request.get_json(silent=True) or {}).get('answers')
+    if (
+        not isinstance(answers, list)
+        or not answers
+        or len(answers) > settings.API_ANSWERS_BATCH_SIZE
+    ):
+        return jsonify(error=WRONG_ANSWERS_BATCH), HTTP_BAD_REQUEST
+
+    idempotency_key = request.headers.get('Idempotency-Key')
+    cache_key = (
+        f'api:answers:{current_user.id}:{quiz_id}:{idempotency_key}'
+    )
+    answers_hash = hashlib.sha256(
+        json.dumps(answers, sort_keys=True).encode(),
+    ).hexdigest()
+    if idempotency_key:
+        saved = _saved_response(cache_key, answers_hash)
+        if saved is not None:
+            return saved
+
+    snapshot = await quiz_snapshots.get(quiz_id)
+    tg_user_id = (
+        await telegram_user_crud.get_by_telegram_id(current_user.telegram_id)
+    ).id
+    quiz_result = await quiz_result_crud.get_by_user_and_quiz(
+        current_user.id,
+        quiz_id,
+    )
+    answered = await _answered_questions(
+        quiz_id,
+        quiz_result.attempt if quiz_result else 1,
+    )
+    items = []
+    for item in answers:
+        item = item if isinstance(item, dict) else {}
+        question_id = _as_id(item.get('question_id'))
+        answer_id = _as_id(item.get('answer_id'))
+        items.append(
+            (
+                question_id,
+                answer_id,
+                snapshot.get_variant(question_id, answer_id),
+            ),
+        )
+    statuses = [INVALID] * len(items)
+    # Ответы записываются по возрастанию question_id: параллельные
+    # пачки блокируют общие строки накопительной статистики в одном
+    # порядке и не ждут друг друга по кругу
+    record_order = sorted(
+        (index for index, item in enumerate(items) if item[2] is not None),
+        key=lambda index: items[index][:2],
+    )
+    # Вся пачка сохраняется одной транзакцией
+    with batch(expire_on_commit=False):
+        for index in record_order:
+            question_id, _, chosen_answer = items[index]
+            if question_id in answered:
+                statuses[index] = DUPLICATE
+                continue
+            saved_result = await record_answer(
+                current_user.id,
+                tg_user_id,
+                quiz_id,
+                chosen_answer,
+            )
+            answered.add(question_id)
+            # Ответ мог сохранить параллельный запрос
+            statuses[index] = DUPLICATE if saved_result is None else SAVED
+            quiz_result = saved_result or quiz_result
+        if SAVED in statuses:
+            if not quiz_result.is_complete and answered.issuperset(
+                snapshot.variants,
+            ):
+                await complete_quiz_result(quiz_result)
+            await telegram_user_crud.mark_active(tg_user_id)
+
+    response = {
+        'attempt': quiz_result.attempt if quiz_result else 1,
+        'answers': [
+            _answer_result(*item, status)
+            for item, status in zip(items, statuses)
+        ],
+        'total_questions': quiz_result.total_questions if quiz_result else 0,
+        'correct_answers_count': (
+            quiz_result.correct_answers_count if quiz_result else 0
+        ),
+        'is_complete': bool(quiz_result and quiz_result.is_complete),
+    }
+    if idempotency_key:
+        cache.set(
+            cache_key,
+            {'answers_hash': answers_hash, 'response': response},
+            timeout=settings.API_IDEMPOTENCY_TTL,
+        )
+    return jsonify(response), HTTPStatus.OK
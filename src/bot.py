@@ -1,5 +1,7 @@
+from typing import Any, Awaitable, Callable, Dict, Optional
+
 import emoji
-from aiogram import Bot, Dispatcher
+from aiogram import BaseMiddleware, Bot, Dispatcher
 from aiogram.client.default import DefaultBotProperties
 from aiogram.enums import ParseMode
 from aiogram.filters import Command
@@ -14,8 +16,10 @@ from aiogram.types import (
 
 from . import app
 from .constants import BAN_WARN_MESSAGE
+from .crud.base import batch
 from .crud.telegram_user import telegram_user_crud
 from .crud.user import user_crud
+from .rate_limit import rate_limiter
 from .settings import settings
 
 bot: Bot = Bot(
@@ -23,8 +27,32 @@ bot: Bot = Bot(
     default=DefaultBotProperties(parse_mode=ParseMode.HTML),
 )
 
+
+class RateLimitMiddleware(BaseMiddleware):
+
+    """Пропускает сообщения пользователя сверх лимита без обработки."""
+
+    async def __call__(
+        self,
+        handler: Callable[[Message, Dict[str, Any]], Awaitable[Any]],
+        event: Message,
+        data: Dict[str, Any],
+    ) -> Optional[Any]:
+        """Проверка лимита по telegram id отправителя."""
+        telegram_id = event.from_user.id if event.from_user else None
+        if not rate_limiter.hit(
+            'bot',
+            settings.RATE_LIMIT_BOT,
+            telegram_id=telegram_id,
+        ):
+            app.logger.info(f'Лимит сообщений бота превышен: {telegram_id}')
+            return None
+        return await handler(event, data)
+
+
 # Диспетчер
 dp: Dispatcher = Dispatcher()
+dp.message.outer_middleware(RateLimitMiddleware())
 
 
 def create_reply_keyboard() -> ReplyKeyboardMarkup:
@@ -55,46 +83,48 @@ async def cmd_start(message: Message) -> None:
     """
     tg_user = message.from_user
     tg_user_id = tg_user.id
-    user = await user_crud.get_by_telegram_id(tg_user_id)
-    if user is None:
-        name = tg_user.full_name
-        username = tg_user.username
-        tg_user_id = tg_user.id
-        is_admin = (await user_crud.get_multi()) == []
-        await user_crud.create(
-            {
-                'name': name,
-                'username': username,
-                'telegram_id': tg_user_id,
-                'is_admin': is_admin,
-            },
-        )
-        app.logger.info(
-            f'Пользователь {name} ({username}) зарегистрирован в боте.',
-        )
-
-    if not (await telegram_user_crud.exists_by_telegram_id(tg_user.id)):
-        username = tg_user.username
-        first_name = tg_user.first_name
-        last_name = tg_user.last_name
-        is_premium = tg_user.is_premium
-        added_to_attachment_menu = tg_user.added_to_attachment_menu
-        language_code = tg_user.language_code
-
-        await telegram_user_crud.create(
-            {
-                'telegram_id': tg_user_id,
-                'first_name': first_name,
-                'last_name': last_name,
-                'username': username,
-                'language_code': language_code,
-                'is_premium': is_premium,
-                'added_to_attachment_menu': added_to_attachment_menu,
-            },
-        )
-        app.logger.info(
-            f'Пользователь {tg_user_id} зарегистрирован в TelegramUser.',
-        )
+    # Пользователь и телеграм пользователь создаются одной транзакцией
+    with batch():
+        user = await user_crud.get_by_telegram_id(tg_user_id)
+        if user is None:
+            name = tg_user.full_name
+            username = tg_user.username
+            tg_user_id = tg_user.id
+            is_admin = (await user_crud.get_multi()) == []
+            await user_crud.create(
+                {
+                    'name': name,
+                    'username': username,
+                    'telegram_id': tg_user_id,
+                    'is_admin': is_admin,
+                },
+            )
+            app.logger.info(
+                f'Пользователь {name} ({username}) зарегистрирован в боте.',
+            )
+
+        if not (await telegram_user_crud.exists_by_telegram_id(tg_user.id)):
+            username = tg_user.username
+            first_name = tg_user.first_name
+            last_name = tg_user.last_name
+            is_premium = tg_user.is_premium
+            added_to_attachment_menu = tg_user.added_to_attachment_menu
+            language_code = tg_user.language_code
+
+            await telegram_user_crud.create(
+                {
+                    'telegram_id': tg_user_id,
+                    'first_name': first_name,
+                    'last_name': last_name,
+                    'username': username,
+                    'language_code': language_code,
+                    'is_premium': is_premium,
+                    'added_to_attachment_menu': added_to_attachment_menu,
+                },
+            )
+            app.logger.info(
+                f'Пользователь {tg_user_id} зарегистрирован в TelegramUser.',
+            )
 
     # Отправляем приветственное сообщение с кнопкой 'Start'
     await message.answer(
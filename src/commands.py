@@ -0,0 +1,102 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import click
+from flask.cli import AppGroup
+
+from . import app
+from .answer_archive import answer_archive
+from .crud.statistic_rollup import statistic_rollup_crud
+from .index_audit import IndexAudit
+from .statement_benchmark import run_benchmark
+
+statistics_cli = AppGroup(
+    'statistics',
+    help='Обслуживание накопительных таблиц статистики.',
+)
+
+
+@statistics_cli.command('rebuild')
+def rebuild_statistics() -> None:
+    """Пересобрать таблицы статистики из ответов и результатов викторин."""
+    asyncio.run(statistic_rollup_crud.rebuild())
+    click.echo('Таблицы статистики пересобраны.')
+
+
+@statistics_cli.command('archive-answers')
+@click.option(
+    '--days',
+    default=180,
+    show_default=True,
+    help='Архивировать ответы старше указанного количества дней.',
+)
+def archive_answers(days: int) -> None:
+    """Перенести старые ответы без пользователя в файлы Parquet."""
+    before = datetime.utcnow() - timedelta(days=days)
+    archived = asyncio.run(answer_archive.archive(before))
+    click.echo(f'Архивировано ответов: {archived}.')
+
+
+indexes_cli = AppGroup(
+    'indexes',
+    help='Проверка индексов под запросы круд классов.',
+)
+
+
+@indexes_cli.command('audit')
+@click.option(
+    '--users',
+    default=5000,
+    show_default=True,
+    help='Количество тестовых пользователей.',
+)
+@click.option(
+    '--test-database',
+    is_flag=True,
+    help='Подтвердить, что настроена тестовая база.',
+)
+def audit_indexes(users: int, test_database: bool) -> None:
+    """Найти последовательное чтение больших таблиц в запросах.
+
+    Тестовые данные добавляются в транзакции, которая откатывается.
+    Команда пишет в настроенную базу, поэтому запускается только
+    с флагом --test-database. Команда завершается с ошибкой,
+    если найдены проблемные запросы.
+    """
+    if not test_database:
+        raise click.UsageError(
+            'Команда добавляет тестовые данные в настроенную базу. '
+            'Запустите ее на тестовой базе с флагом --test-database.',
+        )
+    problems = asyncio.run(IndexAudit(users).run())
+    for name, table, statement in problems:
+        click.echo(f'{name}: Seq Scan по {table}\n{statement}\n')
+    if problems:
+        raise click.ClickException(
+            f'Последовательное чтение больших таблиц: {len(problems)}.',
+        )
+    click.echo('Последовательного чтения больших таблиц не найдено.')
+
+
+statements_cli = AppGroup(
+    'statements',
+    help='Запросы круд классов, собранные заранее.',
+)
+
+
+@statements_cli.command('benchmark')
+@click.option(
+    '--calls',
+    default=2000,
+    show_default=True,
+    help='Количество вызовов для каждого запроса.',
+)
+def benchmark_statements(calls: int) -> None:
+    """Сравнить сборку запроса на каждом вызове и собранный заранее."""
+    for name, before, after in run_benchmark(calls):
+        click.echo(f'{name}: {before:.1f} мкс -> {after:.1f} мкс')
+
+
+app.cli.add_command(statistics_cli)
+app.cli.add_command(indexes_cli)
+app.cli.add_command(statements_cli)
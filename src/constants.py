@@ -1,6 +1,9 @@
 from http import HTTPStatus
 
 HTTP_NOT_FOUND = HTTPStatus.NOT_FOUND
+HTTP_BAD_REQUEST = HTTPStatus.BAD_REQUEST
+HTTP_TOO_MANY_REQUESTS = HTTPStatus.TOO_MANY_REQUESTS
+HTTP_UNPROCESSABLE_ENTITY = HTTPStatus.UNPROCESSABLE_ENTITY
 UNAUTHORIZED = HTTPStatus.UNAUTHORIZED
 PER_PAGE = 5
 DEFAULT_PAGE_NUMBER = 1
@@ -22,4 +25,14 @@ DELETE_ERROR_MESSAGE = (
 ERROR_FOR_CATEGORY = ' ни на один вопрос в этой рубрике.'
 ERROR_FOR_QUIZ = ' ни на один вопрос в этой викторине.'
 ERROR_FOR_QUESTION = ' на этот вопрос.'
+TOO_MANY_REQUESTS_MESSAGE = 'Слишком много запросов. Попробуйте позже.'
+QUIZ_NOT_FOUND = 'Викторина не найдена.'
+WRONG_ANSWERS_BATCH = (
+    'Ожидается непустой список answers не длиннее допустимой пачки.'
+)
+IDEMPOTENCY_KEY_REUSED = (
+    'Idempotency-Key уже использован для другой пачки ответов.'
+)
+WRONG_ANSWER_VARIANT = 'Вариант ответа не относится к вопросу викторины.'
 AT_LEAST_ONE_QUESTION = 'Викторина должна содержать хотя бы один вопрос.'
+SCORE_BUCKETS = tuple(range(0, 101, 10))
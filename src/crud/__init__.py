@@ -6,3 +6,8 @@ from .variant import variant_crud  # noqa
 from .quiz import quiz_crud  # noqa
 from .quiz_result import quiz_result_crud  # noqa
 from .telegram_user import telegram_user_crud  # noqa
+from .export_watermark import export_watermark_crud  # noqa
+from .dashboard import dashboard_statistic_crud  # noqa
+from .statistic_rollup import statistic_rollup_crud  # noqa
+from .answer_statistic import answer_statistic_crud  # noqa
+from .search import search_crud  # noqa
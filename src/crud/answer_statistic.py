@@ -0,0 +1,207 @@
+from typing import Dict, Iterable, List, Tuple
+
+from sqlalchemy import Float, cast, func, select
+
+from src import db
+from src.constants import SCORE_BUCKETS
+from src.models.category import Category
+from src.models.question import Question
+from src.models.quiz import Quiz
+from src.models.statistic_rollup import (
+    DailyAnswerStatistic,
+    QuizFunnelStep,
+    QuizScoreHistogram,
+    VariantStatistic,
+)
+from src.models.user_answer import UserAnswer
+from src.models.variant import Variant
+
+NO_DATA = ('Нет данных', 0, 0, 0)
+
+# Для каждого разреза: модель, колонка названия и условия присоединения
+# счетчиков ответов
+DIMENSIONS = {
+    'category': (
+        Category,
+        Category.name,
+        (
+            (Question, Question.category_id == Category.id),
+            (
+                DailyAnswerStatistic,
+                DailyAnswerStatistic.question_id == Question.id,
+            ),
+        ),
+    ),
+    'quiz': (
+        Quiz,
+        Quiz.title,
+        ((DailyAnswerStatistic, DailyAnswerStatistic.quiz_id == Quiz.id),),
+    ),
+    'question': (
+        Question,
+        Question.title,
+        (
+            (
+                DailyAnswerStatistic,
+                DailyAnswerStatistic.question_id == Question.id,
+            ),
+        ),
+    ),
+}
+
+
+class CRUDAnswerStatistic:
+
+    """Общий движок статистики ответов.
+
+    Считает всего ответов, правильных ответов и процент правильных
+    одним агрегатным запросом для рубрик, викторин и вопросов.
+
+    """
+
+    async def get_many(
+        self,
+        dimension: str,
+        obj_ids: Iterable[int],
+    ) -> Dict[int, Tuple]:
+        """Получить статистику сразу для нескольких объектов.
+
+        Keyword Arguments:
+        -----------------
+        dimension (str): разрез статистики: category, quiz или question
+        obj_ids (Iterable[int]): идентификаторы объектов
+
+        """
+        model, name_column, joins = DIMENSIONS[dimension]
+        obj_ids = [int(obj_id) for obj_id in obj_ids]
+        if not obj_ids:
+            return {}
+
+        total = func.coalesce(func.sum(DailyAnswerStatistic.answers_count), 0)
+        correct = func.coalesce(
+            func.sum(DailyAnswerStatistic.correct_count),
+            0,
+        )
+        query = select(
+            model.id,
+            name_column,
+            total,
+            correct,
+            cast(
+                func.coalesce(
+                    func.round(correct * 100.0 / func.nullif(total, 0), 2),
+                    0,
+                ),
+                Float,
+            ),
+        ).select_from(model)
+        for target, onclause in joins:
+            query = query.outerjoin(target, onclause)
+        rows = db.session.execute(
+            query.where(model.id.in_(obj_ids)).group_by(
+                model.id,
+                name_column,
+            ),
+        )
+        return {row[0]: tuple(row[1:]) for row in rows}
+
+    async def get(self, dimension: str, obj_id: int) -> Tuple:
+        """Получить статистику объекта: название, всего, верно, процент."""
+        try:
+            statistic = await self.get_many(dimension, [obj_id])
+            return statistic.get(int(obj_id), NO_DATA)
+        except Exception:
+            db.session.rollback()
+            return NO_DATA
+
+    async def get_user_totals(self, tg_user_id: int) -> Tuple[int, int]:
+        """Получить количество всех и правильных ответов пользователя."""
+        total_answers, correct_answers = db.session.execute(
+            select(
+                func.count(UserAnswer.id),
+                func.count(UserAnswer.id).filter(UserAnswer.is_right),
+            ).where(UserAnswer.tg_user_id == tg_user_id),
+        ).one()
+        return total_answers, correct_answers
+
+    async def get_variant_distribution(
+        self,
+        question_id: int,
+    ) -> List[Tuple]:
+        """Получить распределение выбора вариантов ответа на вопрос.
+
+        Возвращает название варианта, флаг правильного ответа,
+        сколько раз вариант выбран и долю от всех ответов на вопрос.
+        Варианты, которые ни разу не выбирали, тоже попадают в список.
+        """
+        chosen = func.coalesce(VariantStatistic.answers_count, 0)
+        total = func.sum(chosen).over()
+        rows = db.session.execute(
+            select(
+                Variant.title,
+                Variant.is_right_choice,
+                chosen,
+                cast(
+                    func.coalesce(
+                        func.round(chosen * 100.0 / func.nullif(total, 0), 2),
+                        0,
+                    ),
+                    Float,
+                ),
+            )
+            .outerjoin(
+                VariantStatistic,
+                VariantStatistic.variant_id == Variant.id,
+            )
+            .where(Variant.question_id == int(question_id))
+            .order_by(chosen.desc(), Variant.id),
+        )
+        return [tuple(row) for row in rows]
+
+    async def get_score_histogram(self, quiz_id: int) -> List[Tuple[int, int]]:
+        """Получить гистограмму результатов викторины.
+
+        Возвращает пары (корзина, количество прохождений) для всех
+        корзин от 0 до 100, включая пустые.
+        """
+        counts = dict(
+            db.session.execute(
+                select(
+                    QuizScoreHistogram.bucket,
+                    QuizScoreHistogram.results_count,
+                ).where(QuizScoreHistogram.quiz_id == int(quiz_id)),
+            ).all(),
+        )
+        return [(bucket, counts.get(bucket, 0)) for bucket in SCORE_BUCKETS]
+
+    async def get_funnel(self, quiz_id: int) -> List[Tuple]:
+        """Получить воронку прохождения викторины.
+
+        Для каждой позиции ответа возвращает количество прохождений,
+        долю от начавших викторину и сколько прохождений
+        остановилось на предыдущей позиции.
+        """
+        window = {'order_by': QuizFunnelStep.position}
+        started = func.first_value(QuizFunnelStep.users_count).over(**window)
+        previous = func.lag(QuizFunnelStep.users_count).over(**window)
+        rows = db.session.execute(
+            select(
+                QuizFunnelStep.position,
+                QuizFunnelStep.users_count,
+                cast(
+                    func.round(
+                        QuizFunnelStep.users_count * 100.0
+                        / func.nullif(started, 0),
+                        2,
+                    ),
+                    Float,
+                ),
+                func.coalesce(previous - QuizFunnelStep.users_count, 0),
+            )
+            .where(QuizFunnelStep.quiz_id == int(quiz_id))
+            .order_by(QuizFunnelStep.position),
+        )
+        return [tuple(row) for row in rows]
+
+
+answer_statistic_crud = CRUDAnswerStatistic()
@@ -1,8 +1,203 @@
-from typing import Optional
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+from typing import (
+    Any,
+    Callable,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
 
 from flask_sqlalchemy import model
+from flask_sqlalchemy.query import Query
+from itsdangerous import BadSignature, URLSafeSerializer
+from sqlalchemy import Numeric, and_, delete, insert, literal, or_, update
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ColumnElement
 
-from src import db
+from src import app, cache, db
+
+# Глубина вложенности batch() в текущем контексте (запросе, задаче)
+_batch_depth: ContextVar[int] = ContextVar('crud_batch_depth', default=0)
+
+# Ключ сортировки: выражение и флаг сортировки по убыванию
+OrderKey = Tuple[ColumnElement, bool]
+
+# Если оценка планировщика меньше порога, количество считается точно
+EXACT_COUNT_THRESHOLD = 10000
+TOTAL_CACHE_TIMEOUT = 60
+
+
+@contextmanager
+def batch(expire_on_commit: bool = True) -> Iterator[None]:
+    """Единица работы: круд методы внутри блока не коммитят.
+
+    Изменения отправляются в базу (flush), а коммит выполняется один раз
+    при выходе из внешнего блока. При ошибке транзакция откатывается.
+    Вложенные блоки входят в транзакцию внешнего.
+
+    Keyword Arguments:
+    -----------------
+    expire_on_commit (bool): сбрасывать ли загруженные объекты после
+        коммита. False позволяет читать их после блока без запросов.
+
+    """
+    depth = _batch_depth.get()
+    token = _batch_depth.set(depth + 1)
+    session = db.session()
+    previous = session.expire_on_commit
+    if depth == 0:
+        session.expire_on_commit = expire_on_commit
+    try:
+        yield
+        if depth == 0:
+            session.commit()
+    except Exception:
+        if depth == 0:
+            session.rollback()
+        raise
+    finally:
+        if depth == 0:
+            session.expire_on_commit = previous
+        _batch_depth.reset(token)
+
+
+def in_batch() -> bool:
+    """Выполняется ли код внутри batch()."""
+    return _batch_depth.get() > 0
+
+
+def commit() -> None:
+    """Закоммитить изменения или, внутри batch(), только отправить их."""
+    if in_batch():
+        db.session.flush()
+    else:
+        db.session.commit()
+
+
+class PrebuiltStatement:
+
+    """Запрос, собранный один раз и выполняемый с разными параметрами.
+
+    SQLAlchemy запоминает ключ кэша собранного запроса, поэтому
+    повторный вызов сразу находит скомпилированный SQL. Запрос
+    собирается при первом использовании: при импорте круд модулей
+    еще не все модели зарегистрированы.
+
+    """
+
+    def __init__(self, build: Callable[[], Executable]) -> None:
+        """Функция сборки запроса с параметрами bindparam."""
+        self.build = build
+        self._statement: Optional[Executable] = None
+
+    @property
+    def statement(self) -> Executable:
+        """Собранный запрос."""
+        if self._statement is None:
+            self._statement = self.build()
+        return self._statement
+
+
+class KeysetPage:
+
+    """Страница списка при постраничном выводе по ключу (keyset).
+
+    Вместо номера страницы используются непрозрачные курсоры
+    next_cursor и prev_cursor: следующий запрос продолжает чтение
+    после последней строки страницы, поэтому дальние страницы
+    стоят столько же, сколько первая.
+
+    """
+
+    def __init__(
+        self,
+        items: list,
+        next_cursor: Optional[str],
+        prev_cursor: Optional[str],
+        total: int,
+        total_is_estimate: bool,
+    ) -> None:
+        """Строки страницы, курсоры соседних страниц и общее количество."""
+        self.items = items
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+        self.total_is_estimate = total_is_estimate
+
+    @property
+    def has_next(self) -> bool:
+        """Есть ли следующая страница."""
+        return self.next_cursor is not None
+
+    @property
+    def has_prev(self) -> bool:
+        """Есть ли предыдущая страница."""
+        return self.prev_cursor is not None
+
+
+def _cursor_serializer() -> URLSafeSerializer:
+    """Подпись курсоров, чтобы в запрос не попадали чужие значения."""
+    return URLSafeSerializer(app.config['SECRET_KEY'], salt='keyset-cursor')
+
+
+def _dump_cursor(
+    serializer: URLSafeSerializer,
+    direction: str,
+    values: Sequence[Any],
+) -> str:
+    """Курсор из направления и значений ключей строки.
+
+    Decimal сохраняется строкой, чтобы значение вернулось в запрос
+    без потери точности через float.
+    """
+    return serializer.dumps(
+        [
+            direction,
+            [
+                str(value) if isinstance(value, Decimal) else value
+                for value in values
+            ],
+        ],
+    )
+
+
+def _key_literal(expression: ColumnElement, value: Any) -> ColumnElement:
+    """Значение ключа из курсора с типом выражения сортировки."""
+    key_type = expression.type
+    if (
+        isinstance(key_type, Numeric)
+        and key_type.asdecimal
+        and value is not None
+    ):
+        value = Decimal(value)
+    return literal(value, key_type)
+
+
+def _seek_condition(
+    order: Sequence[OrderKey],
+    values: Sequence[Any],
+) -> ColumnElement:
+    """Условие «строка после values» для заданного порядка сортировки.
+
+    Для ключей (a, b) это a > va OR (a = va AND b > vb),
+    знак сравнения зависит от направления сортировки ключа.
+    """
+    conditions = []
+    for index, (expression, descending) in enumerate(order):
+        value = _key_literal(expression, values[index])
+        after = expression < value if descending else expression > value
+        equal = [
+            previous == _key_literal(previous, values[position])
+            for position, (previous, _) in enumerate(order[:index])
+        ]
+        conditions.append(and_(*equal, after))
+    return or_(*conditions)
 
 
 class CRUDBase:
@@ -13,6 +208,124 @@ class CRUDBase:
         """Модель бд."""
         self.model = model
 
+    def default_order(self) -> List[OrderKey]:
+        """Порядок по умолчанию для постраничного вывода: по id."""
+        return [(self.model.id, False)]
+
+    async def get_page(
+        self,
+        query: Query,
+        cursor: Optional[str],
+        per_page: int,
+        order: Optional[Sequence[OrderKey]] = None,
+    ) -> KeysetPage:
+        """Получить страницу запроса по курсору (keyset пагинация).
+
+        Последний ключ порядка должен быть уникальным (обычно id),
+        иначе строки с одинаковыми ключами могут потеряться.
+
+        Keyword Arguments:
+        -----------------
+        query (Query): запрос списка без сортировки, модель или колонки
+        cursor (Optional[str]): курсор из next_cursor или prev_cursor
+            предыдущей страницы, None для первой страницы
+        per_page (int): количество строк на странице
+        order (Optional[Sequence[OrderKey]]): ключи сортировки
+
+        """
+        order = list(order or self.default_order())
+        serializer = _cursor_serializer()
+        direction, values = 'next', None
+        if cursor:
+            try:
+                direction, values = serializer.loads(cursor)
+            except (BadSignature, ValueError):
+                direction, values = 'next', None
+        # Курсор от другого порядка сортировки ведет на первую страницу
+        if values is not None and len(values) != len(order):
+            direction, values = 'next', None
+        backwards = direction == 'prev' and values is not None
+        # Назад читаем в обратном порядке и переворачиваем страницу
+        seek_order = [
+            (expression, descending != backwards)
+            for expression, descending in order
+        ]
+
+        total, total_is_estimate = await self.get_total(query)
+        page_query = query.add_columns(
+            *(
+                expression.label(f'_keyset_{index}')
+                for index, (expression, _) in enumerate(order)
+            ),
+        )
+        if values is not None:
+            page_query = page_query.filter(_seek_condition(seek_order, values))
+        rows = (
+            page_query.order_by(
+                *(
+                    expression.desc() if descending else expression.asc()
+                    for expression, descending in seek_order
+                ),
+            )
+            .limit(per_page + 1)
+            .all()
+        )
+        # Запрос может выбирать модель или набор колонок (проекцию)
+        width = len(query.column_descriptions)
+        has_more = len(rows) > per_page
+        rows = rows[:per_page]
+        if backwards:
+            rows.reverse()
+
+        def make_cursor(row_direction: str, row: Any) -> str:
+            return _dump_cursor(serializer, row_direction, row[width:])
+
+        has_next = has_more if not backwards else True
+        has_prev = values is not None and (has_more or not backwards)
+        return KeysetPage(
+            items=[row[0] if width == 1 else row[:width] for row in rows],
+            next_cursor=(
+                make_cursor('next', rows[-1]) if rows and has_next else None
+            ),
+            prev_cursor=(
+                make_cursor('prev', rows[0]) if rows and has_prev else None
+            ),
+            total=total,
+            total_is_estimate=total_is_estimate,
+        )
+
+    async def get_total(self, query: Query) -> Tuple[int, bool]:
+        """Получить количество строк запроса: точное или оценку.
+
+        Оценка берется из плана запроса (EXPLAIN), точный COUNT(*)
+        выполняется, только если строк немного. Результат кэшируется.
+        """
+        statement = query.order_by(None).statement.compile(
+            dialect=db.engine.dialect,
+            compile_kwargs={'render_postcompile': True},
+        )
+        key = 'keyset_total:' + hashlib.sha1(
+            f'{statement}{sorted(statement.params.items())}'.encode(),
+        ).hexdigest()
+        cached = cache.get(key)
+        if cached is not None:
+            return tuple(cached)
+
+        plan = (
+            db.session.connection()
+            .exec_driver_sql(
+                f'EXPLAIN (FORMAT JSON) {statement}',
+                statement.params,
+            )
+            .scalar()
+        )
+        total = int(plan[0]['Plan']['Plan Rows'])
+        is_estimate = total > EXACT_COUNT_THRESHOLD
+        if not is_estimate:
+            total = query.order_by(None).count()
+        cache.set(key, (total, is_estimate), timeout=TOTAL_CACHE_TIMEOUT)
+        return total, is_estimate
+
     async def get(self, obj_id: int) -> Optional[object]:
         """Получить объект."""
         return self.model.query.get_or_404(obj_id)
@@ -21,12 +334,20 @@ class CRUDBase:
         """Создать список объектов."""
         return self.model.query.all()
 
+    def _save(self, *db_objs: object) -> None:
+        """Закоммитить и перечитать объекты, внутри batch() только flush."""
+        if in_batch():
+            db.session.flush()
+            return
+        db.session.commit()
+        for db_obj in db_objs:
+            db.session.refresh(db_obj)
+
     async def create(self, obj_in: dict) -> object:
         """Создать обект."""
         db_obj = self.model(**obj_in)
         db.session.add(db_obj)
-        db.session.commit()
-        db.session.refresh(db_obj)
+        self._save(db_obj)
         return db_obj
 
     async def update(self, db_obj: object, obj_in: dict) -> object:
@@ -36,18 +357,68 @@ class CRUDBase:
         for field in obj_data:
             if field in obj_in:
                 setattr(db_obj, field, obj_in[field])
-        db.session.commit()
-        db.session.refresh(db_obj)
+        self._save(db_obj)
         return db_obj
 
     async def update_with_obj(self, obj_in: object) -> object:
         """Обновить объект."""
-        db.session.commit()
-        db.session.refresh(obj_in)
+        self._save(obj_in)
         return obj_in
 
     async def remove(self, db_obj: object) -> object:
         """Удалить обект."""
         db.session.delete(db_obj)
-        db.session.commit()
+        commit()
         return db_obj
+
+    async def create_many(self, objs_in: List[dict]) -> List[object]:
+        """Создать несколько объектов одним INSERT ... RETURNING.
+
+        Созданные объекты возвращаются из RETURNING, без refresh.
+        """
+        if not objs_in:
+            return []
+        db_objs = db.session.scalars(
+            insert(self.model).returning(self.model),
+            objs_in,
+        ).all()
+        commit()
+        return db_objs
+
+    async def update_many(
+        self,
+        obj_ids: Iterable[int],
+        obj_in: dict,
+    ) -> List[object]:
+        """Обновить объекты одним UPDATE ... RETURNING.
+
+        Keyword Arguments:
+        -----------------
+        obj_ids (Iterable[int]): идентификаторы объектов
+        obj_in (dict): новые значения полей
+
+        """
+        obj_ids = list(obj_ids)
+        if not obj_ids:
+            return []
+        db_objs = db.session.scalars(
+            update(self.model)
+            .where(self.model.id.in_(obj_ids))
+            .values(**obj_in)
+            .returning(self.model),
+        ).all()
+        commit()
+        return db_objs
+
+    async def delete_many(self, obj_ids: Iterable[int]) -> List[int]:
+        """Удалить объекты одним DELETE, вернуть id удаленных."""
+        obj_ids = list(obj_ids)
+        if not obj_ids:
+            return []
+        deleted_ids = db.session.scalars(
+            delete(self.model)
+            .where(self.model.id.in_(obj_ids))
+            .returning(self.model.id),
+        ).all()
+        commit()
+        return deleted_ids
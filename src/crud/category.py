@@ -3,10 +3,9 @@ from typing import Tuple
 from sqlalchemy.orm import Query
 
 from src import db
+from src.crud.answer_statistic import answer_statistic_crud
 from src.crud.base import CRUDBase
 from src.models.category import Category
-from src.models.question import Question
-from src.models.user_answer import UserAnswer
 
 
 class CRUDCategory(CRUDBase):
@@ -19,47 +18,7 @@ class CRUDCategory(CRUDBase):
 
     async def get_statistic(self, category_id: int) -> Tuple:
         """Получить статистику по рубрике."""
-        try:
-            category = (
-                db.session.query(Category.name)
-                .filter(Category.id == category_id)
-                .first()
-            )
-            if not category:
-                return ('Нет данных', 0, 0, 0)
-
-            category_name = category.name
-
-            # Выбираем все ответы, относящиеся к данной рубрике.
-            results = (
-                db.session.query(UserAnswer.is_right)
-                .where(
-                    UserAnswer.question_id == Question.id,
-                    Question.category_id == category_id,
-                )
-                .all()
-            )
-
-            total_answers = len(results)
-            correct_answers = sum(1 for result in results if result.is_right)
-
-            if total_answers > 0:
-                correct_percentage = round(
-                    (correct_answers / total_answers) * 100.0,
-                    2,
-                )
-            else:
-                correct_percentage = 0
-
-            return (
-                category_name,
-                total_answers,
-                correct_answers,
-                correct_percentage,
-            )
-        except Exception:
-            db.session.rollback()
-            return ('Нет данных', 0, 0, 0)
+        return await answer_statistic_crud.get('category', category_id)
 
     async def get_total_categories(self) -> int:
         """Получить общее количество категорий."""
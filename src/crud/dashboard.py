@@ -0,0 +1,111 @@
+from datetime import datetime, timedelta
+
+from sqlalchemy import distinct, func, select, true
+
+from src import db
+from src.active_users import COMPLETED, PLAYED, active_user_counter
+from src.models.category import Category
+from src.models.question import Question
+from src.models.quiz import Quiz
+from src.models.statistic_rollup import DailyAnswerStatistic, DailyUserActivity
+from src.models.user import User
+
+
+class CRUDDashboardStatistic:
+
+    """Класс для получения обобщенной статистики одним запросом."""
+
+    async def get_overall_statistic(self, now: datetime) -> dict:
+        """Получить все показатели главной страницы статистики.
+
+        Каждая таблица сканируется один раз: счетчики за периоды
+        считаются через COUNT(*) FILTER (WHERE ...) внутри CTE,
+        а итоговый запрос объединяет однострочные CTE. Ответы и
+        прохождения берутся из накопительных таблиц статистики.
+        Активные пользователи за день, неделю и месяц считаются
+        приблизительно по счетчикам HyperLogLog в Redis.
+
+        Keyword Arguments:
+        -----------------
+        now (datetime): момент, от которого отсчитываются периоды
+
+        """
+        periods = {
+            'last_day': now - timedelta(days=1),
+            'last_week': now - timedelta(weeks=1),
+            'last_month': now - timedelta(days=30),
+        }
+        # Периоды активности считаются по календарным дням,
+        # включая сегодняшний
+        activity_periods = {
+            'last_day': 1,
+            'last_week': 7,
+            'last_month': 30,
+        }
+        today_start = datetime(now.year, now.month, now.day)
+
+        users_stats = select(
+            func.count(User.id).label('total_users'),
+            func.count(User.id)
+            .filter(User.created_on >= today_start)
+            .label('users_created_today'),
+            *(
+                func.count(User.id)
+                .filter(User.created_on >= since)
+                .label(f'new_users_{period}')
+                for period, since in periods.items()
+            ),
+        ).cte('users_stats')
+
+        played_user = distinct(DailyUserActivity.tg_user_id)
+        completed = DailyUserActivity.completed_count > 0
+        activity_stats = (
+            select(
+                func.count(played_user).label('total_users_played_quiz'),
+                func.count(played_user)
+                .filter(completed)
+                .label('total_users_completed_quiz'),
+                func.coalesce(func.sum(DailyUserActivity.completed_count), 0)
+                .label('total_completed_quizzes'),
+            )
+            .select_from(DailyUserActivity)
+            .cte('activity_stats')
+        )
+
+        totals = (
+            select(
+                func.coalesce(func.sum(DailyAnswerStatistic.answers_count), 0),
+            )
+            .scalar_subquery()
+            .label('total_questions_answered'),
+            select(func.count(Question.id))
+            .scalar_subquery()
+            .label('total_questions'),
+            select(func.count(Quiz.id)).scalar_subquery().label('total_quizzes'),
+            select(func.count(Category.id))
+            .scalar_subquery()
+            .label('total_categories'),
+        )
+
+        row = db.session.execute(
+            select(
+                *users_stats.c,
+                *activity_stats.c,
+                *totals,
+            ).select_from(users_stats.join(activity_stats, true())),
+        ).one()
+        statistic = dict(row._mapping)
+
+        today = now.date()
+        for period, days in activity_periods.items():
+            since = today - timedelta(days=days - 1)
+            statistic[f'users_played_quiz_{period}'] = (
+                active_user_counter.count(PLAYED, since, today)
+            )
+            statistic[f'users_completed_quiz_{period}'] = (
+                active_user_counter.count(COMPLETED, since, today)
+            )
+        return statistic
+
+
+dashboard_statistic_crud = CRUDDashboardStatistic()
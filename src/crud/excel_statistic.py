@@ -1,12 +1,22 @@
-from typing import Dict, List
+import hashlib
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
 
-from sqlalchemy import case, func, select
+from sqlalchemy import case, func, or_, select
 
 from src import db
+from src.constants import SCORE_BUCKETS
+from src.crud.quiz import quiz_crud
 from src.models.category import Category
 from src.models.question import Question
 from src.models.quiz import Quiz
 from src.models.quiz_result import QuizResult
+from src.models.statistic_rollup import (
+    DailyAnswerStatistic,
+    QuizScoreHistogram,
+    VariantStatistic,
+)
+from src.models.telegram_user import TelegramUser
 from src.models.user_answer import UserAnswer
 from src.models.variant import Variant
 
@@ -15,8 +25,63 @@ class CRUDExcelStatistic:
 
     """Класс, в котором находятся функции получения статистик."""
 
-    async def get_user_answers_for_excel(self) -> List[Dict[str, str]]:
-        """Получить отвты пользователя с названиями объектов, а не id."""
+    async def get_export_watermarks(self) -> Tuple[int, int]:
+        """Получить последние id ответов и результатов викторин."""
+        with db.session() as session:
+            last_answer_id, last_result_id = session.execute(
+                select(
+                    select(func.coalesce(func.max(UserAnswer.id), 0))
+                    .scalar_subquery(),
+                    select(func.coalesce(func.max(QuizResult.id), 0))
+                    .scalar_subquery(),
+                ),
+            ).one()
+            return last_answer_id, last_result_id
+
+    async def get_data_fingerprint(self) -> str:
+        """Получить отпечаток версии данных для кэша экспорта.
+
+        Отпечаток меняется при добавлении ответов, результатов викторин
+        и телеграм пользователей, при изменении результатов, а также
+        при правке рубрик, викторин и вопросов в админке (версия
+        каталога): в выгрузке их названия.
+        """
+        with db.session() as session:
+            row = session.execute(
+                select(
+                    *(
+                        subquery
+                        for model in (UserAnswer, QuizResult, TelegramUser)
+                        for subquery in (
+                            select(func.coalesce(func.max(model.id), 0))
+                            .scalar_subquery(),
+                            select(func.count(model.id)).scalar_subquery(),
+                        )
+                    ),
+                    select(func.max(QuizResult.updated_on)).scalar_subquery(),
+                ),
+            ).one()
+        values = (*row, quiz_crud.get_catalogue_version())
+        return hashlib.sha256(
+            '|'.join(str(value) for value in values).encode(),
+        ).hexdigest()
+
+    async def get_user_answers_for_excel(
+        self,
+        after_id: int = 0,
+        up_to_id: Optional[int] = None,
+    ) -> List[Dict[str, str]]:
+        """Получить отвты пользователя с названиями объектов, а не id.
+
+        Keyword Arguments:
+        -----------------
+        after_id (int): выгружать только ответы с id больше указанного
+        up_to_id (Optional[int]): выгружать ответы с id не больше указанного
+
+        """
+        filters = [UserAnswer.id > after_id]
+        if up_to_id is not None:
+            filters.append(UserAnswer.id <= up_to_id)
         with db.session() as session:
             results = session.execute(
                 select(
@@ -29,11 +94,14 @@ class CRUDExcelStatistic:
                         (Variant.is_right_choice, 'Да'),
                         else_='Нет',
                     ).label("Правильно?"),
+                    UserAnswer.answered_at,
                 )
                 .join(UserAnswer, UserAnswer.quiz_id == Quiz.id)
                 .join(Question, UserAnswer.question_id == Question.id)
                 .join(Category, Question.category_id == Category.id)
-                .join(Variant, UserAnswer.answer_id == Variant.id),
+                .join(Variant, UserAnswer.answer_id == Variant.id)
+                .where(*filters)
+                .order_by(UserAnswer.id),
             )
 
             return [
@@ -44,29 +112,39 @@ class CRUDExcelStatistic:
                     'Вопрос': row[3],
                     'Ответ': row[4],
                     'Правильно?': row[5],
+                    'Время ответа': row[6],
                 }
                 for row in results
             ]
 
+    def _answer_totals_columns(self) -> tuple:
+        """Колонки с количеством и соотношением ответов из счетчиков."""
+        total = func.coalesce(func.sum(DailyAnswerStatistic.answers_count), 0)
+        correct = func.coalesce(
+            func.sum(DailyAnswerStatistic.correct_count),
+            0,
+        )
+        return (
+            total.label("Всего ответов"),
+            correct.label("Правильных ответов"),
+            func.coalesce(
+                (correct * 100.0) / func.nullif(total, 0), 0,
+            ).label("Соотношение"),
+        )
+
     async def get_categories_for_excel(self) -> List[Dict[str, str]]:
         """Получить кол-во и соотношение всех ответов по рубрикам."""
         with db.session() as session:
             results = session.execute(
                 select(
                     Category.name.label("Название категории"),
-                    func.count(UserAnswer.id).label("Всего ответов"),
-                    func.count(
-                        case((UserAnswer.is_right, UserAnswer.id)),
-                    ).label("Правильных ответов"),
-                    func.coalesce(
-                        (func.count(case(
-                            (UserAnswer.is_right, UserAnswer.id),
-                        )) * 100.0) /
-                        func.nullif(func.count(UserAnswer.id), 0), 0,
-                    ).label("Соотношение"),
+                    *self._answer_totals_columns(),
                 )
                 .join(Question, Question.category_id == Category.id)
-                .outerjoin(UserAnswer, UserAnswer.question_id == Question.id)
+                .outerjoin(
+                    DailyAnswerStatistic,
+                    DailyAnswerStatistic.question_id == Question.id,
+                )
                 .group_by(Category.name),
             )
 
@@ -86,19 +164,12 @@ class CRUDExcelStatistic:
             results = session.execute(
                 select(
                     Quiz.title.label("Название викторины"),
-                    func.count(UserAnswer.id).label("Всего ответов"),
-                    func.count(
-                        case((UserAnswer.is_right, UserAnswer.id)),
-                    ).label("Правильных ответов"),
-                    func.coalesce(
-                        (func.count(case(
-                            (UserAnswer.is_right, UserAnswer.id),
-                        )) * 100.0) /
-                        func.nullif(func.count(UserAnswer.id), 0), 0,
-                    ).label("Соотношение"),
+                    *self._answer_totals_columns(),
+                )
+                .outerjoin(
+                    DailyAnswerStatistic,
+                    DailyAnswerStatistic.quiz_id == Quiz.id,
                 )
-                .join(Quiz.questions)
-                .outerjoin(UserAnswer, UserAnswer.question_id == Question.id)
                 .group_by(Quiz.title),
             )
 
@@ -118,18 +189,12 @@ class CRUDExcelStatistic:
             results = session.execute(
                 select(
                     Question.title.label("Название вопроса"),
-                    func.count(UserAnswer.id).label("Всего ответов"),
-                    func.count(
-                        case((UserAnswer.is_right, UserAnswer.id)),
-                    ).label("Правильных ответов"),
-                    func.coalesce(
-                        (func.count(case(
-                            (UserAnswer.is_right, UserAnswer.id),
-                        )) * 100.0) /
-                        func.nullif(func.count(UserAnswer.id), 0), 0,
-                    ).label("Соотношение"),
+                    *self._answer_totals_columns(),
+                )
+                .outerjoin(
+                    DailyAnswerStatistic,
+                    DailyAnswerStatistic.question_id == Question.id,
                 )
-                .outerjoin(UserAnswer, UserAnswer.question_id == Question.id)
                 .group_by(Question.title),
             )
 
@@ -143,13 +208,96 @@ class CRUDExcelStatistic:
                 for row in results
             ]
 
-    async def get_quiz_results_for_excel(self) -> List[Dict[str, str]]:
-        """Получить все данные по прохождению викторин пользователем."""
+    async def get_variants_for_excel(self) -> List[Dict[str, str]]:
+        """Получить распределение выбора вариантов ответа по вопросам."""
+        chosen = func.coalesce(VariantStatistic.answers_count, 0)
+        total = func.sum(chosen).over(partition_by=Variant.question_id)
+        with db.session() as session:
+            results = session.execute(
+                select(
+                    Question.title,
+                    Variant.title,
+                    Variant.is_right_choice,
+                    chosen,
+                    func.coalesce(chosen * 100.0 / func.nullif(total, 0), 0),
+                )
+                .join(Question, Question.id == Variant.question_id)
+                .outerjoin(
+                    VariantStatistic,
+                    VariantStatistic.variant_id == Variant.id,
+                )
+                .order_by(Question.title, chosen.desc()),
+            )
+
+            return [
+                {
+                    'Вопрос': row[0],
+                    'Вариант ответа': row[1],
+                    'Правильный?': 'Да' if row[2] else 'Нет',
+                    'Выбран раз': row[3],
+                    'Доля ответов': f'{row[4]:.2f}%',
+                }
+                for row in results
+            ]
+
+    async def get_score_histograms_for_excel(self) -> List[Dict[str, str]]:
+        """Получить гистограммы результатов по викторинам."""
+        with db.session() as session:
+            results = session.execute(
+                select(
+                    Quiz.title,
+                    QuizScoreHistogram.bucket,
+                    QuizScoreHistogram.results_count,
+                )
+                .join(Quiz, Quiz.id == QuizScoreHistogram.quiz_id)
+                .order_by(Quiz.title),
+            )
+
+            histograms = {}
+            for title, bucket, results_count in results:
+                histogram = histograms.setdefault(
+                    title,
+                    {
+                        'Викторина': title,
+                        **{f'{value}%': 0 for value in SCORE_BUCKETS},
+                    },
+                )
+                histogram[f'{bucket}%'] = results_count
+            return list(histograms.values())
+
+    async def get_quiz_results_for_excel(
+        self,
+        after_id: int = 0,
+        up_to_id: Optional[int] = None,
+        changed_since: Optional[datetime] = None,
+    ) -> List[Dict[str, str]]:
+        """Получить все данные по прохождению викторин пользователем.
+
+        Keyword Arguments:
+        -----------------
+        after_id (int): выгружать только результаты с id больше указанного
+        up_to_id (Optional[int]): выгружать результаты с id не больше
+            указанного
+        changed_since (Optional[datetime]): дополнительно выгружать
+            результаты, измененные после указанного времени
+
+        """
+        filters = [QuizResult.id > after_id]
+        if changed_since is not None:
+            filters = [
+                or_(
+                    QuizResult.id > after_id,
+                    QuizResult.updated_on > changed_since,
+                ),
+            ]
+        if up_to_id is not None:
+            filters.append(QuizResult.id <= up_to_id)
         with db.session() as session:
             results = session.execute(
                 select(
                     QuizResult.tg_user_id.label('Телеграм ID'),
                     Quiz.title.label('Викторина'),
+                    QuizResult.attempt.label('Попытка'),
                     func.count(Question.id).label('Всего вопросов'),
                     QuizResult.total_questions.label('Отвеченных вопросов'),
                     QuizResult.correct_answers_count.label(
@@ -158,8 +306,9 @@ class CRUDExcelStatistic:
                 )
                 .join(Quiz, Quiz.id == QuizResult.quiz_id)
                 .join(Quiz.questions)
+                .where(*filters)
                 .group_by(
-                    QuizResult.tg_user_id,
+                    QuizResult.id,
                     Quiz.title,
                     QuizResult.total_questions,
                     QuizResult.correct_answers_count,
@@ -170,9 +319,10 @@ class CRUDExcelStatistic:
                 {
                     'Телеграм ID': result[0],
                     'Викторина': result[1],
-                    'Всего вопросов': result[2],
-                    'Отвеченных вопросов': result[3],
-                    'Кол-во правельных ответов': result[4],
+                    'Попытка': result[2],
+                    'Всего вопросов': result[3],
+                    'Отвеченных вопросов': result[4],
+                    'Кол-во правельных ответов': result[5],
                 }
                 for result in results
             ]
@@ -0,0 +1,47 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import select
+
+from src import db
+from src.crud.base import CRUDBase
+from src.models.export_watermark import ExportWatermark
+
+
+class CRUDExportWatermark(CRUDBase):
+
+    """Круд класс для отметок экспорта статистики."""
+
+    async def get_by_user(self, user_id: int) -> Optional[ExportWatermark]:
+        """Получить отметку последнего экспорта администратора."""
+        return (
+            db.session.execute(
+                select(ExportWatermark).where(
+                    ExportWatermark.user_id == user_id,
+                ),
+            )
+            .scalars()
+            .first()
+        )
+
+    async def advance(
+        self,
+        user_id: int,
+        last_answer_id: int,
+        last_result_id: int,
+        exported_on: datetime,
+    ) -> ExportWatermark:
+        """Сдвинуть отметку экспорта администратора."""
+        watermark = await self.get_by_user(user_id)
+        obj_in = {
+            'user_id': user_id,
+            'last_answer_id': last_answer_id,
+            'last_result_id': last_result_id,
+            'exported_on': exported_on,
+        }
+        if watermark is None:
+            return await self.create(obj_in)
+        return await self.update(watermark, obj_in)
+
+
+export_watermark_crud = CRUDExportWatermark(ExportWatermark)
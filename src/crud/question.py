@@ -1,10 +1,11 @@
 from typing import Optional, Tuple
 
-from sqlalchemy import null, select, true
+from sqlalchemy import Select, bindparam, null, select, true
 from sqlalchemy.orm import defer
 
 from src import db
-from src.crud.base import CRUDBase
+from src.crud.answer_statistic import answer_statistic_crud
+from src.crud.base import CRUDBase, PrebuiltStatement
 from src.models.question import Question
 from src.models.user_answer import UserAnswer
 from src.models.variant import Variant
@@ -12,6 +13,31 @@ from src.models.variant import Variant
 # from src.models.quiz import Quiz
 
 
+def new_question_statement() -> Select:
+    """Запрос вопроса викторины без ответа в попытке пользователя."""
+    return (
+        select(Question)
+        .options(defer(Question.image))
+        .where(
+            Question.quizzes.any(id=bindparam('quiz_id')),
+            Question.is_active == bindparam('is_active'),
+            UserAnswer.id == null(),
+        )
+        .outerjoin(
+            UserAnswer,
+            (Question.id == UserAnswer.question_id)
+            & (UserAnswer.user_id == bindparam('user_id'))
+            & (UserAnswer.quiz_id == bindparam('quiz_id'))
+            & (UserAnswer.attempt == bindparam('attempt')),
+        )
+        .limit(1)
+    )
+
+
+# Запрос собирается один раз, при вызове передаются только параметры
+NEW_QUESTION = PrebuiltStatement(new_question_statement)
+
+
 class CRUDQuestion(CRUDBase):
 
     """Круд класс для вопросов."""
@@ -20,25 +46,19 @@ class CRUDQuestion(CRUDBase):
         self,
         user_id: int,
         quiz_id: int,
-        is_active: bool = true(),
+        is_active: bool = True,
+        attempt: int = 1,
     ) -> Optional[Question]:
-        """Получить новый вопрос."""
+        """Получить вопрос, на который нет ответа в текущей попытке."""
         return (
             db.session.execute(
-                select(Question)
-                .options(defer(Question.image))
-                .where(
-                    Question.quizzes.any(id=quiz_id),
-                    Question.is_active == is_active,
-                    UserAnswer.id == null(),
-                )
-                .outerjoin(
-                    UserAnswer,
-                    (Question.id == UserAnswer.question_id)
-                    & (UserAnswer.user_id == user_id)
-                    & (UserAnswer.quiz_id == quiz_id),
-                )
-                .limit(1),
+                NEW_QUESTION.statement,
+                {
+                    'user_id': user_id,
+                    'quiz_id': quiz_id,
+                    'is_active': is_active,
+                    'attempt': attempt,
+                },
             )
             .scalars()
             .first()
@@ -79,43 +99,7 @@ class CRUDQuestion(CRUDBase):
 
     async def get_statistic(self, question_id: int) -> Tuple:
         """Получить статистику по вопросу."""
-        try:
-            question = (
-                db.session.query(Question)
-                .filter(Question.id == question_id)
-                .first()
-            )
-            if not question:
-                return ('Нет данных', 0, 0, 0)
-
-            question_text = question.title
-
-            user_answers = (
-                db.session.query(UserAnswer.is_right)
-                .filter(UserAnswer.question_id == question_id)
-                .all()
-            )
-
-            total_answers = len(user_answers)
-            correct_answers = sum(1 for ua in user_answers if ua.is_right)
-
-            if total_answers > 0:
-                correct_percentage = round(
-                    (correct_answers / total_answers) * 100.0,
-                    2,
-                )
-            else:
-                correct_percentage = 0
-
-            return (
-                question_text,
-                total_answers,
-                correct_answers,
-                correct_percentage,
-            )
-        except Exception:
-            db.session.rollback()
-            return ('Нет данных', 0, 0, 0)
+        return await answer_statistic_crud.get('question', question_id)
 
     async def get_total_questions(self) -> int:
         """Получить общее количество вопросов."""
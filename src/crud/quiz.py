@@ -1,13 +1,44 @@
-from typing import Optional, Tuple
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
 
-from sqlalchemy import select  # , true
+from sqlalchemy import func, select  # , true
 from sqlalchemy.orm import Query
 
-from src import db
-from src.crud.base import CRUDBase
+from src import cache, db
+from src.crud.answer_statistic import answer_statistic_crud
+from src.crud.base import CRUDBase, KeysetPage
+from src.models.category import Category
 from src.models.question import Question
 from src.models.quiz import Quiz
-from src.models.user_answer import UserAnswer
+from src.models.quiz_question import quiz_questions
+from src.models.variant import Variant
+from src.settings import settings
+
+# Версия содержимого каталога. Входит в ключи страниц каталога,
+# поэтому после правки в админке старые страницы больше не читаются.
+CATALOGUE_VERSION_KEY = 'catalogue:version'
+
+
+class CatalogueQuiz(NamedTuple):
+
+    """Викторина в каталоге: без вопросов, только то, что выводится."""
+
+    id: int
+    title: str
+    is_active: bool
+    questions_count: int
+    # Пары (рубрика, количество вопросов) по убыванию количества
+    categories: List[Tuple[str, int]]
+
+
+class AnswerVariant(NamedTuple):
+
+    """Вариант ответа в снимке викторины."""
+
+    id: int
+    question_id: int
+    title: str
+    description: Optional[str]
+    is_right_choice: bool
 
 
 class CRUDQuiz(CRUDBase):
@@ -30,6 +61,117 @@ class CRUDQuiz(CRUDBase):
         """Создать список объектов."""
         return Quiz.query
 
+    def get_catalogue_query(self) -> Query:
+        """Проекция каталога: id, название, активность, число вопросов."""
+        questions_count = (
+            select(func.count(quiz_questions.c.question_id))
+            .where(quiz_questions.c.quiz_id == Quiz.id)
+            .scalar_subquery()
+        )
+        return db.session.query(
+            Quiz.id,
+            Quiz.title,
+            Quiz.is_active,
+            questions_count.label('questions_count'),
+        )
+
+    async def get_categories_breakdown(
+        self,
+        quiz_ids: Iterable[int],
+    ) -> Dict[int, List[Tuple[str, int]]]:
+        """Получить количество вопросов каждой рубрики в викторинах."""
+        quiz_ids = list(quiz_ids)
+        if not quiz_ids:
+            return {}
+        questions_count = func.count(quiz_questions.c.question_id)
+        rows = db.session.execute(
+            select(quiz_questions.c.quiz_id, Category.name, questions_count)
+            .join(Question, Question.id == quiz_questions.c.question_id)
+            .join(Category, Category.id == Question.category_id)
+            .where(quiz_questions.c.quiz_id.in_(quiz_ids))
+            .group_by(quiz_questions.c.quiz_id, Category.name)
+            .order_by(questions_count.desc(), Category.name),
+        )
+        breakdown = {}
+        for quiz_id, name, count in rows:
+            breakdown.setdefault(quiz_id, []).append((name, count))
+        return breakdown
+
+    def get_catalogue_version(self) -> int:
+        """Получить текущую версию содержимого каталога."""
+        return cache.get(CATALOGUE_VERSION_KEY) or 0
+
+    def bump_catalogue_version(self) -> None:
+        """Сбросить кэш каталога: викторины, вопросы или рубрики изменены."""
+        # Cache не проксирует inc, счетчик увеличивает сам бэкенд
+        cache.cache.inc(CATALOGUE_VERSION_KEY)
+
+    async def get_catalogue_page(
+        self,
+        cursor: Optional[str],
+        per_page: int,
+    ) -> KeysetPage:
+        """Получить страницу каталога викторин.
+
+        Страница собирается из проекции без загрузки вопросов
+        и кэшируется по курсору и версии каталога.
+
+        Keyword Arguments:
+        -----------------
+        cursor (Optional[str]): курсор страницы, None для первой
+        per_page (int): количество викторин на странице
+
+        """
+        version = self.get_catalogue_version()
+        key = f'catalogue:{version}:{per_page}:{cursor or ""}'
+        page = cache.get(key)
+        if page is not None:
+            return page
+
+        page = await self.get_page(
+            self.get_catalogue_query(),
+            cursor,
+            per_page,
+        )
+        breakdown = await self.get_categories_breakdown(
+            row[0] for row in page.items
+        )
+        page.items = [
+            CatalogueQuiz(*row, categories=breakdown.get(row[0], []))
+            for row in page.items
+        ]
+        cache.set(key, page, timeout=settings.CATALOGUE_CACHE_TTL)
+        return page
+
+    async def get_variant_index(
+        self,
+        quiz_id: int,
+    ) -> Dict[int, Dict[int, AnswerVariant]]:
+        """Получить варианты ответов активных вопросов викторины.
+
+        Возвращает словарь id вопроса -> {id варианта: вариант}.
+        """
+        rows = db.session.execute(
+            select(
+                Variant.id,
+                Variant.question_id,
+                Variant.title,
+                Variant.description,
+                Variant.is_right_choice,
+            )
+            .join(
+                quiz_questions,
+                quiz_questions.c.question_id == Variant.question_id,
+            )
+            .join(Question, Question.id == Variant.question_id)
+            .where(quiz_questions.c.quiz_id == quiz_id, Question.is_active),
+        )
+        index = {}
+        for row in rows:
+            variant = AnswerVariant(*row)
+            index.setdefault(variant.question_id, {})[variant.id] = variant
+        return index
+
     async def get_by_id(self, quiz_id: int) -> Optional[Quiz]:
         """Получить викторину по ID."""
         return (
@@ -42,54 +184,7 @@ class CRUDQuiz(CRUDBase):
 
     async def get_statistic(self, quiz_id: int) -> Tuple:
         """Получить статистику по викторине."""
-        try:
-            quiz = db.session.query(Quiz).filter(Quiz.id == quiz_id).first()
-
-            if not quiz:
-                return ('Нет данных', 0, 0, 0)
-
-            # Получаем все вопросы викторины
-            questions_subquery = (
-                db.session.query(Question.id)
-                .filter(Question.quizzes.any(id=quiz_id))
-                .subquery()
-            )
-
-            total_answers = (
-                db.session.query(UserAnswer)
-                .filter(
-                    UserAnswer.question_id.in_(questions_subquery),
-                    UserAnswer.quiz_id == quiz_id,
-                )
-                .count()
-            )
-
-            correct_answers = (
-                db.session.query(UserAnswer)
-                .filter(
-                    UserAnswer.question_id.in_(questions_subquery),
-                    UserAnswer.quiz_id == quiz_id,
-                    UserAnswer.is_right,
-                )
-                .count()
-            )
-
-            if total_answers > 0:
-                correct_percentage = round(
-                    (correct_answers / total_answers) * 100.0,
-                    2,
-                )
-            else:
-                correct_percentage = 0
-            return (
-                quiz.title,
-                total_answers,
-                correct_answers,
-                correct_percentage,
-            )
-        except Exception:
-            db.session.rollback()
-            return ('Нет данных', 0, 0, 0)
+        return await answer_statistic_crud.get('quiz', quiz_id)
 
     async def get_total_quizzes(self) -> int:
         """Получить общее количество викторин."""
@@ -1,13 +1,38 @@
+from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Result, select
+from sqlalchemy import Select, bindparam, select, update
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import joinedload
 
 from src import db
-from src.crud.base import CRUDBase
+from src.crud.base import (
+    CRUDBase,
+    KeysetPage,
+    PrebuiltStatement,
+    commit,
+)
 from src.models.quiz_result import QuizResult
 
 
+def user_quiz_result_statement(by_attempt: bool = False) -> Select:
+    """Запрос последней (или указанной) попытки пользователя."""
+    query = select(QuizResult).where(
+        QuizResult.user_id == bindparam('user_id'),
+        QuizResult.quiz_id == bindparam('quiz_id'),
+    )
+    if by_attempt:
+        query = query.where(QuizResult.attempt == bindparam('attempt'))
+    return query.order_by(QuizResult.attempt.desc()).limit(1)
+
+
+# Запросы собираются один раз, при вызове передаются только параметры
+CURRENT_QUIZ_RESULT = PrebuiltStatement(user_quiz_result_statement)
+QUIZ_RESULT_BY_ATTEMPT = PrebuiltStatement(
+    lambda: user_quiz_result_statement(by_attempt=True),
+)
+
+
 class CRUDQuizResult(CRUDBase):
 
     """Круд класс для результатов квиза."""
@@ -16,18 +41,138 @@ class CRUDQuizResult(CRUDBase):
         self,
         user_id: int,
         quiz_id: int,
+        attempt: Optional[int] = None,
     ) -> Optional[QuizResult]:
-        """Получить результат квиза с пользователем и квизом."""
-        return (
+        """Получить результат квиза с пользователем и квизом.
+
+        Без номера попытки возвращается текущая (последняя) попытка.
+        """
+        params = {'user_id': user_id, 'quiz_id': quiz_id}
+        query = CURRENT_QUIZ_RESULT
+        if attempt is not None:
+            params['attempt'] = attempt
+            query = QUIZ_RESULT_BY_ATTEMPT
+        return db.session.execute(query.statement, params).scalars().first()
+
+    async def get_or_start(
+        self,
+        user_id: int,
+        tg_user_id: Optional[int],
+        quiz_id: int,
+    ) -> QuizResult:
+        """Получить текущую попытку или начать первую.
+
+        Одновременные первые ответы не создают вторую запись:
+        вставка при конфликте с _person_quiz_attempt_uc пропускается.
+
+        Keyword Arguments:
+        -----------------
+        user_id (int): идентификатор пользователя
+        tg_user_id (Optional[int]): идентификатор телеграм пользователя
+        quiz_id (int): идентификатор викторины
+
+        """
+        current = await self.get_by_user_and_quiz(user_id, quiz_id)
+        if current is not None:
+            return current
+        db.session.execute(
+            insert(QuizResult)
+            .values(
+                user_id=user_id,
+                tg_user_id=tg_user_id,
+                quiz_id=quiz_id,
+                total_questions=0,
+                correct_answers_count=0,
+                is_complete=False,
+            )
+            .on_conflict_do_nothing(constraint='_person_quiz_attempt_uc'),
+        )
+        commit()
+        return await self.get_by_user_and_quiz(user_id, quiz_id)
+
+    async def add_answer(
+        self,
+        quiz_result_id: int,
+        is_right: bool,
+    ) -> QuizResult:
+        """Увеличить счетчики ответов попытки одним UPDATE."""
+        quiz_result = (
             db.session.execute(
-                select(QuizResult).where(
-                    QuizResult.user_id == user_id,
-                    QuizResult.quiz_id == quiz_id,
-                ),
+                update(QuizResult)
+                .where(QuizResult.id == quiz_result_id)
+                .values(
+                    total_questions=QuizResult.total_questions + 1,
+                    correct_answers_count=(
+                        QuizResult.correct_answers_count + int(is_right)
+                    ),
+                )
+                .returning(QuizResult)
+                .execution_options(populate_existing=True),
+            )
+            .scalars()
+            .one()
+        )
+        commit()
+        return quiz_result
+
+    async def complete(self, quiz_result_id: int) -> Optional[QuizResult]:
+        """Завершить попытку.
+
+        Возвращает попытку или None, если ее уже завершил другой запрос.
+        """
+        quiz_result = (
+            db.session.execute(
+                update(QuizResult)
+                .where(
+                    QuizResult.id == quiz_result_id,
+                    QuizResult.is_complete.is_(False),
+                )
+                .values(is_complete=True, ended_on=datetime.utcnow())
+                .returning(QuizResult)
+                .execution_options(populate_existing=True),
             )
             .scalars()
             .first()
         )
+        commit()
+        return quiz_result
+
+    async def start_attempt(
+        self,
+        user_id: int,
+        quiz_id: int,
+    ) -> Optional[QuizResult]:
+        """Начать новую попытку прохождения викторины.
+
+        Прошлые попытки и их ответы остаются за пользователем.
+        Если в текущей попытке еще нет ответов, она и остается текущей.
+        Повторный или одновременный запрос не создает вторую попытку:
+        вставка при конфликте с _person_quiz_attempt_uc пропускается.
+
+        Keyword Arguments:
+        -----------------
+        user_id (int): идентификатор пользователя
+        quiz_id (int): идентификатор викторины
+
+        """
+        current = await self.get_by_user_and_quiz(user_id, quiz_id)
+        if current is None or current.total_questions == 0:
+            return current
+        db.session.execute(
+            insert(QuizResult)
+            .values(
+                user_id=user_id,
+                tg_user_id=current.tg_user_id,
+                quiz_id=quiz_id,
+                attempt=current.attempt + 1,
+                total_questions=0,
+                correct_answers_count=0,
+                is_complete=False,
+            )
+            .on_conflict_do_nothing(constraint='_person_quiz_attempt_uc'),
+        )
+        commit()
+        return await self.get_by_user_and_quiz(user_id, quiz_id)
 
     async def get_results_by_user(
         self,
@@ -39,11 +184,13 @@ class CRUDQuizResult(CRUDBase):
             db.session.execute(
                 select(QuizResult)
                 # загрузка связанных Quiz
-                .options(joinedload(QuizResult.quiz)).where(
+                .options(joinedload(QuizResult.quiz))
+                .where(
                     QuizResult.user_id == user_id
                     if not tg_user
                     else QuizResult.tg_user_id == user_id,
-                ),
+                )
+                .order_by(QuizResult.quiz_id, QuizResult.attempt),
             )
             .scalars()
             .all()
@@ -52,21 +199,21 @@ class CRUDQuizResult(CRUDBase):
     async def get_results_by_user_paginated(
         self,
         user_id: int,
-        page: int,
+        cursor: Optional[str],
         per_page: int,
         tg_user: bool = False,
-    ) -> Result:
-        """Получить результаты квизов пользователя c пагинацией."""
+    ) -> KeysetPage:
+        """Получить результаты квизов пользователя c пагинацией по курсору.
+
+        Начатые попытки без ответов не выводятся.
+        """
         if not tg_user:
             query = self.model.query.filter_by(user_id=user_id)
         else:
             query = self.model.query.filter_by(tg_user_id=user_id)
+        query = query.filter(self.model.total_questions > 0)
 
-        return query.paginate(
-            page=page,
-            per_page=per_page,
-            error_out=False,
-        )
+        return await self.get_page(query, cursor, per_page)
 
     async def get_total_completed_quizzes(self) -> int:
         """Получить общее количество завершенных квизов."""
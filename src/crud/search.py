@@ -0,0 +1,121 @@
+from typing import List, Optional, Tuple
+
+from flask_sqlalchemy.query import Query
+from sqlalchemy import (
+    Numeric,
+    and_,
+    case,
+    cast,
+    false,
+    func,
+    literal,
+    literal_column,
+    or_,
+)
+from sqlalchemy.sql.elements import ColumnElement
+
+from src.crud.base import OrderKey
+from src.models.category import Category
+from src.models.question import Question, question_title_document
+from src.models.quiz import Quiz
+from src.models.telegram_user import TelegramUser, telegram_user_full_name
+
+# Для каждого разреза: модель, колонка поиска по триграммам
+# и полнотекстовое представление (если есть)
+SEARCH_FIELDS = {
+    'category': (Category, Category.name, None),
+    'quiz': (Quiz, Quiz.title, None),
+    'question': (Question, Question.title, question_title_document),
+    'user': (TelegramUser, telegram_user_full_name, None),
+}
+SEARCH_LANGUAGE = literal_column("'russian'::regconfig")
+# Telegram id занимает не больше 52 бит, то есть до 16 знаков.
+# Поиск по префиксу строит диапазоны для всех возможных длин id.
+MAX_TELEGRAM_ID_DIGITS = 16
+# Релевантность (real) приводится к numeric с фиксированной точностью.
+# Значение real из курсора при сравнении с real превращается в float8
+# и не равно самому себе, поэтому строки с одинаковой релевантностью
+# на границе страницы терялись бы.
+RANK_TYPE = Numeric(12, 6)
+
+
+def _telegram_id_prefix(prefix: str) -> ColumnElement:
+    """Условие «telegram_id начинается с prefix» через диапазоны.
+
+    Для префикса 12 это 12, 120..129, 1200..1299 и так далее,
+    поэтому запрос идет по btree индексу telegram_id. Префикс
+    с ведущим нулем или длиннее MAX_TELEGRAM_ID_DIGITS не совпадает
+    ни с одним id.
+    """
+    if prefix.startswith('0') or len(prefix) > MAX_TELEGRAM_ID_DIGITS:
+        return false()
+    value = int(prefix)
+    ranges = []
+    for digits in range(MAX_TELEGRAM_ID_DIGITS - len(prefix) + 1):
+        scale = 10 ** digits
+        ranges.append(
+            and_(
+                TelegramUser.telegram_id >= value * scale,
+                TelegramUser.telegram_id < (value + 1) * scale,
+            ),
+        )
+    return or_(false(), *ranges)
+
+
+class CRUDSearch:
+
+    """Поиск в списках статистики админки.
+
+    Текст ищется по триграммным GIN индексам (pg_trgm), вопросы
+    дополнительно по полнотекстовому индексу на русском языке.
+    Результаты упорядочены по релевантности. Числовой запрос
+    в списке пользователей ищет telegram_id по префиксу.
+
+    """
+
+    def apply(
+        self,
+        query: Query,
+        dimension: str,
+        search_query: Optional[str],
+    ) -> Tuple[Query, List[OrderKey]]:
+        """Отфильтровать запрос по строке поиска.
+
+        Возвращает запрос и ключи сортировки по релевантности
+        для постраничного вывода (последний ключ всегда id).
+
+        Keyword Arguments:
+        -----------------
+        query (Query): исходный запрос списка
+        dimension (str): разрез: category, quiz, question или user
+        search_query (Optional[str]): строка поиска
+
+        """
+        model, column, document = SEARCH_FIELDS[dimension]
+        search_query = (search_query or '').strip()
+        if not search_query:
+            return query, [(model.id, False)]
+        if dimension == 'user' and search_query.isdigit():
+            return query.filter(_telegram_id_prefix(search_query)), [
+                (TelegramUser.telegram_id != int(search_query), False),
+                (TelegramUser.telegram_id, False),
+                (TelegramUser.id, False),
+            ]
+
+        condition = column.ilike(f'%{search_query}%')
+        rank = func.word_similarity(literal(search_query), column)
+        if document is not None:
+            ts_query = func.websearch_to_tsquery(SEARCH_LANGUAGE, search_query)
+            matches = document.op('@@')(ts_query)
+            condition = or_(condition, matches)
+            rank = rank + case(
+                (matches, func.ts_rank(document, ts_query)),
+                else_=0,
+            )
+        return query.filter(condition), [
+            (cast(rank, RANK_TYPE), True),
+            (model.id, False),
+        ]
+
+
+search_crud = CRUDSearch()
@@ -0,0 +1,345 @@
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import (
+    Date,
+    case,
+    cast,
+    delete,
+    func,
+    literal,
+    select,
+    text,
+    union_all,
+)
+from sqlalchemy.dialects.postgresql import insert
+
+from src import db
+from src.active_users import COMPLETED, PLAYED, active_user_counter
+from src.crud.base import commit
+from src.models.quiz_result import QuizResult
+from src.models.statistic_rollup import (
+    ArchivedAnswerStatistic,
+    DailyAnswerStatistic,
+    DailyUserActivity,
+    QuizFunnelStep,
+    QuizScoreHistogram,
+    VariantStatistic,
+)
+from src.models.user_answer import UserAnswer
+from src.utils import get_score_bucket
+
+# Таблицы в порядке, в котором их обновляет ответ и завершение
+# викторины. Пересборка блокирует их в том же порядке, поэтому
+# не может взаимно заблокироваться с транзакцией ответа.
+ROLLUP_TABLES = (
+    DailyAnswerStatistic,
+    VariantStatistic,
+    QuizFunnelStep,
+    DailyUserActivity,
+    QuizScoreHistogram,
+)
+
+
+class CRUDStatisticRollup:
+
+    """Класс для работы с накопительными таблицами статистики.
+
+    Счетчики увеличиваются при каждом ответе и завершении викторины,
+    поэтому страницы статистики не сканируют user_answers и quiz_results.
+
+    """
+
+    def _increment(
+        self,
+        model: db.Model,
+        constraint: str,
+        keys: dict,
+        counters: dict,
+    ) -> None:
+        """Увеличить счетчики строки или создать ее (upsert)."""
+        stmt = insert(model).values(**keys, **counters)
+        stmt = stmt.on_conflict_do_update(
+            constraint=constraint,
+            set_={
+                name: getattr(model, name) + stmt.excluded[name]
+                for name in counters
+            },
+        )
+        db.session.execute(stmt)
+
+    async def register_answer(
+        self,
+        quiz_id: int,
+        question_id: int,
+        tg_user_id: Optional[int],
+        is_right: bool,
+        answer_id: Optional[int] = None,
+        position: Optional[int] = None,
+        day: Optional[date] = None,
+    ) -> None:
+        """Учесть ответ пользователя в накопительных таблицах.
+
+        Keyword Arguments:
+        -----------------
+        quiz_id (int): идентификатор викторины
+        question_id (int): идентификатор вопроса
+        tg_user_id (Optional[int]): идентификатор телеграм пользователя
+        is_right (bool): флаг правильного ответа
+        answer_id (Optional[int]): идентификатор выбранного варианта
+        position (Optional[int]): порядковый номер ответа в прохождении
+        day (Optional[date]): день ответа, по умолчанию сегодня
+
+        """
+        day = day or datetime.utcnow().date()
+        self._increment(
+            DailyAnswerStatistic,
+            '_daily_answer_statistic_uc',
+            {'day': day, 'quiz_id': quiz_id, 'question_id': question_id},
+            {'answers_count': 1, 'correct_count': int(is_right)},
+        )
+        if answer_id is not None:
+            self._increment(
+                VariantStatistic,
+                '_variant_statistic_uc',
+                {'question_id': question_id, 'variant_id': answer_id},
+                {'answers_count': 1},
+            )
+        if position is not None:
+            self._increment(
+                QuizFunnelStep,
+                '_quiz_funnel_step_uc',
+                {'quiz_id': quiz_id, 'position': position},
+                {'users_count': 1},
+            )
+        if tg_user_id is not None:
+            self._increment(
+                DailyUserActivity,
+                '_daily_user_activity_uc',
+                {'day': day, 'tg_user_id': tg_user_id},
+                {'answers_count': 1, 'correct_count': int(is_right)},
+            )
+        commit()
+        active_user_counter.track(PLAYED, [tg_user_id], day)
+
+    async def register_completion(
+        self,
+        tg_user_id: Optional[int],
+        quiz_id: Optional[int] = None,
+        score_bucket: Optional[int] = None,
+        day: Optional[date] = None,
+    ) -> None:
+        """Учесть завершение викторины пользователем.
+
+        Keyword Arguments:
+        -----------------
+        tg_user_id (Optional[int]): идентификатор телеграм пользователя
+        quiz_id (Optional[int]): идентификатор завершенной викторины
+        score_bucket (Optional[int]): корзина гистограммы результатов,
+            None если в прохождении не было ответов
+        day (Optional[date]): день завершения, по умолчанию сегодня
+
+        """
+        day = day or datetime.utcnow().date()
+        if tg_user_id is not None:
+            self._increment(
+                DailyUserActivity,
+                '_daily_user_activity_uc',
+                {'day': day, 'tg_user_id': tg_user_id},
+                {'completed_count': 1},
+            )
+        if quiz_id is not None and score_bucket is not None:
+            self._increment(
+                QuizScoreHistogram,
+                '_quiz_score_histogram_uc',
+                {'quiz_id': quiz_id, 'bucket': score_bucket},
+                {'results_count': 1},
+            )
+        commit()
+        active_user_counter.track(COMPLETED, [tg_user_id], day)
+
+    async def rebuild(self) -> None:
+        """Пересобрать накопительные таблицы из исходных данных.
+
+        Ответы распределяются по дням по времени ответа; ответы,
+        сохраненные до появления времени ответа, относятся к дню
+        пересборки. Архивированные ответы берутся из их счетчиков
+        в archived_answer_statistics. Активность пользователей берется
+        из результатов викторин по дате их завершения.
+
+        На время пересборки таблицы блокируются от записи: счетчики
+        новых ответов ждут окончания пересборки и добавляются к ней.
+        """
+        db.session.execute(
+            text(
+                'LOCK TABLE '
+                + ', '.join(model.__tablename__ for model in ROLLUP_TABLES)
+                + ' IN SHARE ROW EXCLUSIVE MODE',
+            ),
+        )
+        for model in ROLLUP_TABLES:
+            db.session.execute(delete(model))
+
+        # Ответы из базы и счетчики архивированных ответов. Каждая
+        # таблица заполняется одним запросом, поэтому архивация,
+        # завершившаяся во время пересборки, не учитывается дважды.
+        answers = union_all(
+            select(
+                func.coalesce(
+                    cast(UserAnswer.answered_at, Date),
+                    func.current_date(),
+                ).label('day'),
+                UserAnswer.quiz_id,
+                UserAnswer.question_id,
+                UserAnswer.answer_id.label('variant_id'),
+                literal(1).label('answers_count'),
+                case((UserAnswer.is_right, 1), else_=0).label('correct_count'),
+            ),
+            select(
+                ArchivedAnswerStatistic.day,
+                ArchivedAnswerStatistic.quiz_id,
+                ArchivedAnswerStatistic.question_id,
+                ArchivedAnswerStatistic.variant_id,
+                ArchivedAnswerStatistic.answers_count,
+                ArchivedAnswerStatistic.correct_count,
+            ),
+        ).subquery()
+        db.session.execute(
+            insert(DailyAnswerStatistic).from_select(
+                [
+                    'day',
+                    'quiz_id',
+                    'question_id',
+                    'answers_count',
+                    'correct_count',
+                ],
+                select(
+                    answers.c.day,
+                    answers.c.quiz_id,
+                    answers.c.question_id,
+                    func.sum(answers.c.answers_count),
+                    func.sum(answers.c.correct_count),
+                ).group_by(
+                    answers.c.day,
+                    answers.c.quiz_id,
+                    answers.c.question_id,
+                ),
+            ),
+        )
+
+        db.session.execute(
+            insert(VariantStatistic).from_select(
+                ['question_id', 'variant_id', 'answers_count'],
+                select(
+                    answers.c.question_id,
+                    answers.c.variant_id,
+                    func.sum(answers.c.answers_count),
+                ).group_by(answers.c.question_id, answers.c.variant_id),
+            ),
+        )
+
+        result_day = cast(
+            func.coalesce(QuizResult.ended_on, QuizResult.created_on),
+            Date,
+        )
+        db.session.execute(
+            insert(DailyUserActivity).from_select(
+                [
+                    'day',
+                    'tg_user_id',
+                    'answers_count',
+                    'correct_count',
+                    'completed_count',
+                ],
+                select(
+                    result_day,
+                    QuizResult.tg_user_id,
+                    func.sum(QuizResult.total_questions),
+                    func.sum(QuizResult.correct_answers_count),
+                    func.count(QuizResult.id).filter(QuizResult.is_complete),
+                )
+                .where(QuizResult.tg_user_id.is_not(None))
+                .group_by(result_day, QuizResult.tg_user_id),
+            ),
+        )
+
+        # Прохождение с N ответами дошло до каждой позиции от 1 до N
+        positions = select(
+            QuizResult.quiz_id,
+            func.generate_series(1, QuizResult.total_questions).label(
+                'position',
+            ),
+        ).subquery()
+        db.session.execute(
+            insert(QuizFunnelStep).from_select(
+                ['quiz_id', 'position', 'users_count'],
+                select(
+                    positions.c.quiz_id,
+                    positions.c.position,
+                    func.count(),
+                ).group_by(positions.c.quiz_id, positions.c.position),
+            ),
+        )
+
+        # Корзины считаются той же функцией, что и на странице результата,
+        # поэтому из базы берутся только уникальные пары счетчиков.
+        histogram = Counter()
+        for quiz_id, correct, total, results_count in db.session.execute(
+            select(
+                QuizResult.quiz_id,
+                QuizResult.correct_answers_count,
+                QuizResult.total_questions,
+                func.count(QuizResult.id),
+            )
+            .where(QuizResult.is_complete)
+            .group_by(
+                QuizResult.quiz_id,
+                QuizResult.correct_answers_count,
+                QuizResult.total_questions,
+            ),
+        ):
+            bucket = get_score_bucket(correct, total)
+            if bucket is not None:
+                histogram[(quiz_id, bucket)] += results_count
+        if histogram:
+            db.session.execute(
+                insert(QuizScoreHistogram),
+                [
+                    {
+                        'quiz_id': quiz_id,
+                        'bucket': bucket,
+                        'results_count': results_count,
+                    }
+                    for (quiz_id, bucket), results_count in histogram.items()
+                ],
+            )
+        db.session.commit()
+        await self.rebuild_active_users()
+
+    async def rebuild_active_users(self) -> None:
+        """Заполнить счетчики активных пользователей из дневной активности.
+
+        Берутся только дни, ключи которых еще хранятся в Redis.
+        """
+        since = datetime.utcnow().date() - timedelta(
+            days=active_user_counter.retention_days,
+        )
+        rows = db.session.execute(
+            select(
+                DailyUserActivity.day,
+                DailyUserActivity.tg_user_id,
+                DailyUserActivity.completed_count > 0,
+            ).where(DailyUserActivity.day >= since),
+        )
+        played, completed = {}, {}
+        for day, tg_user_id, is_completed in rows:
+            played.setdefault(day, []).append(tg_user_id)
+            if is_completed:
+                completed.setdefault(day, []).append(tg_user_id)
+        for event, users_by_day in ((PLAYED, played), (COMPLETED, completed)):
+            for day, tg_user_ids in users_by_day.items():
+                active_user_counter.track(event, tg_user_ids, day)
+
+
+statistic_rollup_crud = CRUDStatisticRollup()
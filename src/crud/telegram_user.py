@@ -1,14 +1,35 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import distinct, func, null, select, true
+from sqlalchemy import (
+    Select,
+    bindparam,
+    distinct,
+    func,
+    null,
+    select,
+    true,
+    update,
+)
 
 from src import db
-from src.crud.base import CRUDBase
+from src.active_users import COMPLETED, PLAYED, active_user_counter
+from src.crud.base import CRUDBase, PrebuiltStatement, commit
 from src.models.quiz_result import QuizResult
 from src.models.telegram_user import TelegramUser
 
 
+def telegram_user_statement() -> Select:
+    """Запрос телеграм пользователя по telegram_id."""
+    return select(TelegramUser).where(
+        TelegramUser.telegram_id == bindparam('telegram_id'),
+    )
+
+
+# Запрос собирается один раз, при вызове передаются только параметры
+TELEGRAM_USER_BY_TELEGRAM_ID = PrebuiltStatement(telegram_user_statement)
+
+
 class CRUDTelegramUser(CRUDBase):
 
     """Класс для работы с моделью TelegramUser через CRUD."""
@@ -20,9 +41,8 @@ class CRUDTelegramUser(CRUDBase):
         """Получение пользователя по telegram_id."""
         return (
             db.session.execute(
-                db.select(TelegramUser).where(
-                    TelegramUser.telegram_id == telegram_id,
-                ),
+                TELEGRAM_USER_BY_TELEGRAM_ID.statement,
+                {'telegram_id': telegram_id},
             )
             .scalars()
             .first()
@@ -34,6 +54,19 @@ class CRUDTelegramUser(CRUDBase):
             db.exists().where(TelegramUser.telegram_id == telegram_id),
         ).scalar()
 
+    async def mark_active(
+        self,
+        tg_user_id: int,
+        active_at: Optional[datetime] = None,
+    ) -> None:
+        """Обновить время последней активности пользователя."""
+        db.session.execute(
+            update(TelegramUser)
+            .where(TelegramUser.id == tg_user_id)
+            .values(last_active_at=active_at or datetime.utcnow()),
+        )
+        commit()
+
     async def get_total_users_played_quiz(self) -> int:
         """Получение общего количества пользователей, игравших в викторину."""
         query = (
@@ -62,37 +95,18 @@ class CRUDTelegramUser(CRUDBase):
     async def get_users_played_quiz_since(self, date: datetime) -> int:
         """Получение количества пользователей.
 
-        игравших в викторину с указанной даты.
+        отвечавших на вопросы викторин с указанной даты.
+        Значение приблизительное, берется из счетчиков HyperLogLog.
         """
-        query = (
-            select(func.count(distinct(TelegramUser.id)))
-            .select_from(TelegramUser)
-            .outerjoin(QuizResult, TelegramUser.id == QuizResult.tg_user_id)
-            .where(
-                QuizResult.id != null(),
-                TelegramUser.created_on >= date,
-            )
-        )
-        # Assuming None is used to represent null in your models
-        return db.session.execute(query).scalar()
+        return active_user_counter.count(PLAYED, date.date())
 
     async def get_users_completed_quiz_since(self, date: datetime) -> int:
         """Получение количества пользователей.
 
-        прошедших викторину до конца с указанной даты.
+        завершивших викторину с указанной даты.
+        Значение приблизительное, берется из счетчиков HyperLogLog.
         """
-        query = (
-            select(func.count(distinct(TelegramUser.id)))
-            .select_from(TelegramUser)
-            .outerjoin(QuizResult, TelegramUser.id == QuizResult.tg_user_id)
-            .where(
-                QuizResult.id != null(),
-                QuizResult.is_complete == true(),
-                TelegramUser.created_on >= date,
-            )
-        )
-        # Assuming None is used to represent null in your models
-        return db.session.execute(query).scalar()
+        return active_user_counter.count(COMPLETED, date.date())
 
 
 telegram_user_crud = CRUDTelegramUser(TelegramUser)
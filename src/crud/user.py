@@ -1,9 +1,22 @@
 from datetime import datetime
 from typing import Optional
 
+from sqlalchemy import Select, bindparam, delete, select, update
+
 from src import db
-from src.crud.base import CRUDBase
+from src.crud.base import CRUDBase, PrebuiltStatement
+from src.models.quiz_result import QuizResult
 from src.models.user import User
+from src.models.user_answer import UserAnswer
+
+
+def user_statement() -> Select:
+    """Запрос пользователя по telegram_id."""
+    return select(User).where(User.telegram_id == bindparam('telegram_id'))
+
+
+# Запрос собирается один раз, при вызове передаются только параметры
+USER_BY_TELEGRAM_ID = PrebuiltStatement(user_statement)
 
 
 class CRUDUser(CRUDBase):
@@ -19,7 +32,8 @@ class CRUDUser(CRUDBase):
 
         """
         user = db.session.execute(
-            db.select(User).where(User.telegram_id == telegram_id),
+            USER_BY_TELEGRAM_ID.statement,
+            {'telegram_id': telegram_id},
         )
         return user.scalars().first()
 
@@ -37,5 +51,31 @@ class CRUDUser(CRUDBase):
             .count()
         )
 
+    def _detach_results(self, user_id: int) -> None:
+        """Отвязать результаты и ответы от пользователя без коммита.
+
+        Каждая таблица обновляется одним запросом UPDATE, объекты
+        в память не загружаются.
+        """
+        for model in (QuizResult, UserAnswer):
+            db.session.execute(
+                update(model)
+                .where(model.user_id == user_id)
+                .values(user_id=None),
+                execution_options={'synchronize_session': False},
+            )
+
+    async def delete_profile(self, user: User) -> None:
+        """Удалить пользователя, сохранив его результаты и ответы.
+
+        Результаты и ответы отвязываются и пользователь удаляется
+        в одной транзакции.
+        """
+        self._detach_results(user.id)
+        # Результаты уже отвязаны, поэтому каскад ORM не нужен.
+        # Пользователь может быть отсоединенным объектом из кэша.
+        db.session.execute(delete(User).where(User.id == user.id))
+        db.session.commit()
+
 
 user_crud = CRUDUser(User)
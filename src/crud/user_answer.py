@@ -1,10 +1,13 @@
+from datetime import datetime, timedelta
 from typing import List, Optional
 
-from sqlalchemy import select
+from sqlalchemy import Date, and_, cast, delete, func, or_, select
+from sqlalchemy.dialects.postgresql import insert
 
 from src import db
-from src.crud.base import CRUDBase
+from src.crud.base import CRUDBase, commit
 from src.models.question import Question
+from src.models.statistic_rollup import ArchivedAnswerStatistic
 from src.models.user_answer import UserAnswer
 
 
@@ -36,30 +39,160 @@ class CRUDUserAnswer(CRUDBase):
         user_id: int,
         quiz_id: int,
         tg_user: bool = False,
+        attempt: Optional[int] = None,
     ) -> Optional[UserAnswer]:
-        """Получить результаты ответов пользователя по конкретной викторине."""
+        """Получить результаты ответов пользователя по конкретной викторине.
+
+        Номер попытки ограничивает ответы одной попыткой прохождения.
+        """
         user_id_filter = (
             UserAnswer.tg_user_id if tg_user else UserAnswer.user_id
         )
-        return (
-            db.session.execute(
-                select(UserAnswer).where(
-                    user_id_filter == user_id,
-                    UserAnswer.question_id.in_(
-                        select(Question.id).where(
-                            Question.quizzes.any(id=quiz_id),
-                        ),
-                    ),
-                    UserAnswer.quiz_id == quiz_id,
+        query = select(UserAnswer).where(
+            user_id_filter == user_id,
+            UserAnswer.question_id.in_(
+                select(Question.id).where(
+                    Question.quizzes.any(id=quiz_id),
                 ),
-            )
+            ),
+            UserAnswer.quiz_id == quiz_id,
+        )
+        if attempt is not None:
+            query = query.where(UserAnswer.attempt == attempt)
+        return (
+            db.session.execute(query)
             .scalars()
             .all()
         )
 
+    async def create_if_absent(self, obj_in: dict) -> bool:
+        """Сохранить ответ, если на вопрос в попытке еще нет ответа.
+
+        Возвращает True, если ответ сохранен. Повтор пропускается
+        по ограничению _person_question_attempt_uc без ошибки.
+        """
+        answer_id = db.session.execute(
+            insert(UserAnswer)
+            .values(**obj_in)
+            .on_conflict_do_nothing(constraint='_person_question_attempt_uc')
+            .returning(UserAnswer.id),
+        ).scalar()
+        commit()
+        return answer_id is not None
+
     async def get_total_answers(self) -> int:
         """Получение общего количества ответов."""
         return db.session.query(UserAnswer).count()
 
+    def _orphaned_before(self, before: datetime) -> list:
+        """Условия для ответов без пользователя старше указанной даты.
+
+        Ответы без времени считаются старыми: они сохранены до появления
+        колонки answered_at.
+        """
+        return [
+            UserAnswer.user_id.is_(None),
+            or_(
+                UserAnswer.answered_at.is_(None),
+                UserAnswer.answered_at < before,
+            ),
+        ]
+
+    async def get_orphaned_months(self, before: datetime) -> List[datetime]:
+        """Получить месяцы, за которые есть ответы без пользователя.
+
+        Месяц None означает ответы без времени ответа.
+        """
+        month = func.date_trunc('month', UserAnswer.answered_at)
+        return (
+            db.session.execute(
+                select(month)
+                .where(*self._orphaned_before(before))
+                .group_by(month)
+                .order_by(month.nulls_first()),
+            )
+            .scalars()
+            .all()
+        )
+
+    async def get_orphaned_batch(
+        self,
+        before: datetime,
+        month: Optional[datetime],
+        after_id: int,
+        limit: int,
+    ) -> List[dict]:
+        """Получить пачку ответов без пользователя за месяц по порядку id."""
+        if month is None:
+            month_filter = UserAnswer.answered_at.is_(None)
+        else:
+            # Полуоткрытый диапазон, чтобы работал индекс answered_at
+            next_month = (month.replace(day=28) + timedelta(days=4)).replace(
+                day=1,
+            )
+            month_filter = and_(
+                UserAnswer.answered_at >= month,
+                UserAnswer.answered_at < next_month,
+            )
+        rows = db.session.execute(
+            select(UserAnswer.__table__)
+            .where(
+                *self._orphaned_before(before),
+                month_filter,
+                UserAnswer.id > after_id,
+            )
+            .order_by(UserAnswer.id)
+            .limit(limit),
+        )
+        return [dict(row._mapping) for row in rows]
+
+    async def delete_archived(self, ids: List[int]) -> None:
+        """Удалить архивированные ответы, сохранив их счетчики.
+
+        Счетчики добавляются в archived_answer_statistics той же
+        транзакцией, поэтому пересборка статистики их не теряет.
+        """
+        day = func.coalesce(
+            cast(UserAnswer.answered_at, Date),
+            func.current_date(),
+        )
+        counts = insert(ArchivedAnswerStatistic).from_select(
+            [
+                'day',
+                'quiz_id',
+                'question_id',
+                'variant_id',
+                'answers_count',
+                'correct_count',
+            ],
+            select(
+                day,
+                UserAnswer.quiz_id,
+                UserAnswer.question_id,
+                UserAnswer.answer_id,
+                func.count(UserAnswer.id),
+                func.count(UserAnswer.id).filter(UserAnswer.is_right),
+            )
+            .where(UserAnswer.id.in_(ids))
+            .group_by(
+                day,
+                UserAnswer.quiz_id,
+                UserAnswer.question_id,
+                UserAnswer.answer_id,
+            ),
+        )
+        db.session.execute(
+            counts.on_conflict_do_update(
+                constraint='_archived_answer_statistic_uc',
+                set_={
+                    name: getattr(ArchivedAnswerStatistic, name)
+                    + counts.excluded[name]
+                    for name in ('answers_count', 'correct_count')
+                },
+            ),
+        )
+        db.session.execute(delete(UserAnswer).where(UserAnswer.id.in_(ids)))
+        db.session.commit()
+
 
 user_answer_crud = CRUDUserAnswer(UserAnswer)
@@ -0,0 +1,93 @@
+import logging
+import os
+import time
+from io import BytesIO
+from typing import Optional
+
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ExportCache:
+
+    """Кэш готовых файлов экспорта на локальном диске.
+
+    Файлы хранятся под именем отпечатка версии данных, поэтому
+    повторный экспорт без изменений в базе отдает готовый файл.
+    Устаревшие файлы удаляются по возрасту и общему размеру кэша.
+
+    """
+
+    suffix = '.xlsx'
+
+    def __init__(self, directory: str, max_age: int, max_size: int) -> None:
+        """Директория кэша, максимальный возраст и размер в байтах."""
+        self.directory = directory
+        self.max_age = max_age
+        self.max_size = max_size
+
+    def _path(self, fingerprint: str) -> str:
+        """Путь к файлу экспорта для отпечатка."""
+        return os.path.join(self.directory, f'{fingerprint}{self.suffix}')
+
+    def get(self, fingerprint: str) -> Optional[BytesIO]:
+        """Получить готовый файл экспорта или None."""
+        path = self._path(fingerprint)
+        try:
+            if time.time() - os.path.getmtime(path) > self.max_age:
+                return None
+            with open(path, 'rb') as file:
+                return BytesIO(file.read())
+        except OSError:
+            return None
+
+    def put(self, fingerprint: str, file: BytesIO) -> None:
+        """Сохранить файл экспорта и почистить кэш."""
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            path = self._path(fingerprint)
+            # Пишем во временный файл, чтобы не отдать недописанный экспорт
+            tmp_path = f'{path}.{os.getpid()}.tmp'
+            with open(tmp_path, 'wb') as cache_file:
+                cache_file.write(file.getvalue())
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.warning(f'Не удалось сохранить экспорт в кэш: {e}')
+            return
+        self.collect_garbage()
+
+    def collect_garbage(self) -> None:
+        """Удалить устаревшие файлы и уложиться в максимальный размер."""
+        try:
+            entries = [
+                entry
+                for entry in os.scandir(self.directory)
+                if entry.is_file() and entry.name.endswith(self.suffix)
+            ]
+        except OSError:
+            return
+
+        now = time.time()
+        # Сначала самые новые файлы, они остаются в кэше
+        entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+        total_size = 0
+        for entry in entries:
+            stat = entry.stat()
+            if (
+                now - stat.st_mtime <= self.max_age
+                and total_size + stat.st_size <= self.max_size
+            ):
+                total_size += stat.st_size
+                continue
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+export_cache = ExportCache(
+    settings.EXPORT_CACHE_DIR,
+    max_age=settings.EXPORT_CACHE_MAX_AGE,
+    max_size=settings.EXPORT_CACHE_MAX_SIZE,
+)
@@ -0,0 +1,298 @@
+import logging
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Tuple
+
+from sqlalchemy import event, text
+
+from . import db
+from .crud.answer_statistic import answer_statistic_crud
+from .crud.export_watermark import export_watermark_crud
+from .crud.question import question_crud
+from .crud.quiz import quiz_crud
+from .crud.quiz_result import quiz_result_crud
+from .crud.telegram_user import telegram_user_crud
+from .crud.user import user_crud
+from .crud.user_answer import user_answer_crud
+
+logger = logging.getLogger(__name__)
+
+# Таблицы, которые растут вместе с количеством пользователей и ответов.
+# Остальные таблицы (рубрики, викторины, вопросы и варианты) растут
+# только вместе с контентом, и для тестового объема планировщик
+# обоснованно читает их последовательно.
+LARGE_TABLES = (
+    'quiz_results',
+    'telegram_users',
+    'user_answers',
+    'users',
+)
+
+SEED_STATEMENTS = (
+    (
+        'categories',
+        "INSERT INTO categories (name, is_active) "
+        "SELECT 'audit-' || g, true FROM generate_series(1, 10) AS g",
+    ),
+    (
+        'questions',
+        "INSERT INTO questions (title, category_id, is_active) "
+        "SELECT 'audit-question-' || g, c.id, true "
+        "FROM generate_series(1, 1000) AS g "
+        "JOIN categories AS c ON c.name = 'audit-' || (g % 10 + 1)",
+    ),
+    (
+        'variants',
+        "INSERT INTO variants (question_id, title, is_right_choice) "
+        "SELECT q.id, 'audit-variant-' || v, v = 1 "
+        "FROM questions AS q CROSS JOIN generate_series(1, 4) AS v "
+        "WHERE q.title LIKE 'audit-question-%'",
+    ),
+    (
+        'quizzes',
+        "INSERT INTO quizzes (title, is_active) "
+        "SELECT 'audit-quiz-' || g, true FROM generate_series(1, 100) AS g",
+    ),
+    (
+        'quiz_questions',
+        "INSERT INTO quiz_questions (quiz_id, question_id) "
+        "SELECT z.id, q.id FROM questions AS q "
+        "JOIN quizzes AS z "
+        "ON z.title = 'audit-quiz-' || (substr(q.title, 16)::int % 100 + 1) "
+        "WHERE q.title LIKE 'audit-question-%'",
+    ),
+    (
+        'users',
+        "INSERT INTO users "
+        "(name, username, telegram_id, is_active, is_admin, "
+        "created_on, updated_on) "
+        "SELECT 'audit', 'audit-' || g, -g, true, false, now(), now() "
+        "FROM generate_series(1, :users) AS g",
+    ),
+    (
+        'telegram_users',
+        "INSERT INTO telegram_users "
+        "(telegram_id, first_name, is_premium, added_to_attachment_menu, "
+        "created_on) "
+        "SELECT -g, 'audit', false, false, now() "
+        "FROM generate_series(1, :users) AS g",
+    ),
+    (
+        'quiz_results',
+        "INSERT INTO quiz_results "
+        "(user_id, tg_user_id, quiz_id, total_questions, "
+        "correct_answers_count, is_complete, "
+        "created_on, ended_on, updated_on) "
+        "SELECT u.id, t.id, z.id, 10, 5, k % 2 = 0, now(), now(), now() "
+        "FROM users AS u "
+        "JOIN telegram_users AS t ON t.telegram_id = u.telegram_id "
+        "CROSS JOIN generate_series(0, 3) AS k "
+        "JOIN quizzes AS z "
+        "ON z.title = 'audit-quiz-' || ((u.id + k) % 100 + 1) "
+        "WHERE u.username LIKE 'audit-%'",
+    ),
+    (
+        'user_answers',
+        "INSERT INTO user_answers "
+        "(user_id, tg_user_id, quiz_id, question_id, answer_id, is_right, "
+        "answered_at) "
+        "SELECT r.user_id, r.tg_user_id, r.quiz_id, qq.question_id, v.id, "
+        "v.is_right_choice, now() "
+        "FROM quiz_results AS r "
+        "JOIN users AS u ON u.id = r.user_id "
+        "JOIN quiz_questions AS qq ON qq.quiz_id = r.quiz_id "
+        "JOIN variants AS v ON v.question_id = qq.question_id "
+        "AND v.title = 'audit-variant-1' "
+        "WHERE u.username LIKE 'audit-%'",
+    ),
+)
+
+SAMPLE_IDS = (
+    "SELECT u.id AS user_id, t.id AS tg_user_id, u.telegram_id, "
+    "r.quiz_id, qq.question_id, v.id AS variant_id "
+    "FROM users AS u "
+    "JOIN telegram_users AS t ON t.telegram_id = u.telegram_id "
+    "JOIN quiz_results AS r ON r.user_id = u.id "
+    "JOIN quiz_questions AS qq ON qq.quiz_id = r.quiz_id "
+    "JOIN variants AS v ON v.question_id = qq.question_id "
+    "WHERE u.username = 'audit-1' LIMIT 1"
+)
+
+Check = Callable[[Dict[str, int]], Awaitable[Any]]
+
+
+async def _question_variants(ids: Dict[str, int]) -> Any:
+    """Ленивая загрузка Question.variants."""
+    return (await question_crud.get(ids['question_id'])).variants
+
+
+# Методы круд классов, которые выполняются в запросах пользователей
+# и админки, с аргументами из тестовых данных
+CHECKS: Tuple[Tuple[str, Check], ...] = (
+    (
+        'question_crud.get_new',
+        lambda ids: question_crud.get_new(ids['user_id'], ids['quiz_id']),
+    ),
+    (
+        'question_crud.get_all_by_quiz_id',
+        lambda ids: question_crud.get_all_by_quiz_id(ids['quiz_id']),
+    ),
+    (
+        'question_crud.get_right_answers',
+        lambda ids: question_crud.get_right_answers(ids['question_id']),
+    ),
+    ('Question.variants', _question_variants),
+    (
+        'quiz_crud.get_variant_index',
+        lambda ids: quiz_crud.get_variant_index(ids['quiz_id']),
+    ),
+    (
+        'quiz_crud.get_by_id',
+        lambda ids: quiz_crud.get_by_id(ids['quiz_id']),
+    ),
+    (
+        'quiz_result_crud.get_by_user_and_quiz',
+        lambda ids: quiz_result_crud.get_by_user_and_quiz(
+            ids['user_id'],
+            ids['quiz_id'],
+        ),
+    ),
+    (
+        'quiz_result_crud.get_results_by_user',
+        lambda ids: quiz_result_crud.get_results_by_user(ids['user_id']),
+    ),
+    (
+        'user_answer_crud.get_results_by_user',
+        lambda ids: user_answer_crud.get_results_by_user(
+            ids['tg_user_id'],
+            tg_user=True,
+        ),
+    ),
+    (
+        'user_answer_crud.get_results_by_user_and_quiz',
+        lambda ids: user_answer_crud.get_results_by_user_and_quiz(
+            ids['user_id'],
+            ids['quiz_id'],
+        ),
+    ),
+    (
+        'telegram_user_crud.get_by_telegram_id',
+        lambda ids: telegram_user_crud.get_by_telegram_id(
+            ids['telegram_id'],
+        ),
+    ),
+    (
+        'user_crud.get_by_telegram_id',
+        lambda ids: user_crud.get_by_telegram_id(ids['telegram_id']),
+    ),
+    (
+        'export_watermark_crud.get_by_user',
+        lambda ids: export_watermark_crud.get_by_user(ids['user_id']),
+    ),
+    (
+        'answer_statistic_crud.get_many',
+        lambda ids: answer_statistic_crud.get_many(
+            'question',
+            [ids['question_id']],
+        ),
+    ),
+    (
+        'answer_statistic_crud.get_user_totals',
+        lambda ids: answer_statistic_crud.get_user_totals(ids['tg_user_id']),
+    ),
+    (
+        'answer_statistic_crud.get_variant_distribution',
+        lambda ids: answer_statistic_crud.get_variant_distribution(
+            ids['question_id'],
+        ),
+    ),
+)
+
+
+def _sequential_scans(plan: dict) -> Iterator[str]:
+    """Таблицы, которые план читает последовательно."""
+    if plan.get('Node Type') == 'Seq Scan':
+        yield plan['Relation Name']
+    for child in plan.get('Plans', []):
+        yield from _sequential_scans(child)
+
+
+class IndexAudit:
+
+    """Проверка планов запросов круд классов.
+
+    В транзакции заполняет базу тестовыми данными, выполняет методы
+    круд классов, перехватывает их SQL и проверяет EXPLAIN каждого
+    запроса. Транзакция откатывается, поэтому данные в базе
+    не меняются.
+
+    """
+
+    def __init__(self, users: int) -> None:
+        """Количество тестовых пользователей."""
+        self.users = users
+
+    def _seed(self) -> Dict[str, int]:
+        """Заполнить таблицы и обновить статистику планировщика."""
+        for table, statement in SEED_STATEMENTS:
+            db.session.execute(text(statement), {'users': self.users})
+            db.session.execute(text(f'ANALYZE {table}'))
+        return dict(db.session.execute(text(SAMPLE_IDS)).one()._mapping)
+
+    async def _capture(self, check: Check, ids: Dict[str, int]) -> list:
+        """Выполнить проверку и вернуть выполненные SELECT запросы."""
+        statements = []
+
+        def before_cursor_execute(
+            conn: Any,
+            cursor: Any,
+            statement: str,
+            parameters: Any,
+            context: Any,
+            executemany: bool,
+        ) -> None:
+            if statement.lstrip().upper().startswith('SELECT'):
+                statements.append((statement, parameters))
+
+        engine = db.engine
+        event.listen(engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            await check(ids)
+        finally:
+            event.remove(
+                engine,
+                'before_cursor_execute',
+                before_cursor_execute,
+            )
+        return statements
+
+    def _explain(self, statement: str, parameters: Any) -> List[str]:
+        """Большие таблицы, которые план запроса читает целиком."""
+        plan = (
+            db.session.connection()
+            .exec_driver_sql(f'EXPLAIN (FORMAT JSON) {statement}', parameters)
+            .scalar()
+        )
+        return [
+            table
+            for table in _sequential_scans(plan[0]['Plan'])
+            if table in LARGE_TABLES
+        ]
+
+    async def run(self) -> List[Tuple[str, str, str]]:
+        """Выполнить проверку.
+
+        Возвращает список (метод, таблица, запрос) для каждого
+        последовательного чтения большой таблицы.
+        """
+        problems = []
+        try:
+            ids = self._seed()
+            for name, check in CHECKS:
+                for statement, parameters in await self._capture(check, ids):
+                    for table in self._explain(statement, parameters):
+                        problems.append((name, table, statement))
+        finally:
+            db.session.rollback()
+            for table, _ in SEED_STATEMENTS:
+                db.session.execute(text(f'ANALYZE {table}'))
+            db.session.commit()
+        return problems
@@ -1,3 +1,5 @@
+from sqlalchemy import Index
+
 from src import db
 from src.models.base import BaseModel, IsActiveMixin
 
@@ -43,3 +45,11 @@ class Category(BaseModel, IsActiveMixin):
     def __str__(self) -> str:
         """Отображение названия объекта в админ зоне."""
         return self.name
+
+
+Index(
+    'ix_categories_name_trgm',
+    Category.name,
+    postgresql_using='gin',
+    postgresql_ops={'name': 'gin_trgm_ops'},
+)
@@ -0,0 +1,39 @@
+from src import db
+from src.models.base import BaseModel
+
+
+class ExportWatermark(BaseModel):
+
+    """Модель отметки последнего экспорта статистики.
+
+    Хранит для каждого администратора последние выгруженные
+    идентификаторы ответов и результатов викторин.
+
+    """
+
+    __tablename__ = 'export_watermarks'
+
+    user_id = db.Column(
+        db.Integer,
+        db.ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=False,
+        unique=True,
+        comment='Идентификатор администратора, выполнившего экспорт.',
+    )
+    last_answer_id = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Последний выгруженный идентификатор ответа.',
+    )
+    last_result_id = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Последний выгруженный идентификатор результата викторины.',
+    )
+    exported_on = db.Column(
+        db.DateTime,
+        nullable=True,
+        comment='Время последнего экспорта.',
+    )
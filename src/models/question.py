@@ -1,3 +1,5 @@
+from sqlalchemy import Index, cast, func, literal
+from sqlalchemy.dialects.postgresql import REGCONFIG
 from sqlalchemy.orm import deferred
 
 from src import db
@@ -57,3 +59,24 @@ class Question(BaseModel, IsActiveMixin):
     def __str__(self) -> str:
         """Отображение названия объекта в админ зоне."""
         return self.title
+
+
+Index(
+    'ix_questions_title_trgm',
+    Question.title,
+    postgresql_using='gin',
+    postgresql_ops={'title': 'gin_trgm_ops'},
+)
+
+# Полнотекстовое представление текста вопроса на русском языке.
+# Выражение совпадает с индексом ix_questions_title_tsv.
+question_title_document = func.to_tsvector(
+    cast(literal('russian'), REGCONFIG),
+    Question.title,
+)
+
+Index(
+    'ix_questions_title_tsv',
+    question_title_document,
+    postgresql_using='gin',
+)
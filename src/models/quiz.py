@@ -1,3 +1,5 @@
+from sqlalchemy import Index
+
 from src import db
 from src.models.base import BaseModel, IsActiveMixin
 from src.models.quiz_question import quiz_questions
@@ -20,11 +22,13 @@ class Quiz(BaseModel, IsActiveMixin):
         unique=True,
     )
 
+    # Вопросы загружаются только там, где они нужны (selectinload
+    # в форме админки), списки викторин читают проекцию каталога.
     questions = db.relationship(
         'Question',
         secondary=quiz_questions,
         back_populates='quizzes',
-        lazy='subquery',
+        lazy='select',
     )
 
     # Связь с таблицей результатов викторины
@@ -36,3 +40,11 @@ class Quiz(BaseModel, IsActiveMixin):
     def __str__(self) -> str:
         """Отображение названия объекта в админ зоне."""
         return self.title
+
+
+Index(
+    'ix_quizzes_title_trgm',
+    Quiz.title,
+    postgresql_using='gin',
+    postgresql_ops={'title': 'gin_trgm_ops'},
+)
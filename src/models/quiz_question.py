@@ -15,4 +15,7 @@ quiz_questions = db.Table(
         db.ForeignKey('questions.id'),
         primary_key=True,
     ),
+    # Первичный ключ (quiz_id, question_id) не помогает искать викторины
+    # по вопросу, например в Question.quizzes.any(...)
+    db.Index('ix_quiz_questions_question_id', 'question_id'),
 )
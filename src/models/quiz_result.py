@@ -1,6 +1,6 @@
 from datetime import datetime
 
-from sqlalchemy import UniqueConstraint
+from sqlalchemy import Index, UniqueConstraint
 
 from src import db
 from src.models.base import BaseModel, TimestampMixin
@@ -28,6 +28,7 @@ class QuizResult(BaseModel, TimestampMixin):
         db.ForeignKey('telegram_users.id'),
         nullable=True,
         comment='Идентификатор телеграм пользователя.',
+        index=True,
     )
     quiz_id = db.Column(
         db.Integer,
@@ -45,6 +46,13 @@ class QuizResult(BaseModel, TimestampMixin):
         nullable=False,
         comment='Количество правильных ответов, данных пользователем.',
     )
+    attempt = db.Column(
+        db.Integer,
+        nullable=False,
+        default=1,
+        server_default='1',
+        comment='Номер попытки прохождения викторины пользователем.',
+    )
     is_complete = db.Column(
         db.Boolean,
         default=False,
@@ -52,11 +60,31 @@ class QuizResult(BaseModel, TimestampMixin):
     )
 
     ended_on = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_on = db.Column(
+        db.DateTime(),
+        default=datetime.utcnow,
+        onupdate=datetime.utcnow,
+    )
 
     __table_args__ = (
+        # Индекс ограничения находит текущую (последнюю) попытку
+        # и все прошлые попытки пользователя по викторине
         UniqueConstraint(
             'user_id',
             'quiz_id',
-            name='_person_quiz_uc',
+            'attempt',
+            name='_person_quiz_attempt_uc',
+        ),
+        # Завершенные прохождения по пользователям: подсчет пользователей,
+        # прошедших викторину до конца, читает только этот индекс
+        Index(
+            'ix_quiz_results_tg_user_id_complete',
+            'tg_user_id',
+            postgresql_where=db.text('is_complete'),
+        ),
+        Index(
+            'ix_quiz_results_created_on',
+            'created_on',
+            postgresql_using='brin',
         ),
     )
@@ -0,0 +1,280 @@
+from sqlalchemy import UniqueConstraint
+
+from src import db
+from src.models.base import BaseModel
+
+
+class DailyAnswerStatistic(BaseModel):
+
+    """Модель дневных счетчиков ответов.
+
+    Хранит количество всех и правильных ответов на вопрос викторины
+    за день. Статистика по рубрикам считается через вопрос.
+
+    """
+
+    __tablename__ = 'daily_answer_statistics'
+
+    day = db.Column(
+        db.Date,
+        nullable=False,
+        comment='День, за который посчитаны ответы.',
+    )
+    quiz_id = db.Column(
+        db.Integer,
+        db.ForeignKey('quizzes.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор викторины.',
+        index=True,
+    )
+    question_id = db.Column(
+        db.Integer,
+        db.ForeignKey('questions.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор вопроса.',
+        index=True,
+    )
+    answers_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество ответов.',
+    )
+    correct_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество правильных ответов.',
+    )
+    __table_args__ = (
+        UniqueConstraint(
+            'day',
+            'quiz_id',
+            'question_id',
+            name='_daily_answer_statistic_uc',
+        ),
+    )
+
+
+class DailyUserActivity(BaseModel):
+
+    """Модель дневной активности телеграм пользователей.
+
+    Хранит количество ответов и завершенных викторин пользователя за день.
+
+    """
+
+    __tablename__ = 'daily_user_activity'
+
+    day = db.Column(
+        db.Date,
+        nullable=False,
+        comment='День активности.',
+        index=True,
+    )
+    tg_user_id = db.Column(
+        db.Integer,
+        db.ForeignKey('telegram_users.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор телеграм пользователя.',
+        index=True,
+    )
+    answers_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество ответов за день.',
+    )
+    correct_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество правильных ответов за день.',
+    )
+    completed_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество завершенных викторин за день.',
+    )
+    __table_args__ = (
+        UniqueConstraint(
+            'day',
+            'tg_user_id',
+            name='_daily_user_activity_uc',
+        ),
+    )
+
+
+class VariantStatistic(BaseModel):
+
+    """Модель счетчиков выбора вариантов ответа.
+
+    Хранит, сколько раз был выбран каждый вариант ответа на вопрос.
+    По этим счетчикам строится распределение ответов и видно,
+    какие неправильные варианты выбирают чаще всего.
+
+    """
+
+    __tablename__ = 'variant_statistics'
+
+    question_id = db.Column(
+        db.Integer,
+        db.ForeignKey('questions.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор вопроса.',
+        index=True,
+    )
+    variant_id = db.Column(
+        db.Integer,
+        db.ForeignKey('variants.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор выбранного варианта ответа.',
+    )
+    answers_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Сколько раз был выбран вариант.',
+    )
+    __table_args__ = (
+        UniqueConstraint(
+            'question_id',
+            'variant_id',
+            name='_variant_statistic_uc',
+        ),
+    )
+
+
+class QuizScoreHistogram(BaseModel):
+
+    """Модель гистограммы результатов викторины.
+
+    Хранит количество завершенных прохождений викторины по корзинам
+    процента правильных ответов: 0, 10, ..., 100.
+
+    """
+
+    __tablename__ = 'quiz_score_histograms'
+
+    quiz_id = db.Column(
+        db.Integer,
+        db.ForeignKey('quizzes.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор викторины.',
+        index=True,
+    )
+    bucket = db.Column(
+        db.Integer,
+        nullable=False,
+        comment='Процент правильных ответов, округленный до десятка.',
+    )
+    results_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество завершенных прохождений.',
+    )
+    __table_args__ = (
+        UniqueConstraint(
+            'quiz_id',
+            'bucket',
+            name='_quiz_score_histogram_uc',
+        ),
+    )
+
+
+class QuizFunnelStep(BaseModel):
+
+    """Модель воронки прохождения викторины.
+
+    Хранит, сколько прохождений викторины дошли до ответа
+    на вопрос с указанным порядковым номером.
+
+    """
+
+    __tablename__ = 'quiz_funnel_steps'
+
+    quiz_id = db.Column(
+        db.Integer,
+        db.ForeignKey('quizzes.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор викторины.',
+        index=True,
+    )
+    position = db.Column(
+        db.Integer,
+        nullable=False,
+        comment='Порядковый номер ответа в прохождении, начиная с 1.',
+    )
+    users_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество прохождений, дошедших до этого ответа.',
+    )
+    __table_args__ = (
+        UniqueConstraint(
+            'quiz_id',
+            'position',
+            name='_quiz_funnel_step_uc',
+        ),
+    )
+
+
+class ArchivedAnswerStatistic(BaseModel):
+
+    """Модель счетчиков ответов, перенесенных в архив.
+
+    Ответы без пользователя удаляются из user_answers при архивации.
+    Их количество сохраняется здесь, чтобы пересборка накопительных
+    таблиц учитывала и архивированные ответы.
+
+    """
+
+    __tablename__ = 'archived_answer_statistics'
+
+    day = db.Column(
+        db.Date,
+        nullable=False,
+        comment='День ответов.',
+    )
+    quiz_id = db.Column(
+        db.Integer,
+        db.ForeignKey('quizzes.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор викторины.',
+    )
+    question_id = db.Column(
+        db.Integer,
+        db.ForeignKey('questions.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор вопроса.',
+    )
+    variant_id = db.Column(
+        db.Integer,
+        db.ForeignKey('variants.id', ondelete='CASCADE'),
+        nullable=False,
+        comment='Идентификатор выбранного варианта ответа.',
+    )
+    answers_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество архивированных ответов.',
+    )
+    correct_count = db.Column(
+        db.Integer,
+        nullable=False,
+        default=0,
+        comment='Количество архивированных правильных ответов.',
+    )
+    __table_args__ = (
+        UniqueConstraint(
+            'day',
+            'quiz_id',
+            'question_id',
+            'variant_id',
+            name='_archived_answer_statistic_uc',
+        ),
+    )
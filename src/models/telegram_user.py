@@ -1,3 +1,5 @@
+from sqlalchemy import Index, func
+
 from src import db
 from src.models.base import BaseModel, TimestampMixin
 
@@ -46,6 +48,12 @@ class TelegramUser(BaseModel, TimestampMixin):
         default=False,
         comment='Указывает, добавил ли пользователь бота в меню вложений.',
     )
+    last_active_at = db.Column(
+        db.DateTime,
+        nullable=True,
+        comment='Время последнего ответа пользователя.',
+        index=True,
+    )
     quizzes_results = db.relationship(
         'QuizResult',
         backref='tg_result',
@@ -62,3 +70,18 @@ class TelegramUser(BaseModel, TimestampMixin):
 
     def __repr__(self) -> str:
         return f'<TelegramUser id={self.telegram_id}'
+
+
+# Полное имя «Фамилия Имя» для поиска. Выражение совпадает
+# с индексом ix_telegram_users_full_name_trgm, поэтому поиск
+# по нему использует индекс.
+telegram_user_full_name = (
+    func.coalesce(TelegramUser.last_name, '') + ' ' + TelegramUser.first_name
+)
+
+Index(
+    'ix_telegram_users_full_name_trgm',
+    telegram_user_full_name.label('full_name'),
+    postgresql_using='gin',
+    postgresql_ops={'full_name': 'gin_trgm_ops'},
+)
@@ -1,4 +1,6 @@
-from sqlalchemy import UniqueConstraint
+from datetime import datetime
+
+from sqlalchemy import Index, UniqueConstraint
 
 from src import db
 from src.models.base import BaseModel
@@ -48,16 +50,37 @@ class UserAnswer(BaseModel):
         nullable=False,
         comment='Идентификатор выбранного варианта ответа.',
     )
+    attempt = db.Column(
+        db.Integer,
+        nullable=False,
+        default=1,
+        server_default='1',
+        comment='Номер попытки прохождения викторины.',
+    )
     is_right = db.Column(
         db.Boolean,
         default=False,
         comment='Флаг, указывающий, является ли ответ правильным.',
     )
+    answered_at = db.Column(
+        db.DateTime,
+        nullable=True,
+        default=datetime.utcnow,
+        comment='Время ответа.',
+    )
     __table_args__ = (
         UniqueConstraint(
             'user_id',
             'quiz_id',
+            'attempt',
             'question_id',
-            name='_person_question_uc',
+            name='_person_question_attempt_uc',
+        ),
+        # Ответы только добавляются, поэтому время ответа растет вместе
+        # с физическим порядком строк и BRIN индекс остается крошечным
+        Index(
+            'ix_user_answers_answered_at',
+            'answered_at',
+            postgresql_using='brin',
         ),
     )
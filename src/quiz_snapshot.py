@@ -0,0 +1,67 @@
+from typing import Dict, Optional
+
+from .crud.quiz import AnswerVariant, quiz_crud
+from .settings import settings
+
+
+class QuizSnapshot:
+
+    """Снимок вариантов ответов викторины в памяти процесса."""
+
+    def __init__(
+        self,
+        quiz_id: int,
+        version: int,
+        variants: Dict[int, Dict[int, AnswerVariant]],
+    ) -> None:
+        """Викторина, версия каталога и индекс вопрос -> варианты."""
+        self.quiz_id = quiz_id
+        self.version = version
+        self.variants = variants
+
+    def get_variant(
+        self,
+        question_id: Optional[int],
+        variant_id: Optional[int],
+    ) -> Optional[AnswerVariant]:
+        """Вариант ответа, если он относится к вопросу этой викторины."""
+        return self.variants.get(question_id, {}).get(variant_id)
+
+
+class QuizSnapshotIndex:
+
+    """Снимки викторин для проверки ответов без запросов к вариантам.
+
+    Снимок строится одним запросом при первом ответе в викторине
+    и хранится в памяти процесса. Он перестраивается, когда меняется
+    версия каталога: ее увеличивает любое изменение викторин, вопросов
+    и вариантов в админке. Количество снимков ограничено, первыми
+    вытесняются самые старые.
+
+    """
+
+    def __init__(self, max_size: int) -> None:
+        """Максимальное количество снимков в памяти."""
+        self.max_size = max_size
+        self._snapshots: Dict[int, QuizSnapshot] = {}
+
+    async def get(self, quiz_id: int) -> QuizSnapshot:
+        """Получить актуальный снимок викторины."""
+        version = quiz_crud.get_catalogue_version()
+        snapshot = self._snapshots.get(quiz_id)
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        snapshot = QuizSnapshot(
+            quiz_id,
+            version,
+            await quiz_crud.get_variant_index(quiz_id),
+        )
+        self._snapshots.pop(quiz_id, None)
+        while len(self._snapshots) >= self.max_size:
+            self._snapshots.pop(next(iter(self._snapshots)), None)
+        self._snapshots[quiz_id] = snapshot
+        return snapshot
+
+
+quiz_snapshots = QuizSnapshotIndex(settings.QUIZ_SNAPSHOT_CACHE_SIZE)
@@ -0,0 +1,142 @@
+import logging
+from functools import wraps
+from typing import Any, Callable, Iterable, Optional, Tuple
+
+from flask import request
+from flask_jwt_extended import current_user
+from redis import Redis, RedisError
+
+from .constants import HTTP_TOO_MANY_REQUESTS, TOO_MANY_REQUESTS_MESSAGE
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Корзины токенов проверяются и списываются атомарно за один вызов.
+# Запрос проходит, только если токен есть во всех корзинах (по
+# пользователю и по IP). Время берется из Redis, поэтому корзины
+# одинаково пополняются для всех процессов приложения и бота.
+TOKEN_BUCKET_SCRIPT = """
+local now = redis.call('TIME')
+now = tonumber(now[1]) + tonumber(now[2]) / 1000000
+local buckets = {}
+for i, key in ipairs(KEYS) do
+    local rate = tonumber(ARGV[i * 2 - 1])
+    local burst = tonumber(ARGV[i * 2])
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or burst
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(burst, tokens + math.max(0, now - ts) * rate)
+    if tokens < 1 then
+        return 0
+    end
+    buckets[i] = {key, tokens - 1, math.ceil(burst / rate) + 1}
+end
+for _, bucket in ipairs(buckets) do
+    redis.call(
+        'HSET', bucket[1], 'tokens', tostring(bucket[2]), 'ts', tostring(now)
+    )
+    redis.call('EXPIRE', bucket[1], bucket[3])
+end
+return 1
+"""
+
+# Лимит: скорость пополнения (токенов в секунду) и емкость корзины
+Limit = Tuple[float, int]
+
+
+def current_telegram_id() -> Optional[int]:
+    """Telegram id пользователя из JWT (после jwt_required)."""
+    return current_user.telegram_id
+
+
+class RateLimiter:
+
+    """Ограничение частоты запросов корзиной токенов в Redis.
+
+    У каждого пользователя (telegram id) и IP адреса своя корзина
+    для каждого ограничиваемого действия. Запрос забирает из корзин
+    по токену, корзины пополняются с постоянной скоростью до своей
+    емкости. Проверка всех корзин выполняется одним Lua скриптом,
+    то есть за одно обращение к Redis. Если Redis недоступен,
+    запросы не ограничиваются.
+
+    """
+
+    key_prefix = 'rate_limit'
+
+    def __init__(self, redis: Redis, ip_factor: int) -> None:
+        """Клиент Redis и во сколько раз лимит IP больше лимита пользователя.
+
+        С одного IP (мобильный оператор, NAT) могут приходить запросы
+        многих пользователей, поэтому его корзина больше.
+        """
+        self.redis = redis
+        self.ip_factor = ip_factor
+        self.script = redis.register_script(TOKEN_BUCKET_SCRIPT)
+
+    def hit(
+        self,
+        action: str,
+        limit: Limit,
+        telegram_id: Optional[Any] = None,
+        ip: Optional[str] = None,
+    ) -> bool:
+        """Учесть запрос. Возвращает False, если лимит исчерпан."""
+        rate, burst = limit
+        keys, args = [], []
+        if telegram_id is not None:
+            keys.append(f'{self.key_prefix}:{action}:user:{telegram_id}')
+            args += [rate, burst]
+        if ip is not None:
+            keys.append(f'{self.key_prefix}:{action}:ip:{ip}')
+            args += [rate * self.ip_factor, burst * self.ip_factor]
+        if not keys:
+            return True
+        try:
+            return bool(self.script(keys=keys, args=args))
+        except RedisError as e:
+            logger.warning(f'Не удалось проверить лимит {action}: {e}')
+            return True
+
+    def limit(
+        self,
+        action: str,
+        limit: Limit,
+        telegram_id: Optional[Callable[[], Optional[Any]]] = None,
+        methods: Iterable[str] = ('GET', 'POST'),
+    ) -> Callable:
+        """Декоратор представления: лимит по пользователю и IP.
+
+        Keyword Arguments:
+        -----------------
+        action (str): название ограничиваемого действия
+        limit (Limit): скорость пополнения и емкость корзины
+        telegram_id (Optional[Callable]): функция, возвращающая
+            telegram id пользователя запроса или None. Без нее запросы
+            ограничиваются только по IP
+        methods (Iterable[str]): ограничиваемые HTTP методы
+
+        """
+        methods = set(methods)
+
+        def decorator(view: Callable) -> Callable:
+            @wraps(view)
+            async def wrapper(*args: Any, **kwargs: Any) -> Any:
+                if request.method in methods and not self.hit(
+                    action,
+                    limit,
+                    telegram_id=telegram_id() if telegram_id else None,
+                    ip=request.remote_addr,
+                ):
+                    return TOO_MANY_REQUESTS_MESSAGE, HTTP_TOO_MANY_REQUESTS
+                return await view(*args, **kwargs)
+
+            return wrapper
+
+        return decorator
+
+
+rate_limiter = RateLimiter(
+    settings.RATE_LIMIT_REDIS,
+    ip_factor=settings.RATE_LIMIT_IP_FACTOR,
+)
@@ -70,6 +70,75 @@ class Settings:
     WEBHOOK_PATH: str = f'/bot/{TELEGRAM_TOKEN}'
     WEBHOOK_URL: str = f'{WEB_URL}{WEBHOOK_PATH}'
     SECRET_KEY: str = get('SECRET_KEY')
+    # Кэш готовых файлов экспорта статистики
+    EXPORT_CACHE_DIR: str = get('EXPORT_CACHE_DIR', '/app/export_cache')
+    EXPORT_CACHE_MAX_AGE: int = int(get('EXPORT_CACHE_MAX_AGE', 60 * 60 * 24))
+    EXPORT_CACHE_MAX_SIZE: int = int(
+        get('EXPORT_CACHE_MAX_SIZE', 1024 * 1024 * 100),  # 100MB
+    )
+    # Кэш страниц статистики админки (секунды)
+    STATISTICS_CACHE_TTL: int = int(get('STATISTICS_CACHE_TTL', 60))
+    STATISTICS_CACHE_STALE_TTL: int = int(
+        get('STATISTICS_CACHE_STALE_TTL', 60 * 10),
+    )
+    STATISTICS_CACHE_LOCK_TIMEOUT: int = int(
+        get('STATISTICS_CACHE_LOCK_TIMEOUT', 30),
+    )
+    # Кэш страниц каталога викторин (секунды)
+    CATALOGUE_CACHE_TTL: int = int(get('CATALOGUE_CACHE_TTL', 60 * 60))
+    # Количество снимков вариантов ответов викторин в памяти процесса
+    QUIZ_SNAPSHOT_CACHE_SIZE: int = int(get('QUIZ_SNAPSHOT_CACHE_SIZE', 256))
+    # JSON API WebApp: ответов в одной пачке и хранение ответа
+    # на запрос с ключом идемпотентности (секунды)
+    API_ANSWERS_BATCH_SIZE: int = int(get('API_ANSWERS_BATCH_SIZE', 50))
+    API_IDEMPOTENCY_TTL: int = int(get('API_IDEMPOTENCY_TTL', 60 * 60 * 24))
+    # Счетчики активных пользователей (HyperLogLog)
+    ACTIVE_USERS_REDIS = Redis(
+        host=get('REDIS_HOST'),
+        port=6379,
+        db=int(get('ACTIVE_USERS_REDIS_DB', 3)),
+        username=get('REDIS_USER'),
+        password=get('REDIS_USER_PASSWORD'),
+    )
+    ACTIVE_USERS_RETENTION_DAYS: int = int(
+        get('ACTIVE_USERS_RETENTION_DAYS', 35),
+    )
+    # Ограничение частоты запросов (корзина токенов): скорость
+    # пополнения в токенах в секунду и емкость корзины пользователя.
+    # Лимит IP больше в RATE_LIMIT_IP_FACTOR раз. /login ограничивается
+    # только по IP.
+    RATE_LIMIT_REDIS = Redis(
+        host=get('REDIS_HOST'),
+        port=6379,
+        db=int(get('RATE_LIMIT_REDIS_DB', 4)),
+        username=get('REDIS_USER'),
+        password=get('REDIS_USER_PASSWORD'),
+    )
+    RATE_LIMIT_IP_FACTOR: int = int(get('RATE_LIMIT_IP_FACTOR', 10))
+    RATE_LIMIT_LOGIN: tuple[float, int] = (
+        float(get('RATE_LIMIT_LOGIN_RATE', 0.1)),
+        int(get('RATE_LIMIT_LOGIN_BURST', 5)),
+    )
+    RATE_LIMIT_ANSWER: tuple[float, int] = (
+        float(get('RATE_LIMIT_ANSWER_RATE', 1)),
+        int(get('RATE_LIMIT_ANSWER_BURST', 10)),
+    )
+    RATE_LIMIT_PROFILE: tuple[float, int] = (
+        float(get('RATE_LIMIT_PROFILE_RATE', 0.5)),
+        int(get('RATE_LIMIT_PROFILE_BURST', 10)),
+    )
+    RATE_LIMIT_BOT: tuple[float, int] = (
+        float(get('RATE_LIMIT_BOT_RATE', 0.5)),
+        int(get('RATE_LIMIT_BOT_BURST', 5)),
+    )
+    # Архив ответов без пользователя (Parquet)
+    ANSWERS_ARCHIVE_DIR: str = get(
+        'ANSWERS_ARCHIVE_DIR',
+        '/app/answers_archive',
+    )
+    ANSWERS_ARCHIVE_BATCH_SIZE: int = int(
+        get('ANSWERS_ARCHIVE_BATCH_SIZE', 100000),
+    )
 
 
 class LoggingSettings:
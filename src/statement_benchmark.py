@@ -0,0 +1,162 @@
+import timeit
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from .crud.base import PrebuiltStatement
+from .crud.question import NEW_QUESTION
+from .crud.quiz_result import CURRENT_QUIZ_RESULT
+from .crud.telegram_user import TELEGRAM_USER_BY_TELEGRAM_ID
+from .crud.user import USER_BY_TELEGRAM_ID
+
+# Метод круд класса, собранный заранее запрос, который он выполняет,
+# и параметры, которые метод передает при выполнении
+HOT_STATEMENTS: Tuple[
+    Tuple[str, PrebuiltStatement, Dict[str, Any]],
+    ...,
+] = (
+    (
+        'question_crud.get_new',
+        NEW_QUESTION,
+        {'user_id': 1, 'quiz_id': 1, 'is_active': True, 'attempt': 1},
+    ),
+    (
+        'quiz_result_crud.get_by_user_and_quiz',
+        CURRENT_QUIZ_RESULT,
+        {'user_id': 1, 'quiz_id': 1},
+    ),
+    (
+        'user_crud.get_by_telegram_id',
+        USER_BY_TELEGRAM_ID,
+        {'telegram_id': 1},
+    ),
+    (
+        'telegram_user_crud.get_by_telegram_id',
+        TELEGRAM_USER_BY_TELEGRAM_ID,
+        {'telegram_id': 1},
+    ),
+)
+
+
+class _StubCursor:
+
+    """Курсор DBAPI, который ничего не отправляет и не возвращает строк."""
+
+    rowcount = -1
+
+    def __init__(self, connection: '_StubConnection') -> None:
+        """Соединение курсора."""
+        self.connection = connection
+        self.description: Optional[list] = None
+
+    def execute(self, statement: str, parameters: Any = None) -> None:
+        """Запрос не выполняется."""
+
+    def fetchall(self) -> list:
+        """Строк нет."""
+        return []
+
+    def fetchone(self) -> None:
+        """Строк нет."""
+
+    def fetchmany(self, size: Optional[int] = None) -> list:
+        """Строк нет."""
+        return []
+
+    def close(self) -> None:
+        """Закрывать нечего."""
+
+
+class _StubConnection:
+
+    """Соединение DBAPI без базы данных."""
+
+    notices: list = []
+
+    def cursor(self) -> _StubCursor:
+        """Новый курсор."""
+        return _StubCursor(self)
+
+    def commit(self) -> None:
+        """Фиксировать нечего."""
+
+    def rollback(self) -> None:
+        """Откатывать нечего."""
+
+    def close(self) -> None:
+        """Закрывать нечего."""
+
+
+def _stub_engine() -> Engine:
+    """Движок PostgreSQL, который выполняет запросы на заглушке.
+
+    SQLAlchemy проходит весь путь выполнения: ключ и кэш
+    скомпилированного SQL, обработку параметров, разбор результата.
+    Описание колонок курсора берется из скомпилированного запроса.
+    """
+    engine = create_engine(
+        'postgresql+psycopg2://',
+        creator=_StubConnection,
+        use_native_hstore=False,
+        _initialize=False,
+    )
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def describe_columns(
+        conn: Any,
+        cursor: _StubCursor,
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        columns = (context.result_column_struct or ([],))[0]
+        cursor.description = [
+            (column[1], None, None, None, None, None, None)
+            for column in columns
+        ] or None
+
+    return engine
+
+
+def _per_call(func: Callable[[], object], calls: int) -> float:
+    """Среднее время одного вызова в микросекундах."""
+    return timeit.timeit(func, number=calls) / calls * 1_000_000
+
+
+def run_benchmark(calls: int) -> List[Tuple[str, float, float]]:
+    """Измерить работу Python при выполнении запроса через сессию.
+
+    Запрос выполняется через Session.execute на соединении-заглушке,
+    поэтому в замер входят сборка ORM запроса, поиск
+    скомпилированного SQL в кэше и обработка параметров, но не сеть
+    и не база. Запрос, собранный на каждом вызове, платит за сборку
+    и полный обход дерева для ключа кэша. У собранного заранее
+    запроса ключ вычисляется один раз и запоминается.
+
+    Возвращает (метод, мкс на вызов до, мкс на вызов после).
+    """
+    results = []
+    with Session(_stub_engine()) as session:
+        for name, prebuilt, params in HOT_STATEMENTS:
+
+            def built(
+                prebuilt: PrebuiltStatement = prebuilt,
+                params: Dict[str, Any] = params,
+            ) -> list:
+                return session.execute(prebuilt.build(), params).all()
+
+            def reused(
+                prebuilt: PrebuiltStatement = prebuilt,
+                params: Dict[str, Any] = params,
+            ) -> list:
+                return session.execute(prebuilt.statement, params).all()
+
+            # Первый вызов компилирует SQL и кладет его в кэш
+            reused()
+            results.append(
+                (name, _per_call(built, calls), _per_call(reused, calls)),
+            )
+    return results
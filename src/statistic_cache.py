@@ -0,0 +1,136 @@
+import asyncio
+import logging
+import threading
+import time
+from typing import Any, Awaitable, Callable, Optional
+
+from flask_caching import Cache
+
+from . import app, cache
+from .settings import settings
+
+logger = logging.getLogger(__name__)
+
+Factory = Callable[[], Awaitable[Any]]
+
+
+class StatisticCache:
+
+    """Кэш тяжелых вычислений статистики.
+
+    Свежее значение отдается сразу. Устаревшее значение тоже отдается
+    сразу, а пересчет запускается в фоне (stale-while-revalidate).
+    Пересчет защищен блокировкой в Redis, поэтому одновременные запросы
+    администраторов не запускают один и тот же запрос к базе дважды.
+
+    """
+
+    key_prefix = 'statistic'
+    poll_interval = 0.1
+
+    def __init__(
+        self,
+        cache: Cache,
+        ttl: int,
+        stale_ttl: int,
+        lock_timeout: int,
+    ) -> None:
+        """Время жизни свежего и устаревшего значения, таймаут блокировки."""
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.lock_timeout = lock_timeout
+
+    def _key(self, key: str) -> str:
+        return f'{self.key_prefix}:{key}'
+
+    def _lock_key(self, key: str) -> str:
+        return f'{self.key_prefix}:lock:{key}'
+
+    def _store(self, key: str, value: Any, ttl: int) -> None:
+        """Сохранить значение с отметкой свежести."""
+        self.cache.set(
+            self._key(key),
+            {'value': value, 'fresh_until': time.time() + ttl},
+            timeout=ttl + self.stale_ttl,
+        )
+
+    async def _compute(self, key: str, factory: Factory, ttl: int) -> Any:
+        """Посчитать значение, сохранить его и снять блокировку."""
+        try:
+            value = await factory()
+            self._store(key, value, ttl)
+            return value
+        finally:
+            self.cache.delete(self._lock_key(key))
+
+    def _refresh_in_background(
+        self,
+        key: str,
+        factory: Factory,
+        ttl: int,
+    ) -> None:
+        """Пересчитать значение в отдельном потоке."""
+
+        def refresh() -> None:
+            with app.app_context():
+                try:
+                    asyncio.run(self._compute(key, factory, ttl))
+                except Exception as e:
+                    logger.warning(f'Не удалось обновить {key}: {e}')
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    async def _wait_for_value(self, key: str) -> Optional[dict]:
+        """Дождаться значения, которое считает другой запрос."""
+        deadline = time.time() + self.lock_timeout
+        while time.time() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            entry = self.cache.get(self._key(key))
+            if entry is not None:
+                return entry
+            if not self.cache.has(self._lock_key(key)):
+                return None
+        return None
+
+    async def get_or_compute(
+        self,
+        key: str,
+        factory: Factory,
+        ttl: Optional[int] = None,
+    ) -> Any:
+        """Получить значение из кэша или посчитать его.
+
+        Keyword Arguments:
+        -----------------
+        key (str): ключ значения
+        factory (Factory): функция без аргументов, возвращающая корутину
+        ttl (Optional[int]): время свежести значения в секундах
+
+        """
+        ttl = ttl or self.ttl
+        entry = self.cache.get(self._key(key))
+        if entry is not None:
+            if entry['fresh_until'] < time.time() and self.cache.add(
+                self._lock_key(key),
+                1,
+                timeout=self.lock_timeout,
+            ):
+                self._refresh_in_background(key, factory, ttl)
+            return entry['value']
+
+        if self.cache.add(self._lock_key(key), 1, timeout=self.lock_timeout):
+            return await self._compute(key, factory, ttl)
+
+        entry = await self._wait_for_value(key)
+        if entry is not None:
+            return entry['value']
+        return await factory()
+
+
+statistic_cache = StatisticCache(
+    cache,
+    ttl=settings.STATISTICS_CACHE_TTL,
+    stale_ttl=settings.STATISTICS_CACHE_STALE_TTL,
+    lock_timeout=settings.STATISTICS_CACHE_LOCK_TIMEOUT,
+)
@@ -1,3 +1,5 @@
+from typing import Optional
+
 from sqlalchemy.inspection import inspect
 
 
@@ -42,3 +44,14 @@ def obj_to_dict(obj: object, seen: dict | None = None) -> Dotdict:
             data[rel.key] = obj_to_dict(value, seen) if value else None
         return data
     return obj
+
+
+def get_score_bucket(
+    correct_answers_count: int,
+    total_questions: int,
+) -> Optional[int]:
+    """Процент правильных ответов, округленный до ближайшего десятка."""
+    if total_questions == 0:
+        return None
+    score = (correct_answers_count / total_questions) * 100
+    return round(score / 10) * 10
@@ -12,9 +12,15 @@ from flask_jwt_extended import (
 
 from src import app, cache
 from src.crud.user import user_crud
+from src.rate_limit import rate_limiter
+from src.settings import settings
 
 
+# tgId в теле запроса не проверен, поэтому вход ограничивается
+# только по IP: иначе любой мог бы исчерпать корзину чужого
+# пользователя и не дать ему войти.
 @app.route('/login', methods=['POST'])
+@rate_limiter.limit('login', settings.RATE_LIMIT_LOGIN)
 async def login() -> Response:
     """Производит выдачу токена в куки пользователя.
 
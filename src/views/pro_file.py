@@ -10,22 +10,28 @@ from flask_jwt_extended import (
 
 from src import app, cache
 from src.constants import (
-    DEFAULT_PAGE_NUMBER,
     ITEMS_PER_PAGE,
 )
 from src.crud.question import question_crud
 from src.crud.quiz_result import quiz_result_crud
 from src.crud.user import user_crud
 from src.crud.user_answer import user_answer_crud
+from src.rate_limit import current_telegram_id, rate_limiter
+from src.settings import settings
 
 
 @app.route('/me', methods=['GET'])
 @cache.cached(timeout=5)
 @jwt_required()
+@rate_limiter.limit(
+    'profile',
+    settings.RATE_LIMIT_PROFILE,
+    telegram_id=current_telegram_id,
+)
 async def profile() -> Response:
     """Отображаем профиль пользователя."""
     user = current_user
-    page = request.args.get('page', DEFAULT_PAGE_NUMBER, type=int)
+    cursor = request.args.get('cursor', type=str)
     per_page = ITEMS_PER_PAGE
 
     all_quiz_results = await quiz_result_crud.get_results_by_user(user.id)
@@ -38,7 +44,7 @@ async def profile() -> Response:
 
     pagination = await quiz_result_crud.get_results_by_user_paginated(
         user.id,
-        page,
+        cursor,
         per_page,
     )
     quiz_results = pagination.items
@@ -53,7 +59,13 @@ async def profile() -> Response:
 
         for question in questions:
             user_answer = next(
-                (ua for ua in user_answers if ua.question_id == question.id),
+                (
+                    ua
+                    for ua in user_answers
+                    if ua.question_id == question.id
+                    and ua.quiz_id == result.quiz_id
+                    and ua.attempt == result.attempt
+                ),
                 None,
             )
             correct_answer_text = next(
@@ -97,24 +109,18 @@ async def profile() -> Response:
 
 @app.route('/me', methods=['POST'])
 @jwt_required()
+@rate_limiter.limit(
+    'profile',
+    settings.RATE_LIMIT_PROFILE,
+    telegram_id=current_telegram_id,
+)
 async def delete_profile() -> Response:
     """Удаляет профиль пользователя, сохраняя результаты викторин."""
     user = current_user
-    quiz_results = await quiz_result_crud.get_results_by_user(user.id)
-
-    # Обновляем результаты викторин, чтобы убрать связь с пользователем
-    for result in quiz_results:
-        result.user_id = None
-        await user_crud.update(result, {'user_id': None})
-
-    user_answers = await user_answer_crud.get_results_by_user(user.id)
-
-    # Обновляем ответы пользователя, убирая связь с таблицей пользователи
-    for answer in user_answers:
-        answer.user_id = None
-        await user_crud.update(answer, {'user_id': None})
+    user_id = user.id
 
-    cache.delete(f'user_{user.id}')
-    await user_crud.remove(current_user)
+    # Результаты и ответы отвязываются от пользователя, а не удаляются
+    await user_crud.delete_profile(user)
+    cache.delete(f'user_{user_id}')
 
     return 'Профиль удален', 204
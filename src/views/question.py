@@ -1,4 +1,3 @@
-from datetime import datetime
 from typing import Optional, Union
 
 from flask import (
@@ -14,13 +13,20 @@ from flask_jwt_extended import (
 )
 
 from src import app
+from src.constants import HTTP_BAD_REQUEST, WRONG_ANSWER_VARIANT
+from src.crud.base import batch
 from src.crud.question import question_crud
+from src.crud.quiz import AnswerVariant
 from src.crud.quiz_result import quiz_result_crud
+from src.crud.statistic_rollup import statistic_rollup_crud
 from src.crud.telegram_user import telegram_user_crud
 from src.crud.user_answer import user_answer_crud
-from src.crud.variant import variant_crud
 from src.models.question import Question as QuestionModel
-from src.utils import Dotdict, obj_to_dict
+from src.models.quiz_result import QuizResult as QuizResultModel
+from src.quiz_snapshot import quiz_snapshots
+from src.rate_limit import current_telegram_id, rate_limiter
+from src.settings import settings
+from src.utils import Dotdict, get_score_bucket, obj_to_dict
 
 
 @app.route(
@@ -30,6 +36,12 @@ from src.utils import Dotdict, obj_to_dict
 )
 @app.route('/<int:quiz_id>/<test>', methods=['GET', 'POST'])
 @jwt_required()
+@rate_limiter.limit(
+    'answer',
+    settings.RATE_LIMIT_ANSWER,
+    telegram_id=current_telegram_id,
+    methods=('POST',),
+)
 async def question(
     quiz_id: int,
     test: Optional[str] = None,
@@ -60,7 +72,8 @@ async def handle_question_post(
 ) -> str:
     """Обрабатывает POST-запросы к странице с вопросами.
 
-    Получает ответ пользователя, проверяет его и перенаправляет
+    Получает ответ пользователя, проверяет по снимку викторины,
+    что вариант относится к вопросу этой викторины, и перенаправляет
     на страницу с результатами.
 
     Args:
@@ -73,19 +86,23 @@ async def handle_question_post(
         str: HTML-код страницы с результатами ответа.
 
     """
-    question_id = int(request.form.get('question_id'))
-    answer_id = int(request.form.get('answer'))
+    question_id = request.form.get('question_id', type=int)
+    answer_id = request.form.get('answer', type=int)
 
-    current_question = await question_crud.get(question_id)
-    chosen_answer = await variant_crud.get(answer_id)
+    # Вариант проверяется по снимку викторины, без запроса к вариантам
+    snapshot = await quiz_snapshots.get(quiz_id)
+    chosen_answer = snapshot.get_variant(question_id, answer_id)
+    if chosen_answer is None:
+        return WRONG_ANSWER_VARIANT, HTTP_BAD_REQUEST
 
     if test:
+        current_question = await question_crud.get(question_id)
         # Сохраняем ответы в сессии пользователя
         session['test_answers'] = session.get('test_answers', []) + [
             Dotdict(
                 {
                     'question': Dotdict(obj_to_dict(current_question)),
-                    'answer': Dotdict(obj_to_dict(chosen_answer)),
+                    'answer': Dotdict(chosen_answer._asdict()),
                 },
             ),
         ]
@@ -95,21 +112,15 @@ async def handle_question_post(
                 current_user.telegram_id,
             )
         ).id
-        await update_quiz_results(
-            current_user.id,
-            quiz_id,
-            question_id,
-            chosen_answer.is_right_choice,
-            tg_user_id=tg_user_id,
-        )
-        await save_user_answer(
-            user_id=current_user.id,
-            tg_user_id=tg_user_id,
-            quiz_id=quiz_id,
-            question_id=current_question.id,
-            answer_id=answer_id,
-            is_right=chosen_answer.is_right_choice,
-        )
+        # Результат, ответ и счетчики сохраняются одной транзакцией
+        with batch(expire_on_commit=False):
+            await record_answer(
+                current_user.id,
+                tg_user_id,
+                quiz_id,
+                chosen_answer,
+            )
+            await telegram_user_crud.mark_active(tg_user_id)
 
     image_url = url_for('get_question_image', question_id=question_id)
     return render_template(
@@ -156,9 +167,14 @@ async def handle_question_get(
             None,
         )
     else:
+        quiz_result = await quiz_result_crud.get_by_user_and_quiz(
+            user_id=current_user.id,
+            quiz_id=quiz_id,
+        )
         question: Optional[QuestionModel] = await question_crud.get_new(
             quiz_id=quiz_id,
             user_id=current_user.id,
+            attempt=quiz_result.attempt if quiz_result else 1,
         )
 
     if question is None:
@@ -173,44 +189,84 @@ async def handle_question_get(
     )
 
 
-async def update_quiz_results(
+async def record_answer(
     user_id: int,
-    quiz_id: int,
-    question_id: int,
-    is_correct_answer: bool,
     tg_user_id: int,
-) -> None:
-    """Обновляет результаты викторины для пользователя.
+    quiz_id: int,
+    chosen_answer: AnswerVariant,
+) -> Optional[QuizResultModel]:
+    """Сохраняет ответ, обновляет результат викторины и статистику.
+
+    Вызывается внутри batch, чтобы все записи попали в одну транзакцию.
+    Повтор ответа (двойное нажатие, повтор запроса) ничего не меняет.
 
     Args:
     ----
         user_id (int): ID пользователя.
-        quiz_id (int): ID викторины.
-        question_id (int): ID вопроса.
-        is_correct_answer (bool): Флаг, указывающий, был ли ответ
-        на вопрос верным.
         tg_user_id (int): ID телеграм пользователя.
+        quiz_id (int): ID викторины.
+        chosen_answer (AnswerVariant): Выбранный вариант из снимка
+        викторины.
+
+    Returns:
+    -------
+        Optional[QuizResultModel]: Обновленный результат викторины
+        или None, если ответ на этот вопрос в попытке уже сохранен.
 
     """
-    quiz_result = await quiz_result_crud.get_by_user_and_quiz(
+    quiz_result = await quiz_result_crud.get_or_start(
+        user_id,
+        tg_user_id,
+        quiz_id,
+    )
+    is_saved = await save_user_answer(
         user_id=user_id,
+        tg_user_id=tg_user_id,
         quiz_id=quiz_id,
+        question_id=chosen_answer.question_id,
+        answer_id=chosen_answer.id,
+        is_right=chosen_answer.is_right_choice,
+        attempt=quiz_result.attempt,
     )
-    if quiz_result is None:
-        quiz_result = await quiz_result_crud.create(
-            {
-                'user_id': user_id,
-                'tg_user_id': tg_user_id,
-                'quiz_id': quiz_id,
-                'total_questions': 0,
-                'correct_answers_count': 0,
-                'is_complete': False,
-            },
-        )
-    quiz_result.total_questions += 1
-    if is_correct_answer:
-        quiz_result.correct_answers_count += 1
-    await quiz_result_crud.update_with_obj(quiz_result)
+    if not is_saved:
+        # Повтор запроса: счетчики и статистика уже учли этот ответ
+        return None
+    quiz_result = await update_quiz_results(
+        quiz_result,
+        chosen_answer.is_right_choice,
+    )
+    await statistic_rollup_crud.register_answer(
+        quiz_id=quiz_id,
+        question_id=chosen_answer.question_id,
+        tg_user_id=tg_user_id,
+        is_right=chosen_answer.is_right_choice,
+        answer_id=chosen_answer.id,
+        position=quiz_result.total_questions,
+    )
+    return quiz_result
+
+
+async def update_quiz_results(
+    quiz_result: QuizResultModel,
+    is_correct_answer: bool,
+) -> QuizResultModel:
+    """Учитывает ответ в счетчиках попытки.
+
+    Счетчики увеличиваются в базе, поэтому одновременные ответы
+    одной попытки не теряют друг друга.
+
+    Args:
+    ----
+        quiz_result (QuizResultModel): Текущая попытка.
+        is_correct_answer (bool): Флаг, указывающий, был ли ответ
+        на вопрос верным.
+
+    Returns:
+    -------
+        QuizResultModel: Обновленный результат викторины.
+
+    """
+    return await quiz_result_crud.add_answer(quiz_result.id, is_correct_answer)
 
 
 async def save_user_answer(
@@ -220,9 +276,12 @@ async def save_user_answer(
     question_id: int,
     answer_id: int,
     is_right: bool,
-) -> None:
+    attempt: int = 1,
+) -> bool:
     """Сохраняет ответ пользователя в базе данных.
 
+    Повторный ответ на вопрос в той же попытке не сохраняется.
+
     Args:
     ----
         user_id (int): ID пользователя.
@@ -231,9 +290,14 @@ async def save_user_answer(
         question_id (int): ID вопроса.
         answer_id (int): ID выбранного ответа.
         is_right (bool): Флаг, указывающий, был ли ответ верным.
+        attempt (int): Номер попытки прохождения викторины.
+
+    Returns:
+    -------
+        bool: True, если ответ сохранен впервые.
 
     """
-    await user_answer_crud.create(
+    return await user_answer_crud.create_if_absent(
         {
             'user_id': user_id,
             'tg_user_id': tg_user_id,
@@ -241,6 +305,7 @@ async def save_user_answer(
             'question_id': question_id,
             'answer_id': answer_id,
             'is_right': is_right,
+            'attempt': attempt,
         },
     )
 
@@ -271,7 +336,29 @@ async def handle_quiz_end(
         quiz_id=quiz_id,
     )
     if quiz_result is not None and not quiz_result.is_complete:
-        quiz_result.is_complete = True
-        quiz_result.ended_on = datetime.utcnow()
-        await quiz_result_crud.update_with_obj(quiz_result)
+        await complete_quiz_result(quiz_result)
     return redirect(url_for('results', quiz_id=quiz_id))
+
+
+async def complete_quiz_result(quiz_result: QuizResultModel) -> None:
+    """Отмечает прохождение завершенным и учитывает его в статистике.
+
+    Завершение, уже выполненное параллельным запросом, не учитывается
+    повторно.
+
+    Args:
+    ----
+        quiz_result (QuizResultModel): Незавершенный результат викторины.
+
+    """
+    quiz_result = await quiz_result_crud.complete(quiz_result.id)
+    if quiz_result is None:
+        return
+    await statistic_rollup_crud.register_completion(
+        quiz_result.tg_user_id,
+        quiz_id=quiz_result.quiz_id,
+        score_bucket=get_score_bucket(
+            quiz_result.correct_answers_count,
+            quiz_result.total_questions,
+        ),
+    )
@@ -1,5 +1,6 @@
 from flask import (
     render_template,
+    request,
     session,
 )
 from flask_jwt_extended import (
@@ -12,7 +13,7 @@ from src.crud.question import question_crud
 from src.crud.quiz import quiz_crud
 from src.crud.quiz_result import quiz_result_crud
 from src.crud.user_answer import user_answer_crud
-from src.utils import Dotdict, obj_to_dict
+from src.utils import Dotdict, get_score_bucket, obj_to_dict
 
 
 def get_result_message_and_image(
@@ -23,7 +24,6 @@ def get_result_message_and_image(
     if total_questions == 0:
         return 'Не было заданий.', 'static/images/default.jpg'
 
-    score = (correct_answers_count / total_questions) * 100
     messages = {
         0: """Кажется, ваш котик забрался в телефон и прошел тест.
 Прогоните его, ведь тут ни одного правильного ответа!""",
@@ -57,7 +57,7 @@ def get_result_message_and_image(
     }
 
     # Округляем до ближайшего десятка
-    rounded_score = round(score / 10) * 10
+    rounded_score = get_score_bucket(correct_answers_count, total_questions)
 
     # Генерация номера изображения
     image_number = rounded_score if rounded_score in messages else 'default'
@@ -83,9 +83,11 @@ async def results(quiz_id: int, test: str) -> str:
 
     if not test:
         # Получаем результат викторины для конкретного пользователя и викторины
+        # Без номера попытки показывается текущая попытка
         quiz_result = await quiz_result_crud.get_by_user_and_quiz(
             user.id,
             quiz_id,
+            attempt=request.args.get('attempt', type=int),
         )
     else:
         test_answers = obj_to_dict(session.get('test_answers', []))
@@ -130,6 +132,7 @@ async def results(quiz_id: int, test: str) -> str:
         user_answers = await user_answer_crud.get_results_by_user_and_quiz(
             user.id,
             quiz_id,
+            attempt=quiz_result.attempt,
         )
         # Получаем все вопросы по викторине
         questions = await question_crud.get_all_by_quiz_id(quiz_result.quiz_id)
@@ -150,10 +153,11 @@ async def results(quiz_id: int, test: str) -> str:
         # Получаем текст ответа пользователя
         # Так как из сессии получаем модель variant
         # а тут из модели user_answer
-        # то условие будет разным
+        # то условие будет разным. Без ответа (вопрос текущей попытки
+        # еще не отвечен) вопрос показывается неотвеченным
         user_answer = (
             user_answer
-            if test
+            if test or user_answer is None
             else next(
                 (
                     v
@@ -169,7 +173,7 @@ async def results(quiz_id: int, test: str) -> str:
         quiz_result.questions.append(
             {
                 'title': question.title,
-                'user_answer': user_answer.title,
+                'user_answer': user_answer.title if user_answer else None,
                 'correct_answer': (
                     correct_variant.title if correct_variant else None
                 ),
@@ -0,0 +1,69 @@
+import os
+from typing import Any, Iterator, List
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+os.environ.setdefault('TELEGRAM_TOKEN', '1:test')
+
+from src import app, cache  # noqa: E402
+from src.admin.quiz import QuizAdmin  # noqa: E402
+from src.crud.quiz import quiz_crud  # noqa: E402
+from src.models.quiz import Quiz  # noqa: E402
+
+
+class StubSession:
+
+    """Сессия, которая записывает вызовы вместо обращения к базе."""
+
+    def __init__(self, error: bool = False) -> None:
+        """Выбрасывать ли IntegrityError при фиксации."""
+        self.error = error
+        self.calls: List[str] = []
+
+    def delete(self, model: Any) -> None:
+        """Записать удаление."""
+        self.calls.append('delete')
+
+    def commit(self) -> None:
+        """Записать фиксацию или выбросить IntegrityError."""
+        self.calls.append('commit')
+        if self.error:
+            raise IntegrityError('DELETE', {}, Exception())
+
+    def rollback(self) -> None:
+        """Записать откат."""
+        self.calls.append('rollback')
+
+
+@pytest.fixture(autouse=True)
+def simple_cache() -> Iterator[None]:
+    """Кэш в памяти вместо Redis."""
+    config = {'CACHE_TYPE': 'SimpleCache'}
+    cache.init_app(app, config=config)
+    with app.test_request_context():
+        cache.clear()
+        yield
+    cache.init_app(app)
+
+
+def test_delete_bumps_catalogue_version() -> None:
+    """Удаление викторины в админке сбрасывает кэш каталога."""
+    session = StubSession()
+    view = QuizAdmin(Quiz, session)
+    version = quiz_crud.get_catalogue_version()
+
+    assert view.delete_model(Quiz(title='quiz'))
+    assert session.calls == ['delete', 'commit']
+    assert quiz_crud.get_catalogue_version() == version + 1
+
+
+def test_failed_delete_keeps_catalogue_version() -> None:
+    """Неудачное удаление не сбрасывает кэш каталога."""
+    session = StubSession(error=True)
+    view = QuizAdmin(Quiz, session)
+    version = quiz_crud.get_catalogue_version()
+
+    assert not view.delete_model(Quiz(title='quiz'))
+    assert session.calls == ['delete', 'commit', 'rollback']
+    assert quiz_crud.get_catalogue_version() == version
@@ -0,0 +1,67 @@
+import os
+from decimal import Decimal
+from typing import Iterator, List
+
+import pytest
+from sqlalchemy import Numeric
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.sql.elements import ClauseElement
+
+os.environ.setdefault('TELEGRAM_TOKEN', '1:test')
+
+from src import app  # noqa: E402
+from src.crud.base import (  # noqa: E402
+    OrderKey,
+    _cursor_serializer,
+    _dump_cursor,
+    _seek_condition,
+)
+from src.crud.search import search_crud  # noqa: E402
+from src.models.question import Question  # noqa: E402
+
+
+@pytest.fixture
+def order() -> Iterator[List[OrderKey]]:
+    """Порядок поиска вопросов: релевантность и id."""
+    with app.app_context():
+        _, order = search_crud.apply(Question.query, 'question', 'столица')
+        yield order
+
+
+def compile_sql(clause: ClauseElement) -> str:
+    """Собрать SQL выражения для PostgreSQL с подставленными значениями."""
+    return str(
+        clause.compile(
+            dialect=postgresql.dialect(),
+            compile_kwargs={'literal_binds': True},
+        ),
+    )
+
+
+def test_rank_is_numeric(order: List[OrderKey]) -> None:
+    """Релевантность сортируется как numeric с фиксированной точностью."""
+    rank, descending = order[0]
+    assert descending
+    assert isinstance(rank.type, Numeric)
+    assert rank.type.asdecimal
+    assert 'AS NUMERIC(12, 6)' in compile_sql(rank)
+
+
+def test_tie_at_page_boundary(order: List[OrderKey]) -> None:
+    """Строки с релевантностью последней строки страницы не теряются."""
+    # Последняя строка страницы: релевантность как ее вернула база
+    # и id. Следующая страница начинается с той же релевантности.
+    with app.app_context():
+        serializer = _cursor_serializer()
+        cursor = _dump_cursor(serializer, 'next', [Decimal('0.100000'), 7])
+        direction, values = serializer.loads(cursor)
+    assert direction == 'next'
+
+    condition = _seek_condition(order, values)
+    params = condition.compile(dialect=postgresql.dialect()).params
+    ranks = [value for value in params.values() if isinstance(value, Decimal)]
+    assert ranks == [Decimal('0.100000'), Decimal('0.100000')]
+
+    sql = compile_sql(condition)
+    assert 'AS NUMERIC(12, 6)) < 0.100000' in sql
+    assert 'AS NUMERIC(12, 6)) = 0.100000 AND questions.id > 7' in sql
@@ -0,0 +1,46 @@
+import os
+import warnings
+
+from sqlalchemy.dialects import postgresql
+
+os.environ.setdefault('TELEGRAM_TOKEN', '1:test')
+
+from src import app  # noqa: E402
+from src.crud.search import MAX_TELEGRAM_ID_DIGITS, search_crud  # noqa: E402
+from src.models.telegram_user import TelegramUser  # noqa: E402
+
+
+def search_users_sql(search_query: str) -> str:
+    """Собрать SQL поиска пользователей с подставленными значениями."""
+    with app.app_context():
+        query, _ = search_crud.apply(TelegramUser.query, 'user', search_query)
+        statement = query.statement
+    with warnings.catch_warnings():
+        warnings.simplefilter('error')
+        return str(
+            statement.compile(
+                dialect=postgresql.dialect(),
+                compile_kwargs={'literal_binds': True},
+            ),
+        )
+
+
+def test_telegram_id_prefix_ranges() -> None:
+    """Числовой запрос ищет telegram_id по диапазонам префикса."""
+    sql = search_users_sql('12')
+    assert 'telegram_users.telegram_id >= 12 ' in sql
+    assert 'telegram_users.telegram_id >= 1200 ' in sql
+    assert 'telegram_users.telegram_id < 1300' in sql
+
+
+def test_telegram_id_prefix_too_long() -> None:
+    """Префикс длиннее telegram id не находит ни одного пользователя."""
+    sql = search_users_sql('1' * (MAX_TELEGRAM_ID_DIGITS + 1))
+    assert 'WHERE false' in sql
+
+
+def test_telegram_id_prefix_leading_zero() -> None:
+    """Префикс с ведущим нулем не совпадает с id без нуля."""
+    sql = search_users_sql('0123')
+    assert 'WHERE false' in sql
+    assert '>= 123' not in sql